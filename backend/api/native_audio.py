@@ -1,11 +1,31 @@
+import asyncio
 from collections.abc import Callable
-from datetime import datetime
+from datetime import UTC, datetime
 
-from fastapi import APIRouter, Body, Header, HTTPException
+from fastapi import (
+    APIRouter,
+    Body,
+    Header,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
 
 from models.native_bridge import NativeAudioChunk
+from services.audio_export import (
+    COMPRESSED_CODECS,
+    AudioExportError,
+    compression_available,
+    iter_compressed,
+    iter_wav,
+    plan_session_audio,
+)
 from services.native_audio_ingress import (
+    NativeAudioFrame,
+    NativeAudioFrameDecoder,
     NativeAudioIngress,
     NativeAudioSequenceError,
     NativeAudioValidationError,
@@ -29,7 +49,7 @@ def build_native_audio_router(
         captured_at: datetime | None = Header(None, alias="X-PromptMeet-Captured-At"),
         meeting_time_ms: int = Header(0, alias="X-PromptMeet-Meeting-Time-Ms"),
     ) -> dict[str, object]:
-        session = session_exists(session_id)
+        session = await asyncio.to_thread(session_exists, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="会话不存在")
         if getattr(session, "is_paused", False):
@@ -48,7 +68,10 @@ def build_native_audio_router(
             metadata = NativeAudioChunk(
                 **values,
             )
-            receipt = ingress.accept(session_id, metadata, payload)
+            # 共享模式下 accept 会等待其他 worker 的文件锁，不能阻塞事件循环
+            receipt = await asyncio.to_thread(
+                ingress.accept, session_id, metadata, payload
+            )
         except ValidationError as error:
             raise HTTPException(status_code=422, detail=error.errors()) from error
         except NativeAudioSequenceError as error:
@@ -58,4 +81,153 @@ def build_native_audio_router(
 
         return {"success": True, "sequence": receipt.sequence}
 
+    @router.websocket("/api/sessions/{session_id}/native-audio/stream")
+    async def stream_native_audio(
+        websocket: WebSocket,
+        session_id: str,
+        sample_rate: int,
+        channels: int,
+        source: str = "mixed",
+    ) -> None:
+        # 先完成握手再关闭，否则服务器会把自定义关闭码变成 HTTP 403。
+        await websocket.accept()
+        if not await asyncio.to_thread(session_exists, session_id):
+            await websocket.close(code=4404, reason="会话不存在")
+            return
+        try:
+            template = NativeAudioChunk(
+                sequence=0, sample_rate=sample_rate, channels=channels, source=source
+            )
+        except ValidationError:
+            await websocket.close(code=1008, reason="音频流参数无效")
+            return
+        decoder = NativeAudioFrameDecoder(ingress.max_payload_bytes)
+
+        stream = template.model_dump(include={"sample_rate", "channels", "source"})
+
+        def accept_frames(frames: list[NativeAudioFrame]) -> list[dict[str, object]]:
+            rejected = []
+            for frame in frames:
+                try:
+                    # 帧头时间为 0 时使用服务端收到该帧的时间
+                    metadata = NativeAudioChunk(
+                        **stream,
+                        sequence=frame.sequence,
+                        captured_at=frame.captured_at or datetime.now(UTC),
+                        meeting_time_ms=frame.meeting_time_ms,
+                    )
+                    ingress.accept(session_id, metadata, frame.payload)
+                except ValidationError as error:
+                    rejected.append(
+                        {
+                            "sequence": frame.sequence,
+                            "status": 422,
+                            "detail": error.errors(include_url=False),
+                        }
+                    )
+                except NativeAudioSequenceError as error:
+                    rejected.append(
+                        {
+                            "sequence": frame.sequence,
+                            "status": 409,
+                            "detail": str(error),
+                        }
+                    )
+                except NativeAudioValidationError as error:
+                    rejected.append(
+                        {
+                            "sequence": frame.sequence,
+                            "status": 422,
+                            "detail": str(error),
+                        }
+                    )
+            return rejected
+
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                data = message.get("bytes")
+                if data is None:
+                    await websocket.close(code=1003, reason="只接受二进制音频帧")
+                    return
+                try:
+                    frames = decoder.feed(data)
+                except NativeAudioValidationError as error:
+                    await websocket.close(code=1009, reason=str(error))
+                    return
+                if not frames:
+                    continue
+                session = await asyncio.to_thread(session_exists, session_id)
+                if not session:
+                    await websocket.close(code=4404, reason="会话不存在")
+                    return
+                if getattr(session, "is_paused", False):
+                    rejected = [
+                        {
+                            "sequence": frame.sequence,
+                            "status": 409,
+                            "detail": "录音已暂停",
+                        }
+                        for frame in frames
+                    ]
+                else:
+                    # 写盘在线程中完成；确认之前不再读取下一条消息，形成背压。
+                    rejected = await asyncio.to_thread(accept_frames, frames)
+                await websocket.send_json(
+                    {
+                        "type": "ack",
+                        "sequence": frames[-1].sequence,
+                        "accepted": len(frames) - len(rejected),
+                        "rejected": rejected,
+                    }
+                )
+        except WebSocketDisconnect:
+            return
+
+    @router.get("/api/sessions/{session_id}/audio")
+    async def export_session_audio(
+        session_id: str,
+        layout: str = Query("mix", pattern="^(mix|split)$"),
+        codec: str = Query("wav", pattern="^(wav|opus|flac)$"),
+    ) -> StreamingResponse:
+        try:
+            sources = await asyncio.to_thread(ingress.session_audio, session_id)
+        except NativeAudioValidationError as error:
+            raise HTTPException(status_code=422, detail=str(error)) from error
+        if not any(
+            entry.length for entries in sources.values() for entry, _ in entries
+        ):
+            raise HTTPException(status_code=404, detail="会话没有录音")
+        try:
+            plan = plan_session_audio(sources, layout)
+        except AudioExportError as error:
+            raise HTTPException(status_code=409, detail=str(error)) from error
+
+        if codec == "wav":
+            # 同步生成器由 Starlette 放到线程池里逐块读取，内存只占一个块。
+            return StreamingResponse(
+                iter_wav(plan),
+                media_type="audio/wav",
+                headers={
+                    "Content-Length": str(len(plan.wav_header()) + plan.data_bytes),
+                    "Content-Disposition": f'attachment; filename="{session_id}.wav"',
+                },
+            )
+        if not compression_available():
+            raise HTTPException(
+                status_code=503, detail="服务器未安装 ffmpeg，无法压缩音频"
+            )
+        _, media_type, extension = COMPRESSED_CODECS[codec]
+        return StreamingResponse(
+            iter_compressed(plan, codec),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="{session_id}.{extension}"'
+                ),
+            },
+        )
+
     return router
@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import Awaitable, Callable
 
 from fastapi import APIRouter, HTTPException
@@ -14,21 +15,21 @@ def build_native_recording_router(
 
     @router.post("/api/sessions/{session_id}/start-native-recording")
     async def start(session_id: str) -> dict[str, object]:
-        if not session_lookup(session_id):
+        if not await asyncio.to_thread(session_lookup, session_id):
             raise HTTPException(status_code=404, detail="会话不存在")
         await start_recording(session_id)
         return {"success": True, "capture": "native"}
 
     @router.post("/api/sessions/{session_id}/stop-native-recording")
     async def stop(session_id: str) -> dict[str, object]:
-        if not session_lookup(session_id):
+        if not await asyncio.to_thread(session_lookup, session_id):
             raise HTTPException(status_code=404, detail="会话不存在")
         await stop_recording(session_id)
         return {"success": True, "capture": "native"}
 
     @router.post("/api/sessions/{session_id}/pause-native-recording")
     async def pause(session_id: str) -> dict[str, object]:
-        session = session_lookup(session_id)
+        session = await asyncio.to_thread(session_lookup, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="会话不存在")
         if not getattr(session, "is_recording", False):
@@ -42,7 +43,7 @@ def build_native_recording_router(
 
     @router.post("/api/sessions/{session_id}/resume-native-recording")
     async def resume(session_id: str) -> dict[str, object]:
-        session = session_lookup(session_id)
+        session = await asyncio.to_thread(session_lookup, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="会话不存在")
         if not getattr(session, "is_recording", False):
@@ -1,22 +1,35 @@
+import asyncio
 import base64
 import binascii
 import json
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
 from pathlib import Path
 import uuid
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Request
 
-PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
-JPEG_SIGNATURE = b"\xff\xd8\xff"
+from services.screenshot_upload import (
+    JPEG_SIGNATURE,
+    MAX_SCREENSHOT_BYTES,
+    PNG_SIGNATURE,
+    SCREENSHOT_MIME_TYPES,
+    UPLOAD_WRITE_BYTES,
+    MultipartReader,
+    ScreenshotSink,
+    ScreenshotUploadError,
+    StoredScreenshot,
+)
+
+MAX_LOCAL_OCR_CHARS = 20_000
+STREAMED_CONTENT_TYPES = {"multipart/form-data", *SCREENSHOT_MIME_TYPES}
 
 
 def build_native_screenshot_router(
     session_lookup: Callable[[str], object],
     root: Path | Callable[[], Path],
     process_image: Callable[
-        [str, Path, str | None, str | None],
+        [str, Path, str | None, str | None, StoredScreenshot | None],
         Awaitable[dict[str, Any] | None],
     ],
 ) -> APIRouter:
@@ -27,9 +40,28 @@ def build_native_screenshot_router(
         session_id: str,
         request: Request,
     ) -> dict[str, object]:
-        if not session_lookup(session_id):
+        if not await asyncio.to_thread(session_lookup, session_id):
             raise HTTPException(status_code=404, detail="会话不存在")
         content_type = request.headers.get("Content-Type", "application/octet-stream")
+        storage_root = Path(root() if callable(root) else root)
+        session_dir = storage_root / session_id
+        if content_type.split(";")[0].strip() in STREAMED_CONTENT_TYPES:
+            # 流式上传：边收边写盘并计算摘要，内存只占一个网络块。
+            try:
+                stored, local_ocr_text, ocr_engine = await receive_streamed(
+                    request, content_type, session_dir
+                )
+            except ScreenshotUploadError as error:
+                raise HTTPException(
+                    status_code=error.status_code, detail=str(error)
+                ) from error
+            result = (
+                await process_image(
+                    session_id, stored.path, local_ocr_text, ocr_engine, stored
+                )
+                or {}
+            )
+            return {"success": True, "status": "analyzing", **result}
         raw_payload = await request.body()
         local_ocr_text: str | None = None
         ocr_engine: str | None = None
@@ -56,7 +88,7 @@ def build_native_screenshot_router(
             if raw_ocr_text is not None and not isinstance(raw_ocr_text, str):
                 raise HTTPException(status_code=422, detail="本地 OCR 文本无效")
             local_ocr_text = (raw_ocr_text or "").strip() or None
-            if local_ocr_text and len(local_ocr_text) > 20_000:
+            if local_ocr_text and len(local_ocr_text) > MAX_LOCAL_OCR_CHARS:
                 raise HTTPException(status_code=422, detail="本地 OCR 文本超过大小限制")
             raw_ocr_engine = envelope.get("ocr_engine")
             if local_ocr_text:
@@ -65,7 +97,7 @@ def build_native_screenshot_router(
                 ocr_engine = raw_ocr_engine
         else:
             payload = raw_payload
-        if len(payload) > 20 * 1024 * 1024:
+        if len(payload) > MAX_SCREENSHOT_BYTES:
             raise HTTPException(status_code=413, detail="截图超过大小限制")
 
         if content_type.startswith("image/png") and payload.startswith(PNG_SIGNATURE):
@@ -77,8 +109,6 @@ def build_native_screenshot_router(
         else:
             raise HTTPException(status_code=422, detail="只接受 PNG 或 JPEG 截图")
 
-        storage_root = Path(root() if callable(root) else root)
-        session_dir = storage_root / session_id
         session_dir.mkdir(parents=True, exist_ok=True)
         path = session_dir / f"{uuid.uuid4().hex}.{extension}"
         path.write_bytes(payload)
@@ -88,9 +118,87 @@ def build_native_screenshot_router(
                 path,
                 local_ocr_text,
                 ocr_engine,
+                None,
             )
             or {}
         )
         return {"success": True, "status": "analyzing", **result}
 
     return router
+
+
+async def receive_streamed(
+    request: Request, content_type: str, session_dir: Path
+) -> tuple[StoredScreenshot, str | None, str | None]:
+    media_type, _, parameters = content_type.partition(";")
+    media_type = media_type.strip()
+    if media_type != "multipart/form-data":
+        return (
+            await stream_to_sink(request.stream(), media_type, session_dir),
+            None,
+            None,
+        )
+
+    boundary = (
+        dict(
+            item.strip().split("=", 1) for item in parameters.split(";") if "=" in item
+        )
+        .get("boundary", "")
+        .strip('"')
+    )
+    if not boundary:
+        raise ScreenshotUploadError("multipart 缺少 boundary")
+    reader = MultipartReader(request.stream(), boundary)
+    stored: StoredScreenshot | None = None
+    fields: dict[str, str] = {}
+    try:
+        while (headers := await reader.next_part()) is not None:
+            name = reader.part_name(headers)
+            if name == "image" and stored is None:
+                stored = await stream_to_sink(
+                    reader.read(),
+                    headers.get("content-type", "").split(";")[0].strip(),
+                    session_dir,
+                )
+            elif name in {"local_ocr_text", "ocr_engine"}:
+                fields[name] = await reader.read_text(4 * MAX_LOCAL_OCR_CHARS)
+        if stored is None:
+            raise ScreenshotUploadError("multipart 缺少 image 字段")
+        local_ocr_text = fields.get("local_ocr_text", "").strip() or None
+        if local_ocr_text and len(local_ocr_text) > MAX_LOCAL_OCR_CHARS:
+            raise ScreenshotUploadError("本地 OCR 文本超过大小限制")
+        ocr_engine = fields.get("ocr_engine")
+        if local_ocr_text and ocr_engine != "apple_vision":
+            raise ScreenshotUploadError("本地 OCR 来源无效")
+    except BaseException:
+        if stored is not None:
+            stored.path.unlink(missing_ok=True)
+        raise
+    return stored, local_ocr_text, ocr_engine if local_ocr_text else None
+
+
+async def stream_to_sink(
+    chunks: AsyncIterator[bytes], mime_type: str, session_dir: Path
+) -> StoredScreenshot:
+    if mime_type not in SCREENSHOT_MIME_TYPES:
+        raise ScreenshotUploadError("只接受 PNG 或 JPEG 截图")
+    # 建目录、写盘和关闭文件都放到线程里，不阻塞事件循环
+    sink = await asyncio.to_thread(
+        ScreenshotSink,
+        session_dir / f"{uuid.uuid4().hex}.{SCREENSHOT_MIME_TYPES[mime_type]}",
+        mime_type,
+    )
+    pending = bytearray()
+    try:
+        async for chunk in chunks:
+            pending += chunk
+            # 第一块立即写入，让签名检查尽早拒绝非图片内容
+            if len(pending) >= UPLOAD_WRITE_BYTES or sink.size < 24:
+                await asyncio.to_thread(sink.write, bytes(pending))
+                pending.clear()
+        if pending:
+            await asyncio.to_thread(sink.write, bytes(pending))
+        return await asyncio.to_thread(sink.finish)
+    except BaseException:
+        sink.discard()
+        raise
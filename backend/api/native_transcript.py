@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import Awaitable, Callable
 from datetime import datetime
 from typing import Literal
@@ -48,7 +49,7 @@ def build_native_transcript_router(
         session_id: str,
         transcript: NativeTranscript,
     ) -> dict[str, object]:
-        if not session_lookup(session_id):
+        if not await asyncio.to_thread(session_lookup, session_id):
             raise HTTPException(status_code=404, detail="会话不存在")
         payload = transcript.model_dump(mode="json")
         if not await dispatch(session_id, payload):
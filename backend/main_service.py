@@ -6,19 +6,39 @@ PromptMeet FastAPI 主服务
 import asyncio
 import uuid
 from datetime import UTC, datetime
-from typing import Optional
+from typing import Callable, Optional
 import json
 import logging
 import os
+import time
+import zlib
 from contextlib import asynccontextmanager
 from pathlib import Path
-from types import SimpleNamespace
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import (
+    FastAPI,
+    WebSocket,
+    WebSocketDisconnect,
+    HTTPException,
+    Query,
+    Request,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    ORJSONResponse,
+    Response,
+    StreamingResponse,
+)
 from pydantic import BaseModel, Field, field_validator
 import uvicorn
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from dotenv import load_dotenv
 
 load_dotenv(os.getenv("PROMPTMEET_ENV_FILE") or None, override=False)
@@ -32,7 +52,11 @@ from models.data_models import (  # noqa: E402
     MessageType,
     IPCCommand,
 )
-from services.session_manager import SessionManager  # noqa: E402
+from services.session_manager import (  # noqa: E402
+    SessionManager,
+    SQLiteSessionBackend,
+)
+from services.event_bus import SQLiteEventBus  # noqa: E402
 from services.websocket_manager import WebSocketManager  # noqa: E402
 from services.process_manager import ProcessManager  # noqa: E402
 from services.native_audio_ingress import NativeAudioIngress  # noqa: E402
@@ -45,15 +69,32 @@ from services.meeting_repository import (
     MeetingRepository,
 )  # noqa: E402
 from services.meeting_title_service import MeetingTitleService  # noqa: E402
+from services.suggestion_engine import (  # noqa: E402
+    SpeculativeSuggestionEngine,
+    suggestion_context_item,
+)
+from services.summary_scheduler import MilestoneSummaryScheduler  # noqa: E402
+from services.screenshot_upload import StoredScreenshot  # noqa: E402
+from services.image_preparation import VisionImagePreparer  # noqa: E402
+from services.asset_executor import (  # noqa: E402
+    AssetExecutor,
+    AssetExecutorOverloaded,
+)
+from services.http_compression import CompressionMiddleware  # noqa: E402
+from services.meeting_export import EXPORT_FORMATS, iter_export  # noqa: E402
+from services.perceptual_hash import (  # noqa: E402
+    NEAR_DUPLICATE_DISTANCE,
+    difference_hash,
+    previous_near_duplicate_analysis,
+)
 from models.meeting_context import (  # noqa: E402
     EventKind,
-    AnswerPayload,
     MeetingEvent,
+    MeetingEventPage,
     MeetingRecord,
     MeetingStatus,
     ScreenshotAnalysisPayload,
     ScreenshotPayload,
-    QuestionPayload,
     SummaryPayload,
     TranscriptPayload,
 )
@@ -86,10 +127,27 @@ async def lifespan(app: FastAPI):
     logger.info("PromptMeet 服务启动完成")
     if not db_storage.initialize_database():
         logger.error("数据库初始化失败!")
+    heartbeat = asyncio.create_task(
+        websocket_manager.run_heartbeat(
+            WEBSOCKET_HEARTBEAT_INTERVAL, WEBSOCKET_HEARTBEAT_TIMEOUT
+        ),
+        name="websocket-heartbeat",
+    )
+    bus = asyncio.create_task(websocket_manager.run_bus(), name="websocket-bus")
+    audio_flush = asyncio.create_task(
+        native_audio_ingress.run_flush(), name="native-audio-flush"
+    )
     yield  # 应用运行期间
 
     # 关闭时清理资源
     logger.info("PromptMeet 服务正在关闭...")
+    heartbeat.cancel()
+    bus.cancel()
+    audio_flush.cancel()
+    summary_scheduler.shutdown()
+    suggestion_engine.shutdown()
+    native_audio_ingress.close()
+    asset_executor.shutdown()
     await process_manager.cleanup()
     logger.info("PromptMeet 服务已关闭")
 
@@ -109,10 +167,37 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 大于阈值的 JSON/文本响应按客户端支持压缩（安装了 brotli 时优先 br），流式响应不压缩
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("PROMPTMEET_COMPRESS_MIN_BYTES", "1024")),
+)
+# 旧版 /db/* 接口可选用 orjson 编码
+LEGACY_JSON_RESPONSE = (
+    ORJSONResponse
+    if os.getenv("PROMPTMEET_LEGACY_JSON") == "orjson" and orjson is not None
+    else JSONResponse
+)
+
+# 多 worker 部署（uvicorn --workers N）时把会话状态和 WebSocket 广播放到共享的 SQLite 文件里；
+# 不设置时保持单进程内存实现
+SHARED_STATE_PATH = os.getenv("PROMPTMEET_SHARED_STATE_PATH")
 
 # 全局管理器实例
-session_manager = SessionManager()
-websocket_manager = WebSocketManager()
+session_manager = SessionManager(
+    SQLiteSessionBackend(SHARED_STATE_PATH) if SHARED_STATE_PATH else None
+)
+websocket_manager = WebSocketManager(
+    max_queue=int(os.getenv("PROMPTMEET_WS_QUEUE_SIZE", "256")),
+    overflow_policy=os.getenv("PROMPTMEET_WS_OVERFLOW_POLICY", "coalesce"),
+    delta_interval_ms=int(os.getenv("PROMPTMEET_WS_DELTA_INTERVAL_MS", "50")),
+    delta_max_chars=int(os.getenv("PROMPTMEET_WS_DELTA_MAX_CHARS", "512")),
+    legacy_messages=os.getenv("PROMPTMEET_WS_LEGACY_MESSAGES", "1") != "0",
+    bus=SQLiteEventBus(SHARED_STATE_PATH) if SHARED_STATE_PATH else None,
+)
+# 每隔 interval 秒发一次 ping；写入阻塞或 ping 未回应超过 timeout 秒的连接会被回收
+WEBSOCKET_HEARTBEAT_INTERVAL = float(os.getenv("PROMPTMEET_WS_PING_INTERVAL", "20"))
+WEBSOCKET_HEARTBEAT_TIMEOUT = float(os.getenv("PROMPTMEET_WS_PING_TIMEOUT", "60"))
 process_manager = ProcessManager()
 meeting_data_root = Path(
     os.getenv("PROMPTMEET_DATA_DIR") or process_manager.work_dir / "meeting_data"
@@ -128,7 +213,39 @@ desktop_agent_service = (
     DesktopAgentService(assets_root=meeting_repository.root) if DESKTOP_MODE else None
 )
 desktop_summary_service = OriginalSummaryService() if DESKTOP_MODE else None
-native_audio_ingress = NativeAudioIngress(process_manager.work_dir / "native_audio")
+native_audio_ingress = NativeAudioIngress(
+    process_manager.work_dir / "native_audio",
+    spool=os.getenv("PROMPTMEET_NATIVE_AUDIO_SPOOL", "1") != "0",
+    vad_mode=os.getenv("PROMPTMEET_NATIVE_AUDIO_VAD", "mark"),
+    shared=bool(SHARED_STATE_PATH),
+)
+# 截图入库、感知哈希和缩略图使用独立线程池，不与默认线程池里的其他任务争抢。
+asset_executor = AssetExecutor(
+    workers=int(os.getenv("PROMPTMEET_ASSET_WORKERS", "2")),
+    max_queue=int(os.getenv("PROMPTMEET_ASSET_QUEUE", "32")),
+)
+ASSET_THUMBNAILS = {
+    size: VisionImagePreparer(max_dimension=size, quality=75, image_format="webp")
+    for size in (160, 320, 640)
+}
+ASSET_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# 增量同步每页最多返回的事件数
+MEETING_EVENT_PAGE_LIMIT = 1000
+# 负数表示关闭近似截图复用
+SCREENSHOT_NEAR_DUPLICATE_DISTANCE = int(
+    os.getenv(
+        "PROMPTMEET_SCREENSHOT_NEAR_DUPLICATE_DISTANCE", str(NEAR_DUPLICATE_DISTANCE)
+    )
+)
+SUMMARY_STREAMING = os.getenv("PROMPTMEET_SUMMARY_STREAMING", "1") != "0"
+# 流式摘要正文每次都是完整前缀，按固定间隔只推最新一份，和回答增量攒批的默认间隔一致
+SUMMARY_PARTIAL_INTERVAL = (
+    int(os.getenv("PROMPTMEET_SUMMARY_PARTIAL_INTERVAL_MS", "50")) / 1000
+)
+SUMMARY_MILESTONE_MINUTES = float(
+    os.getenv("PROMPTMEET_SUMMARY_MILESTONE_MINUTES", "5") or 0
+)
+SPECULATIVE_SUGGESTIONS = os.getenv("PROMPTMEET_SPECULATIVE_SUGGESTIONS", "1") != "0"
 
 
 class MeetingQuestionRequest(BaseModel):
@@ -198,9 +315,62 @@ meeting_screenshot_tasks: set[asyncio.Task] = set()
 question_generation_tasks: dict[str, asyncio.Task] = {}
 latest_question_generations: dict[str, tuple[str, int]] = {}
 summary_generation_locks: dict[str, asyncio.Lock] = {}
+# 跨 worker 的摘要生成租约：持有者崩溃后最多阻塞这么久
+SUMMARY_LEASE_SECONDS = 300.0
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
 meeting_title_tasks: dict[str, asyncio.Task] = {}
 meeting_translation_tasks: dict[tuple[str, str], asyncio.Task] = {}
 meeting_translation_retry_keys: set[tuple[str, str]] = set()
+summary_scheduler = MilestoneSummaryScheduler(
+    lambda session_id, minutes: run_milestone_summary(session_id, minutes),
+    interval_seconds=(
+        SUMMARY_MILESTONE_MINUTES * 60 if SUMMARY_MILESTONE_MINUTES > 0 else 300.0
+    ),
+)
+suggestion_engine = SpeculativeSuggestionEngine(
+    lambda context: speculate_suggestions(context),
+    min_events=int(os.getenv("PROMPTMEET_SUGGESTION_MIN_EVENTS", "3")),
+    min_tokens=int(os.getenv("PROMPTMEET_SUGGESTION_MIN_TOKENS", "120")),
+    debounce_seconds=float(os.getenv("PROMPTMEET_SUGGESTION_DEBOUNCE_SECONDS", "2")),
+    min_interval_seconds=float(
+        os.getenv("PROMPTMEET_SUGGESTION_MIN_INTERVAL_SECONDS", "20")
+    ),
+)
+
+
+def start_summary_milestones(
+    session_id: str, record: MeetingRecord | None = None
+) -> None:
+    if (
+        not DESKTOP_MODE
+        or desktop_agent_service is None
+        or SUMMARY_MILESTONE_MINUTES <= 0
+    ):
+        return
+    has_new_input = False
+    if not summary_scheduler.tracks(session_id):
+        # 服务重启或会话恢复后，记录里可能已有尚未被摘要覆盖的输入
+        if record is None:
+            record = meeting_repository.get(session_id)
+        has_new_input = record is not None and bool(summary_sources(record)[3])
+    summary_scheduler.start(session_id, has_new_input=has_new_input)
+
+
+async def apply_remote_recording_change(session_id: str, message: dict) -> None:
+    # 暂停、恢复和结束可能由其他 worker 处理：同步本进程的里程碑计时、
+    # 预生成建议和音频写入，避免会议结束后仍按本进程的计时器生成摘要
+    kind = message.get("type")
+    if kind == MessageType.AUDIO_STOP:
+        summary_scheduler.stop(session_id)
+        suggestion_engine.forget(session_id)
+        await asyncio.to_thread(native_audio_ingress.close, session_id)
+    elif kind == "audio_pause":
+        summary_scheduler.pause(session_id)
+    elif kind == "audio_resume" and summary_scheduler.tracks(session_id):
+        start_summary_milestones(session_id)
+
+
+websocket_manager.on_remote_message(apply_remote_recording_change)
 
 
 def finish_question_task(task: asyncio.Task) -> None:
@@ -272,10 +442,53 @@ def schedule_meeting_title_generation(meeting_id: str) -> None:
     task.add_done_callback(finish_title_task)
 
 
+# 录音状态切换都在 session_manager.mutate 里先检查再修改，
+# 并发请求（包括其他 worker 上的）只有一个能完成同一次切换
+def begin_recording(session: SessionState) -> bool:
+    if session.is_recording:
+        return False
+    session.is_recording = True
+    session.is_paused = False
+    return True
+
+
+def end_recording(session: SessionState) -> bool:
+    if not session.is_recording:
+        return False
+    session.is_recording = False
+    session.is_paused = False
+    session.end_time = datetime.now()
+    return True
+
+
+def pause_recording(session: SessionState) -> bool:
+    if not session.is_recording or session.is_paused:
+        return False
+    session.is_paused = True
+    return True
+
+
+def resume_recording(session: SessionState) -> bool:
+    if not session.is_recording or not session.is_paused:
+        return False
+    session.is_paused = False
+    return True
+
+
+def reset_recording(session: SessionState) -> None:
+    session.is_recording = False
+    session.is_paused = False
+
+
+async def change_recording(
+    session_id: str, change: Callable[[SessionState], bool | None]
+) -> bool:
+    return (
+        await asyncio.to_thread(session_manager.mutate, session_id, change) is not None
+    )
+
+
 async def start_native_recording(session_id: str) -> None:
-    session = session_manager.get_session(session_id)
-    if not session or session.is_recording:
-        return
     if DESKTOP_MODE:
         record = meeting_repository.get(session_id)
         if (
@@ -284,11 +497,15 @@ async def start_native_recording(session_id: str) -> None:
             or record.ended_at is not None
         ):
             return
+    if not await change_recording(session_id, begin_recording):
+        return
     if not DESKTOP_MODE:
-        await process_manager.start_question_process(session_id)
-    session.is_recording = True
-    session.is_paused = False
-    session_manager.update_session(session)
+        try:
+            await process_manager.start_question_process(session_id)
+        except BaseException:
+            await asyncio.to_thread(session_manager.mutate, session_id, reset_recording)
+            raise
+    start_summary_milestones(session_id)
     await websocket_manager.broadcast_to_session(
         session_id,
         {
@@ -301,15 +518,13 @@ async def start_native_recording(session_id: str) -> None:
 
 
 async def stop_native_recording(session_id: str) -> None:
-    session = session_manager.get_session(session_id)
-    if not session or not session.is_recording:
+    if not await change_recording(session_id, end_recording):
         return
     if not DESKTOP_MODE:
         await process_manager.stop_question_process(session_id)
-    session.is_recording = False
-    session.is_paused = False
-    session.end_time = datetime.now()
-    session_manager.update_session(session)
+    summary_scheduler.stop(session_id)
+    suggestion_engine.forget(session_id)
+    native_audio_ingress.close(session_id)
     try:
         meeting_ingestion.finish(session_id, MeetingStatus.COMPLETED)
     except MeetingNotFoundError:
@@ -329,11 +544,9 @@ async def stop_native_recording(session_id: str) -> None:
 
 
 async def pause_native_recording(session_id: str) -> None:
-    session = session_manager.get_session(session_id)
-    if not session or not session.is_recording or session.is_paused:
+    if not await change_recording(session_id, pause_recording):
         return
-    session.is_paused = True
-    session_manager.update_session(session)
+    summary_scheduler.pause(session_id)
     event = meeting_ingestion.recording_activity(session_id, "录音已暂停")
     await broadcast_meeting_event(session_id, event)
     await websocket_manager.broadcast_to_session(
@@ -348,11 +561,9 @@ async def pause_native_recording(session_id: str) -> None:
 
 
 async def resume_native_recording(session_id: str) -> None:
-    session = session_manager.get_session(session_id)
-    if not session or not session.is_recording or not session.is_paused:
+    if not await change_recording(session_id, resume_recording):
         return
-    session.is_paused = False
-    session_manager.update_session(session)
+    start_summary_milestones(session_id)
     event = meeting_ingestion.recording_activity(session_id, "录音已恢复")
     await broadcast_meeting_event(session_id, event)
     await websocket_manager.broadcast_to_session(
@@ -366,41 +577,134 @@ async def resume_native_recording(session_id: str) -> None:
     )
 
 
+def observe_suggestion_evidence(session_id: str, event: MeetingEvent) -> None:
+    if not DESKTOP_MODE or not SPECULATIVE_SUGGESTIONS or desktop_agent_service is None:
+        return
+    if not suggestion_engine.tracks(session_id):
+        # 未跟踪的会议先看轻量的头部文件判断状态，只有进行中的会议才读取整份记录补齐上下文，
+        # 之后只做增量更新。
+        try:
+            header = meeting_repository.header(session_id)
+        except MeetingNotFoundError:
+            return
+        if header.status != MeetingStatus.ACTIVE:
+            return
+        record = meeting_repository.get(session_id)
+        if record is None or record.status != MeetingStatus.ACTIVE:
+            return
+        suggestion_engine.seed(
+            session_id,
+            (item for item in record.events if item.sequence < event.sequence),
+        )
+    suggestion_engine.observe(session_id, event)
+
+
+def meeting_event_message(session_id: str, event: MeetingEvent) -> dict:
+    return {
+        "type": "meeting_event",
+        "data": event.model_dump(mode="json"),
+        "timestamp": datetime.now(UTC).isoformat(),
+        "session_id": session_id,
+    }
+
+
 async def broadcast_meeting_event(session_id: str, event: MeetingEvent) -> None:
+    observe_suggestion_evidence(session_id, event)
     await websocket_manager.broadcast_to_session(
-        session_id,
-        {
-            "type": "meeting_event",
-            "data": event.model_dump(mode="json"),
-            "timestamp": datetime.now(UTC).isoformat(),
-            "session_id": session_id,
-        },
+        session_id, meeting_event_message(session_id, event)
     )
 
 
+async def replay_meeting_events(
+    websocket: WebSocket, session_id: str, since_sequence: int
+) -> None:
+    # 先暂停实时推送，补发 since_sequence 之后的事件，再切回实时事件，保证顺序且不重复。
+    websocket_manager.hold(websocket)
+    replay = []
+    replayed_through = since_sequence
+    last_sequence = since_sequence
+    try:
+        while True:
+            events, last_sequence = await asyncio.to_thread(
+                meeting_repository.events_after,
+                session_id,
+                replayed_through,
+                MEETING_EVENT_PAGE_LIMIT,
+            )
+            replay.extend(meeting_event_message(session_id, event) for event in events)
+            if not events:
+                break
+            replayed_through = events[-1].sequence
+        replay.append(
+            {
+                "type": "replay_complete",
+                "data": {
+                    "since_sequence": since_sequence,
+                    "last_sequence": max(last_sequence, replayed_through),
+                    "replayed": len(replay),
+                },
+            }
+        )
+    except (MeetingNotFoundError, ValueError):
+        replay = [
+            {"type": "error", "data": {"scope": "resume", "message": "会议不存在"}}
+        ]
+    finally:
+        websocket_manager.release(websocket, replay, replayed_through)
+
+
 async def process_native_screenshot(
     session_id: str,
     image_path,
     local_ocr_text: str | None = None,
     ocr_engine: str | None = None,
+    upload: StoredScreenshot | None = None,
 ) -> dict:
     mime_type = (
         "image/jpeg"
         if Path(image_path).suffix.lower() in {".jpg", ".jpeg"}
         else "image/png"
     )
-    try:
-        loop = asyncio.get_running_loop()
-        event = await loop.run_in_executor(
-            None,
-            lambda: meeting_ingestion.screenshot(
+    # 流式上传已经在写盘时算好摘要和尺寸，入库时不必再读一遍文件。
+    digest = (
+        {"sha256": upload.sha256, "width": upload.width, "height": upload.height}
+        if upload is not None
+        else {}
+    )
+    asset_id = Path(image_path).stem
+
+    def store_screenshot() -> MeetingEvent:
+        assets = meeting_repository.screenshot_assets
+        asset = assets.adopt(
+            Path(image_path), session_id, asset_id, digest.get("sha256")
+        )
+        try:
+            # 入库时已经算过摘要（旧版 JSON 上传在 adopt 里计算），这里直接沿用
+            return meeting_ingestion.screenshot(
                 session_id,
-                Path(image_path),
+                asset.path,
                 mime_type,
                 local_ocr_text=local_ocr_text,
                 ocr_engine=ocr_engine,
-            ),
-        )
+                asset_id=asset_id,
+                perceptual_hash=difference_hash(asset.path),
+                sha256=asset.sha256,
+                width=digest.get("width"),
+                height=digest.get("height"),
+            )
+        except BaseException:
+            assets.forget(session_id, asset_id)
+            raise
+
+    try:
+        event = await asset_executor.run(store_screenshot)
+    except AssetExecutorOverloaded as error:
+        Path(image_path).unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=error.status_code,
+            detail=str(error),
+            headers={"Retry-After": str(error.retry_after)},
+        ) from error
     except (FileNotFoundError, MeetingNotFoundError, ValueError):
         if DESKTOP_MODE:
             raise HTTPException(
@@ -408,6 +712,7 @@ async def process_native_screenshot(
                 detail="会议记录不可用，截图无法保存和处理",
             ) from None
         raise
+    summary_scheduler.mark_input(session_id)
     await broadcast_meeting_event(session_id, event)
     if DESKTOP_MODE:
         task = asyncio.create_task(
@@ -419,7 +724,10 @@ async def process_native_screenshot(
         return {"event": event.model_dump(mode="json")}
     if session_id in process_manager.image_processes:
         await process_manager.stop_image_process(session_id)
-    await process_manager.start_image_process(session_id, image_path=str(image_path))
+    await process_manager.start_image_process(
+        session_id,
+        image_path=str(meeting_repository.root / event.payload.relative_path),
+    )
     return {"event": event.model_dump(mode="json")}
 
 
@@ -427,25 +735,55 @@ async def analyze_native_screenshot(session_id: str, event: MeetingEvent) -> Non
     payload = event.payload
     if not isinstance(payload, ScreenshotPayload):
         return
-    try:
-        if desktop_agent_service is None:
-            raise RuntimeError("AI 服务不可用")
+    assets = meeting_repository.screenshot_assets
+    # 同一张图片或与上一张近似的截图已经分析过时直接复用结果，并在来源里记下原分析事件。
+    cached = assets.analysis(payload.sha256)
+    exact_match = cached is not None
+    if cached is None and payload.perceptual_hash:
         record = meeting_repository.get(session_id)
-        if record is None:
-            raise MeetingNotFoundError(session_id)
-        result = await desktop_agent_service.analyze_screenshot(record, event)
-    except Exception:
+        if record is not None:
+            cached = previous_near_duplicate_analysis(
+                record, event, SCREENSHOT_NEAR_DUPLICATE_DISTANCE
+            )
+    if cached is not None:
         result = ScreenshotAnalysisResult(
-            status="failed",
-            text="截图分析失败。请检查截图分析工作流的提供方、模型和视觉能力配置。",
-            vision_used=False,
-            evidence_kind="none",
+            status=cached.payload.status,
+            text=cached.payload.text,
+            vision_used=cached.payload.vision_used,
+            provider=cached.provenance.provider,
+            model=cached.provenance.model,
+            evidence_kind=cached.payload.evidence_kind or "none",
+            image_rejection=cached.payload.image_rejection,
+            reused_from=cached.event_id,
         )
+    else:
+        try:
+            if desktop_agent_service is None:
+                raise RuntimeError("AI 服务不可用")
+            record = meeting_repository.get(session_id)
+            if record is None:
+                raise MeetingNotFoundError(session_id)
+            result = await desktop_agent_service.analyze_screenshot(record, event)
+        except Exception:
+            result = ScreenshotAnalysisResult(
+                status="failed",
+                text="截图分析失败。请检查截图分析工作流的提供方、模型和视觉能力配置。",
+                vision_used=False,
+                evidence_kind="none",
+            )
     analysis_event = meeting_ingestion.screenshot_analysis(
         session_id,
         payload.asset_id,
         result,
     )
+    if not exact_match:
+        assets.record_analysis(
+            payload.sha256,
+            analysis_event.event_id,
+            analysis_event.payload,
+            analysis_event.provenance,
+        )
+    summary_scheduler.mark_input(session_id)
     await broadcast_meeting_event(session_id, analysis_event)
     await websocket_manager.broadcast_to_session(
         session_id,
@@ -560,18 +898,18 @@ async def translate_native_transcript(
 
 
 app.include_router(
-    build_native_audio_router(session_manager.get_session, native_audio_ingress)
+    build_native_audio_router(session_manager.get_session_state, native_audio_ingress)
 )
 app.include_router(
     build_native_screenshot_router(
-        session_manager.get_session,
+        session_manager.get_session_state,
         lambda: meeting_repository.assets_directory,
         process_native_screenshot,
     )
 )
 app.include_router(
     build_native_recording_router(
-        session_manager.get_session,
+        session_manager.get_session_state,
         start_native_recording,
         pause_native_recording,
         resume_native_recording,
@@ -580,7 +918,7 @@ app.include_router(
 )
 app.include_router(
     build_native_transcript_router(
-        session_manager.get_session,
+        session_manager.get_session_state,
         process_native_transcript,
     )
 )
@@ -600,6 +938,9 @@ async def health_check():
         "connected_clients": len(websocket_manager.connections),
         "storage": getattr(db_storage, "backend_name", "mysql"),
         "desktop_mode": DESKTOP_MODE,
+        "server_summary_milestones": DESKTOP_MODE and SUMMARY_MILESTONE_MINUTES > 0,
+        "asset_processing": asset_executor.metrics(),
+        "websocket": websocket_manager.metrics(),
     }
     if DESKTOP_MODE and desktop_agent_service is not None:
         result["ai"] = desktop_agent_service.provider_status()
@@ -675,11 +1016,14 @@ async def create_session(request: SessionCreateRequest | None = None):
             is_active = False
         else:
             raise HTTPException(status_code=409, detail="会议状态不支持恢复")
-    existing_session = session_manager.get_session(session_id)
+    existing_session = await asyncio.to_thread(
+        session_manager.get_session_state, session_id
+    )
     if existing_session is not None:
         return {"success": True, "session_id": session_id, "message": "会话已存在"}
     if existing_record is not None:
-        restore_session_from_record(
+        await asyncio.to_thread(
+            restore_session_from_record,
             existing_record,
             is_recording=is_active,
             is_paused=False,
@@ -704,7 +1048,7 @@ async def create_session(request: SessionCreateRequest | None = None):
         audio_file_path=None,
     )
 
-    session_manager.add_session(session)
+    await asyncio.to_thread(session_manager.add_session, session)
     meeting_ingestion.start(session_id, session.start_time)
     logger.info("收到创建会话请求")
     # 启动Agent进程
@@ -716,13 +1060,60 @@ async def create_session(request: SessionCreateRequest | None = None):
 
 
 @app.get("/api/sessions/{session_id}")
-async def get_session(session_id: str):
-    """获取会话状态"""
-    session = session_manager.get_session(session_id)
+async def get_session(
+    session_id: str,
+    request: Request,
+    after_segment: int | None = Query(None, ge=0),
+):
+    """获取会话状态；带 If-None-Match 时未变化返回 304，带 after_segment 时只返回新增转录片段"""
+    session = await asyncio.to_thread(session_manager.get_session, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
 
-    return {"success": True, "session": session.model_dump(mode="json")}
+    # 取会议记录修改时间要访问磁盘，放到线程里，不阻塞事件循环
+    etag = await asyncio.to_thread(session_etag, session)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if after_segment is None:
+        return JSONResponse(
+            {"success": True, "session": session.model_dump(mode="json")},
+            headers=headers,
+        )
+    segments = session.transcript_segments
+    data = session.model_dump(mode="json", exclude={"transcript_segments"})
+    data["transcript_segments"] = [
+        segment.model_dump(mode="json") for segment in segments[after_segment:]
+    ]
+    return JSONResponse(
+        {
+            "success": True,
+            "session": data,
+            "after_segment": after_segment,
+            "segment_count": len(segments),
+        },
+        headers=headers,
+    )
+
+
+def session_etag(session: SessionState) -> str:
+    try:
+        sequence, modified = meeting_repository.revision(session.session_id)
+    except (MeetingNotFoundError, ValueError):
+        sequence, modified = 0, 0
+    # 会话里不在会议记录中的字段（录音状态、旧版 OCR 结果等）只取长度和标量，避免每次序列化整份会话。
+    state = (
+        modified,
+        session.is_recording,
+        session.is_paused,
+        session.end_time,
+        len(session.transcript_segments),
+        len(session.image_ocr_result),
+        session.current_summary.generated_at if session.current_summary else None,
+        session.participant_count,
+        session.audio_file_path,
+    )
+    return f'"s{sequence}-{zlib.crc32(repr(state).encode()):08x}"'
 
 
 @app.post("/api/sessions/{session_id}/rehydrate")
@@ -732,11 +1123,14 @@ async def rehydrate_session(session_id: str, request: SessionRehydrateRequest):
         raise HTTPException(status_code=404, detail="会议持久记录不存在")
     if record.status != MeetingStatus.ACTIVE or record.ended_at is not None:
         raise HTTPException(status_code=409, detail="仅可恢复仍在进行的会议")
-    restore_session_from_record(
+    await asyncio.to_thread(
+        restore_session_from_record,
         record,
         is_recording=True,
         is_paused=request.is_paused,
     )
+    if not request.is_paused:
+        start_summary_milestones(session_id, record)
     return {"success": True, "session_id": session_id, "rehydrated": True}
 
 
@@ -789,7 +1183,6 @@ def restore_session_from_record(
             break
         except ValueError:
             continue
-    existing = session_manager.get_session(session_id)
     restored = SessionState(
         session_id=session_id,
         is_recording=is_recording,
@@ -798,20 +1191,37 @@ def restore_session_from_record(
         end_time=None if is_recording else record.ended_at,
         transcript_segments=transcript_segments,
         current_summary=current_summary,
-        participant_count=existing.participant_count if existing else 0,
-        audio_file_path=existing.audio_file_path if existing else None,
     )
-    if existing is None:
+    if session_manager.get_session_state(session_id) is None and (
         session_manager.add_session(restored)
-    else:
-        session_manager.update_session(restored)
-    return restored
+    ):
+        return restored
+
+    # 已有会话时只覆盖能从记录恢复的字段，参会人数和音频路径保留当前值
+    def restore(session: SessionState) -> None:
+        for field in (
+            "is_recording",
+            "is_paused",
+            "start_time",
+            "end_time",
+            "current_summary",
+        ):
+            setattr(session, field, getattr(restored, field))
+
+    session = session_manager.mutate(session_id, restore)
+    if session is None:
+        return restored
+    session_manager.replace_transcript(session_id, transcript_segments)
+    session.transcript_segments = transcript_segments
+    return session
 
 
 @app.post("/api/sessions/{session_id}/mark-incomplete")
 async def mark_session_incomplete(session_id: str):
     if meeting_repository.get(session_id) is None:
         raise HTTPException(status_code=404, detail="会话不存在")
+    summary_scheduler.stop(session_id)
+    suggestion_engine.forget(session_id)
     record = meeting_ingestion.finish(
         session_id,
         MeetingStatus.INCOMPLETE,
@@ -829,15 +1239,17 @@ async def mark_session_incomplete(session_id: str):
 @app.delete("/api/sessions/{session_id}")
 async def delete_session(session_id: str):
     """删除会话"""
-    session = session_manager.get_session(session_id)
+    session = await asyncio.to_thread(session_manager.get_session_state, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
 
     # 停止相关进程
     await process_manager.stop_session_processes(session_id)
+    summary_scheduler.stop(session_id)
+    suggestion_engine.forget(session_id)
 
     # 删除会话
-    session_manager.remove_session(session_id)
+    await asyncio.to_thread(session_manager.remove_session, session_id)
 
     logger.info(f"删除会话: {session_id}")
     return {"success": True, "message": "会话删除成功"}
@@ -846,11 +1258,12 @@ async def delete_session(session_id: str):
 @app.post("/api/sessions/{session_id}/start-recording")
 async def start_recording(session_id: str):
     """开始录音"""
-    session = session_manager.get_session(session_id)
+    session = await asyncio.to_thread(session_manager.get_session_state, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
 
-    if session.is_recording:
+    # 先原子地占用录音状态，避免并发请求重复启动进程
+    if not await change_recording(session_id, begin_recording):
         return {"success": False, "message": "会话已在录音中"}
 
     try:
@@ -860,10 +1273,6 @@ async def start_recording(session_id: str):
         # 启动 Question 生成进程
         await process_manager.start_question_process(session_id)
 
-        # 更新会话状态
-        session.is_recording = True
-        session_manager.update_session(session)
-
         # 通知前端
         await websocket_manager.broadcast_to_session(
             session_id,
@@ -880,17 +1289,18 @@ async def start_recording(session_id: str):
 
     except Exception as e:
         logger.error(f"启动录音失败: {e}")
+        await asyncio.to_thread(session_manager.mutate, session_id, reset_recording)
         return {"success": False, "message": f"录音启动失败: {str(e)}"}
 
 
 @app.post("/api/sessions/{session_id}/stop-recording")
 async def stop_recording(session_id: str):
     """停止录音"""
-    session = session_manager.get_session(session_id)
+    session = await asyncio.to_thread(session_manager.get_session_state, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
 
-    if not session.is_recording:
+    if not await change_recording(session_id, end_recording):
         return {"success": False, "message": "会话未在录音"}
 
     try:
@@ -900,10 +1310,6 @@ async def stop_recording(session_id: str):
         # 停止 Question 生成进程
         await process_manager.stop_question_process(session_id)
 
-        # 更新会话状态
-        session.is_recording = False
-        session_manager.update_session(session)
-
         # 通知前端
         await websocket_manager.broadcast_to_session(
             session_id,
@@ -923,6 +1329,34 @@ async def stop_recording(session_id: str):
         return {"success": False, "message": f"录音停止失败: {str(e)}"}
 
 
+def summary_sources(
+    record: MeetingRecord,
+) -> tuple[list[MeetingEvent], list[MeetingEvent], dict[str, int], list[MeetingEvent]]:
+    source_events = [
+        event
+        for event in record.events
+        if event.kind
+        in {
+            EventKind.TRANSCRIPT,
+            EventKind.SCREENSHOT,
+            EventKind.SCREENSHOT_ANALYSIS,
+        }
+    ]
+    previous_summaries = [
+        event
+        for event in record.events
+        if event.kind == EventKind.SUMMARY and isinstance(event.payload, SummaryPayload)
+    ]
+    source_progress = accumulated_summary_progress(previous_summaries, source_events)
+    uncovered_events = [
+        event
+        for event in source_events
+        if source_progress.get(event.event_id, 0)
+        < len(DesktopAgentService.summary_event_text(event))
+    ]
+    return source_events, previous_summaries, source_progress, uncovered_events
+
+
 def accumulated_summary_progress(
     summaries: list[MeetingEvent], source_events: list[MeetingEvent]
 ) -> dict[str, int]:
@@ -978,37 +1412,83 @@ def merge_incremental_summary(
     return generated.model_copy(update={"tasks": tasks})
 
 
+async def broadcast_summary_partial(
+    session_id: str,
+    update: dict,
+    request: SummaryGenerationRequest | None,
+) -> None:
+    await websocket_manager.broadcast_to_session(
+        session_id,
+        {
+            "type": MessageType.SUMMARY_PARTIAL,
+            "data": {
+                **update.get("data", {}),
+                "trigger": request.trigger if request else "manual",
+            },
+            "timestamp": datetime.now(UTC).isoformat(),
+            "session_id": session_id,
+        },
+    )
+
+
+class SummaryPartialThrottle:
+    """摘要正文按间隔合并为最新一份再推送；列表条目逐条推送，推送前先冲刷正文"""
+
+    def __init__(
+        self,
+        session_id: str,
+        request: SummaryGenerationRequest | None,
+        interval: float = SUMMARY_PARTIAL_INTERVAL,
+    ):
+        self.session_id = session_id
+        self.request = request
+        self.interval = interval
+        self.sent_at: float | None = None
+        self.pending: dict | None = None
+
+    async def __call__(self, update: dict) -> None:
+        if update.get("data", {}).get("field") != "summary_text":
+            await self.flush()
+            await broadcast_summary_partial(self.session_id, update, self.request)
+            return
+        self.pending = update
+        if self.sent_at is None or time.monotonic() - self.sent_at >= self.interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self.pending is None:
+            return
+        update, self.pending = self.pending, None
+        self.sent_at = time.monotonic()
+        await broadcast_summary_partial(self.session_id, update, self.request)
+
+
+@asynccontextmanager
+async def summary_generation_lock(session_id: str):
+    # 进程内先排队，再抢共享租约，避免两个 worker 对同一段内容重复生成摘要
+    async with summary_generation_locks.setdefault(session_id, asyncio.Lock()):
+        key = f"summary:{session_id}"
+        while not await asyncio.to_thread(
+            session_manager.acquire_lease, key, WORKER_ID, SUMMARY_LEASE_SECONDS
+        ):
+            await asyncio.sleep(0.25)
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(session_manager.release_lease, key, WORKER_ID)
+
+
 async def generate_desktop_summary(
     session_id: str,
-    session: SessionState,
     request: SummaryGenerationRequest | None,
 ) -> dict:
     record = meeting_repository.get(session_id)
     if record is None:
         raise HTTPException(status_code=404, detail="会议持久记录不存在")
-    source_events = [
-        event
-        for event in record.events
-        if event.kind
-        in {
-            EventKind.TRANSCRIPT,
-            EventKind.SCREENSHOT,
-            EventKind.SCREENSHOT_ANALYSIS,
-        }
-    ]
-    previous_summaries = [
-        event
-        for event in record.events
-        if event.kind == EventKind.SUMMARY and isinstance(event.payload, SummaryPayload)
-    ]
+    source_events, previous_summaries, source_progress, uncovered_events = (
+        summary_sources(record)
+    )
     source_by_id = {event.event_id: event for event in source_events}
-    source_progress = accumulated_summary_progress(previous_summaries, source_events)
-    uncovered_events = [
-        event
-        for event in source_events
-        if source_progress.get(event.event_id, 0)
-        < len(DesktopAgentService.summary_event_text(event))
-    ]
     if not uncovered_events:
         return {
             "success": True,
@@ -1025,9 +1505,15 @@ async def generate_desktop_summary(
         if latest_previous_summary is not None
         else uncovered_events
     )
-    result = await desktop_agent_service.summarize_meeting(
-        record, summary_inputs, source_progress
-    )
+    stream_summary = getattr(desktop_agent_service, "stream_meeting_summary", None)
+    if SUMMARY_STREAMING and stream_summary is not None:
+        partials = SummaryPartialThrottle(session_id, request)
+        result = await stream_summary(record, summary_inputs, source_progress, partials)
+        await partials.flush()
+    else:
+        result = await desktop_agent_service.summarize_meeting(
+            record, summary_inputs, source_progress
+        )
     latest_record = meeting_repository.get(session_id)
     if latest_record is None:
         raise HTTPException(status_code=404, detail="会议持久记录不存在")
@@ -1107,8 +1593,7 @@ async def generate_desktop_summary(
         provider=result.provider,
         model=result.model,
     )
-    session.current_summary = summary
-    session_manager.update_session(session)
+    await asyncio.to_thread(session_manager.update_summary, session_id, summary)
     await websocket_manager.broadcast_to_session(
         session_id,
         {
@@ -1127,13 +1612,38 @@ async def generate_desktop_summary(
     }
 
 
+async def run_milestone_summary(session_id: str, active_minutes: int) -> dict:
+    session = await asyncio.to_thread(session_manager.get_session_state, session_id)
+    if session is None or desktop_agent_service is None:
+        return {"success": False, "status": "no_action", "message": "会话不存在"}
+    # 其他 worker 可能已经暂停或结束了会议，而本进程没有收到通知
+    try:
+        header = await asyncio.to_thread(meeting_repository.header, session_id)
+    except MeetingNotFoundError:
+        header = None
+    if header is None or header.status != MeetingStatus.ACTIVE:
+        summary_scheduler.stop(session_id)
+        suggestion_engine.forget(session_id)
+        return {"success": False, "status": "no_action", "message": "会议已结束"}
+    if session.is_paused:
+        summary_scheduler.pause(session_id)
+        return {"success": False, "status": "no_action", "message": "录音已暂停"}
+    async with summary_generation_lock(session_id):
+        return await generate_desktop_summary(
+            session_id,
+            SummaryGenerationRequest(
+                trigger="milestone", active_minutes=active_minutes
+            ),
+        )
+
+
 @app.post("/api/sessions/{session_id}/generate-summary")
 async def generate_summary(
     session_id: str,
     request: SummaryGenerationRequest | None = None,
 ):
     """生成会议摘要"""
-    session = session_manager.get_session(session_id)
+    session = await asyncio.to_thread(session_manager.get_session, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
 
@@ -1142,9 +1652,8 @@ async def generate_summary(
 
     try:
         if DESKTOP_MODE and desktop_agent_service is not None:
-            lock = summary_generation_locks.setdefault(session_id, asyncio.Lock())
-            async with lock:
-                return await generate_desktop_summary(session_id, session, request)
+            async with summary_generation_lock(session_id):
+                return await generate_desktop_summary(session_id, request)
         await process_manager.start_summary_process(session_id)
 
         logger.info(f"会话 {session_id} 开始生成摘要")
@@ -1165,7 +1674,7 @@ async def generate_questions(
     request: QuestionGenerationRequest | None = None,
 ):
     """生成会议问题"""
-    session = session_manager.get_session(session_id)
+    session = await asyncio.to_thread(session_manager.get_session, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
 
@@ -1185,6 +1694,25 @@ async def generate_questions(
             previous = question_generation_tasks.get(session_id)
             if previous is not None and not previous.done():
                 previous.cancel()
+            speculative = None
+            if suggestion_engine.tracks(session_id):
+                # 客户端的 context_revision 是它自己的请求计数，不能和事件序号比较；
+                # 以记录里的最后一个事件序号为准，确认预生成时没有漏看事件。
+                try:
+                    last_sequence, _ = meeting_repository.revision(session_id)
+                except MeetingNotFoundError:
+                    last_sequence = None
+                speculative = suggestion_engine.take(session_id, last_sequence)
+            if speculative is not None:
+                # 上下文自预生成以来未变化，直接交付，不再等待模型。
+                return await publish_suggestions(
+                    session_id,
+                    request,
+                    generation_id,
+                    context_revision,
+                    [{"question": question} for question in speculative.questions],
+                    speculative=True,
+                )
             generation_task = asyncio.create_task(
                 desktop_agent_service.generate_questions(context),
                 name=f"suggestions-{session_id}-{generation_id}",
@@ -1199,33 +1727,16 @@ async def generate_questions(
                     question_generation_tasks.pop(session_id, None)
             if latest_question_generations.get(session_id) != generation:
                 return {"success": True, "superseded": True}
-            normalized = []
-            seen = set()
-            duplicated = False
-            for item in questions:
-                if not isinstance(item, dict):
-                    continue
-                question = item.get("question")
-                if not isinstance(question, str):
-                    continue
-                question = question.strip()
-                if not question:
-                    continue
-                if question in seen:
-                    duplicated = True
-                else:
-                    seen.add(question)
-                    normalized.append(item)
-            accepted = not duplicated and 2 <= len(normalized) <= 3
-            payload = {"questions": normalized if accepted else []}
-            if request is not None:
-                payload.update(
-                    {
-                        "generation_id": generation_id,
-                        "context_revision": context_revision,
-                    }
-                )
+            normalized, accepted = normalize_suggested_questions(questions)
             if not accepted:
+                payload = {"questions": []}
+                if request is not None:
+                    payload.update(
+                        {
+                            "generation_id": generation_id,
+                            "context_revision": context_revision,
+                        }
+                    )
                 await on_questions_generated(session_id, payload)
                 return {
                     "success": True,
@@ -1233,23 +1744,9 @@ async def generate_questions(
                     "superseded": False,
                     "accepted": False,
                 }
-            record = meeting_repository.get(session_id)
-            if record is not None:
-                event = meeting_ingestion.suggestions(
-                    session_id,
-                    generation_id,
-                    context_revision,
-                    [item["question"] for item in normalized],
-                )
-                await broadcast_meeting_event(session_id, event)
-            await on_questions_generated(session_id, payload)
-            logger.info(f"会话 {session_id} 已生成桌面追问")
-            return {
-                "success": True,
-                "message": "问题已生成",
-                "superseded": False,
-                "accepted": True,
-            }
+            return await publish_suggestions(
+                session_id, request, generation_id, context_revision, normalized
+            )
         if not session.transcript_segments:
             return {"success": False, "message": "没有转录内容可生成问题"}
         # 启动 Question 生成进程
@@ -1263,46 +1760,81 @@ async def generate_questions(
         return {"success": False, "message": f"生成问题失败: {str(e)}"}
 
 
+async def publish_suggestions(
+    session_id: str,
+    request: QuestionGenerationRequest | None,
+    generation_id: str,
+    context_revision: int,
+    questions: list[dict],
+    *,
+    speculative: bool = False,
+) -> dict:
+    payload = {"questions": questions}
+    if request is not None:
+        payload.update(
+            {"generation_id": generation_id, "context_revision": context_revision}
+        )
+    # 预生成引擎只跟踪已有会议记录的会话，可省去一次整份记录的读取。
+    if speculative or meeting_repository.get(session_id) is not None:
+        event = meeting_ingestion.suggestions(
+            session_id,
+            generation_id,
+            context_revision,
+            [item["question"] for item in questions],
+        )
+        await broadcast_meeting_event(session_id, event)
+    await on_questions_generated(session_id, payload)
+    logger.info(f"会话 {session_id} 已生成桌面追问")
+    return {
+        "success": True,
+        "message": "问题已生成",
+        "superseded": False,
+        "accepted": True,
+        "speculative": speculative,
+    }
+
+
+def normalize_suggested_questions(questions: list) -> tuple[list[dict], bool]:
+    normalized = []
+    seen = set()
+    duplicated = False
+    for item in questions:
+        if not isinstance(item, dict):
+            continue
+        question = item.get("question")
+        if not isinstance(question, str):
+            continue
+        question = question.strip()
+        if not question:
+            continue
+        if question in seen:
+            duplicated = True
+        else:
+            seen.add(question)
+            normalized.append(item)
+    return normalized, not duplicated and 2 <= len(normalized) <= 3
+
+
+async def speculate_suggestions(context: list) -> list[str] | None:
+    if desktop_agent_service is None:
+        return None
+    questions = await desktop_agent_service.generate_questions(context)
+    normalized, accepted = normalize_suggested_questions(questions)
+    if not accepted:
+        return None
+    return [item["question"] for item in normalized]
+
+
 def suggestion_context(session_id: str, session: SessionState) -> list:
+    context = suggestion_engine.context(session_id)
+    if context is not None:
+        return context
     record = meeting_repository.get(session_id)
     if record is None:
         return list(session.transcript_segments)
-    items = []
-    for event in record.events:
-        payload = event.payload
-        if isinstance(payload, TranscriptPayload):
-            items.append(
-                SimpleNamespace(
-                    speaker=payload.speaker,
-                    text=payload.text,
-                    timestamp=event.occurred_at,
-                )
-            )
-        elif isinstance(payload, ScreenshotAnalysisPayload):
-            items.append(
-                SimpleNamespace(
-                    speaker="截图分析",
-                    text=payload.text,
-                    timestamp=event.occurred_at,
-                )
-            )
-        elif isinstance(payload, QuestionPayload):
-            items.append(
-                SimpleNamespace(
-                    speaker="用户问题",
-                    text=payload.question,
-                    timestamp=event.occurred_at,
-                )
-            )
-        elif isinstance(payload, AnswerPayload) and payload.status == "completed":
-            items.append(
-                SimpleNamespace(
-                    speaker="AI回答",
-                    text=payload.answer,
-                    timestamp=event.occurred_at,
-                )
-            )
-    return items
+    return [
+        item for item in map(suggestion_context_item, record.events) if item is not None
+    ]
 
 
 @app.post("/api/sessions/{session_id}/store-session")
@@ -1310,7 +1842,7 @@ async def store_session(session_id: str):
     """存储会话数据到数据库"""
     try:
         # 验证会话是否存在
-        session = session_manager.get_session(session_id)
+        session = await asyncio.to_thread(session_manager.get_session, session_id)
         if not session:
             logger.warning(f"尝试存储不存在的会话: {session_id}")
             raise HTTPException(status_code=404, detail="会话不存在")
@@ -1325,6 +1857,8 @@ async def store_session(session_id: str):
             if record is None:
                 raise HTTPException(status_code=404, detail="会议持久记录不存在")
             if record.status == MeetingStatus.ACTIVE:
+                summary_scheduler.stop(session_id)
+                suggestion_engine.forget(session_id)
                 record = meeting_ingestion.finish(
                     session_id,
                     MeetingStatus.INCOMPLETE,
@@ -1371,7 +1905,7 @@ async def store_session(session_id: str):
 @app.post("/api/sessions/{session_id}/start-image-processing")
 async def start_image_processing(session_id: str, window_id: Optional[str] = None):
     """启动图像 OCR 处理"""
-    session = session_manager.get_session(session_id)
+    session = await asyncio.to_thread(session_manager.get_session_state, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
 
@@ -1406,41 +1940,211 @@ async def start_image_processing(session_id: str, window_id: Optional[str] = Non
 # ============= 会议上下文接口 =============
 
 
+def model_json_response(content: bytes, headers: dict | None = None) -> Response:
+    # 直接写出 model_dump_json 的字节，跳过先转 dict 再 json.dumps 的中间步骤
+    return Response(content, media_type="application/json", headers=headers)
+
+
 @app.get("/api/meetings")
 async def list_meeting_records():
-    return [record.model_dump(mode="json") for record in meeting_repository.list()]
+    return model_json_response(
+        b"["
+        + b",".join(
+            record.model_dump_json().encode("utf-8")
+            for record in meeting_repository.list()
+        )
+        + b"]"
+    )
+
+
+@app.get("/api/search")
+async def search_meetings(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+):
+    # 第一次查询可能要补建索引，放到线程里执行
+    hits = await asyncio.to_thread(meeting_repository.search, q, limit)
+    return {
+        "query": q,
+        "hits": [
+            {
+                "meeting_id": hit.meeting_id,
+                "sequence": hit.sequence,
+                "kind": hit.kind,
+                "occurred_at": hit.occurred_at.isoformat(),
+                "snippet": hit.snippet,
+                "score": hit.score,
+            }
+            for hit in hits
+        ],
+    }
 
 
 @app.get("/api/meetings/{meeting_id}")
-async def get_meeting_record(meeting_id: str):
-    record = meeting_repository.get(meeting_id)
+async def get_meeting_record(
+    meeting_id: str,
+    request: Request,
+    after: int | None = Query(None, ge=0),
+):
+    # ETag 由最后一个事件序号和记录修改时间组成，判断是否变化不需要解析整份记录。
+    try:
+        sequence, modified = await asyncio.to_thread(
+            meeting_repository.revision, meeting_id
+        )
+    except (MeetingNotFoundError, ValueError) as error:
+        raise HTTPException(status_code=404, detail="会议不存在") from error
+    headers = {"ETag": f'"m{sequence}-{modified:x}"', "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if after is not None:
+        page = await asyncio.to_thread(
+            meeting_event_page, meeting_id, after, MEETING_EVENT_PAGE_LIMIT
+        )
+        return model_json_response(page.model_dump_json().encode("utf-8"), headers)
+    record = await asyncio.to_thread(meeting_repository.get, meeting_id)
     if record is None:
         raise HTTPException(status_code=404, detail="会议不存在")
-    return record.model_dump(mode="json")
+    return model_json_response(record.model_dump_json().encode("utf-8"), headers)
 
 
-@app.get("/api/meetings/{meeting_id}/assets/{asset_id}")
-async def get_meeting_asset(meeting_id: str, asset_id: str):
-    record = meeting_repository.get(meeting_id)
-    if record is None:
-        raise HTTPException(status_code=404, detail="会议不存在")
-    payload = next(
-        (
-            event.payload
-            for event in record.events
-            if event.kind == EventKind.SCREENSHOT
-            and isinstance(event.payload, ScreenshotPayload)
-            and event.payload.asset_id == asset_id
-        ),
-        None,
+@app.get("/api/meetings/{meeting_id}/events")
+async def get_meeting_events(
+    meeting_id: str,
+    after: int = Query(0, ge=0),
+    limit: int = Query(200, ge=1, le=MEETING_EVENT_PAGE_LIMIT),
+):
+    page = await asyncio.to_thread(meeting_event_page, meeting_id, after, limit)
+    return model_json_response(page.model_dump_json().encode("utf-8"))
+
+
+def meeting_event_page(meeting_id: str, after: int, limit: int) -> MeetingEventPage:
+    try:
+        events, last_sequence = meeting_repository.events_after(
+            meeting_id, after, limit
+        )
+    except (MeetingNotFoundError, ValueError) as error:
+        raise HTTPException(status_code=404, detail="会议不存在") from error
+    next_after = events[-1].sequence if events else after
+    return MeetingEventPage(
+        meeting_id=meeting_id,
+        after=after,
+        next_after=next_after,
+        last_sequence=last_sequence,
+        has_more=next_after < last_sequence,
+        events=events,
+    )
+
+
+def export_response(
+    headers: list[MeetingRecord], export_format: str, name: str
+) -> StreamingResponse:
+    media_type, extension = EXPORT_FORMATS[export_format]
+    # 同步生成器由 Starlette 放到线程池里逐块生成，事件按行从索引读取，内存与会议大小无关。
+    return StreamingResponse(
+        iter_export(meeting_repository, headers, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
     )
-    if payload is None:
-        raise HTTPException(status_code=404, detail="截图记录不存在")
+
+
+@app.get("/api/meetings/{meeting_id}/export")
+async def export_meeting(
+    meeting_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|zip)$"),
+):
+    try:
+        header = meeting_repository.header(meeting_id)
+    except (MeetingNotFoundError, ValueError) as error:
+        raise HTTPException(status_code=404, detail="会议不存在") from error
+    return export_response([header], format, meeting_id)
+
+
+@app.get("/api/exports/meetings")
+async def export_meetings(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    format: str = Query("zip", pattern="^(ndjson|zip)$"),
+):
+    # 按会议开始时间筛选 [start, end)；不带时区的时间按 UTC 处理
+    start, end = (
+        value.replace(tzinfo=UTC) if value and value.tzinfo is None else value
+        for value in (start, end)
+    )
+    if start and end and start >= end:
+        raise HTTPException(status_code=422, detail="结束时间必须晚于开始时间")
+    headers = await asyncio.to_thread(meeting_repository.headers, start, end)
+    if not headers:
+        raise HTTPException(status_code=404, detail="该时间范围内没有会议")
+    return export_response(headers, format, "promptmeet-meetings")
+
+
+@app.get("/api/meetings/{meeting_id}/assets/{asset_id}")
+async def get_meeting_asset(
+    meeting_id: str,
+    asset_id: str,
+    request: Request,
+    variant: str = Query("original", pattern="^(original|thumbnail)$"),
+    size: int = 320,
+):
+    if variant == "thumbnail" and size not in ASSET_THUMBNAILS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"缩略图尺寸只支持 {', '.join(map(str, ASSET_THUMBNAILS))}",
+        )
+    location = meeting_repository.screenshot_assets.locate(meeting_id, asset_id)
+    if location is not None:
+        path, sha256, mime_type = location.path, location.sha256, location.mime_type
+    else:
+        # 内容寻址之前保存的截图不在索引里，只能回退到读取会议记录。
+        record = meeting_repository.get(meeting_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="会议不存在")
+        payload = next(
+            (
+                event.payload
+                for event in record.events
+                if event.kind == EventKind.SCREENSHOT
+                and isinstance(event.payload, ScreenshotPayload)
+                and event.payload.asset_id == asset_id
+            ),
+            None,
+        )
+        if payload is None:
+            raise HTTPException(status_code=404, detail="截图记录不存在")
+        path = meeting_repository.root / payload.relative_path
+        sha256, mime_type = payload.sha256, payload.mime_type
     root = meeting_repository.root.resolve()
-    path = (root / payload.relative_path).resolve()
+    path = path.resolve()
     if root not in path.parents or not path.is_file():
         raise HTTPException(status_code=404, detail="截图文件已丢失，会议记录仍保留")
-    return FileResponse(path, media_type=payload.mime_type, filename=path.name)
+
+    # 资产内容由 sha256 决定且不会改变，可以使用强 ETag 和长期缓存。
+    etag = f'"{sha256}"' if variant == "original" else f'"{sha256}-w{size}"'
+    headers = {"ETag": etag, "Cache-Control": ASSET_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if variant == "original":
+        return FileResponse(
+            path, media_type=mime_type, filename=path.name, headers=headers
+        )
+    try:
+        thumbnail = await asset_executor.run(
+            ASSET_THUMBNAILS[size].prepare, path, mime_type, sha256
+        )
+    except AssetExecutorOverloaded as error:
+        raise HTTPException(
+            status_code=error.status_code,
+            detail=str(error),
+            headers={"Retry-After": str(error.retry_after)},
+        ) from error
+    return Response(thumbnail.data, media_type=thumbnail.mime_type, headers=headers)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
 
 
 async def process_meeting_question(
@@ -1532,34 +2236,63 @@ async def ask_meeting_question(meeting_id: str, request: MeetingQuestionRequest)
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """WebSocket连接端点"""
-    if session_manager.get_session(session_id) is None:
+    if await asyncio.to_thread(session_manager.get_session_state, session_id) is None:
         await websocket.close(code=4404, reason="会话不存在")
         return
-    await websocket_manager.connect(websocket, session_id)
-    if session_manager.get_session(session_id) is None:
+    # 客户端可以用 ?delta_interval_ms=0 关闭增量攒批，或按自己的刷新率调大间隔
+    await websocket_manager.connect(
+        websocket,
+        session_id,
+        delta_interval_ms=optional_int(websocket.query_params.get("delta_interval_ms")),
+        delta_max_chars=optional_int(websocket.query_params.get("delta_max_chars")),
+        legacy=optional_flag(websocket.query_params.get("legacy")),
+    )
+    if await asyncio.to_thread(session_manager.get_session_state, session_id) is None:
         websocket_manager.disconnect(websocket, session_id)
         await websocket.close(code=4404, reason="会话不存在")
         return
+    since_sequence = optional_int(websocket.query_params.get("since_sequence"))
 
     try:
         logger.info(f"WebSocket 连接建立: session={session_id}")
 
         # 发送连接确认
-        await websocket.send_json(
+        await websocket_manager.send_to_connection(
+            websocket,
             {
                 "type": "connection_established",
                 "data": {
                     "session_id": session_id,
                     "timestamp": datetime.now().isoformat(),
                 },
-            }
+            },
         )
 
+        # 断线重连的客户端可以在握手时带上 since_sequence，补发错过的会议事件
+        if since_sequence is not None:
+            await replay_meeting_events(websocket, session_id, since_sequence)
+
         # 保持连接并处理客户端消息
         while True:
             try:
                 # 接收客户端消息
-                data = await websocket.receive_json()
+                data = await websocket_manager.receive_message(websocket)
+                if data.get("type") == "resume":
+                    since = resume_sequence(data.get("data"))
+                    if since is None:
+                        await websocket_manager.send_to_connection(
+                            websocket,
+                            {
+                                "type": "error",
+                                "data": {
+                                    "scope": "resume",
+                                    "message": "resume 缺少有效的 since_sequence",
+                                },
+                            },
+                        )
+                        continue
+                    await replay_meeting_events(websocket, session_id, since)
+                    continue
                 await handle_websocket_message(session_id, data)
 
             except WebSocketDisconnect:
@@ -1567,8 +2300,9 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 break
             except Exception as e:
                 logger.error(f"WebSocket 消息处理错误: {e}")
-                await websocket.send_json(
-                    {"type": "error", "data": {"message": f"消息处理错误: {str(e)}"}}
+                await websocket_manager.send_to_connection(
+                    websocket,
+                    {"type": "error", "data": {"message": f"消息处理错误: {str(e)}"}},
                 )
 
     except Exception as e:
@@ -1577,6 +2311,33 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         websocket_manager.disconnect(websocket, session_id)
 
 
+def optional_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def resume_sequence(payload) -> int | None:
+    # 只接受非负整数；缺失或格式不对时由调用方回 error，避免整场会议被重放
+    if not isinstance(payload, dict):
+        return None
+    value = payload.get("since_sequence")
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = optional_int(value)
+    if not isinstance(value, int) or value < 0:
+        return None
+    return value
+
+
+def optional_flag(value: str | None) -> bool | None:
+    if value is None:
+        return None
+    return value.lower() not in {"0", "false", "no", "off"}
+
+
 async def handle_websocket_message(session_id: str, message: dict):
     """处理WebSocket消息"""
     message_type = message.get("type")
@@ -1592,7 +2353,7 @@ async def handle_websocket_message(session_id: str, message: dict):
 
     elif message_type == "agent_message":
         if DESKTOP_MODE and desktop_agent_service is not None:
-            session = session_manager.get_session(session_id)
+            session = await asyncio.to_thread(session_manager.get_session, session_id)
             request_id = data.get("request_id")
             if hasattr(desktop_agent_service, "answer_meeting"):
                 task = asyncio.create_task(
@@ -1742,19 +2503,27 @@ def legacy_meeting_projection(record: MeetingRecord) -> dict:
     }
 
 
+def legacy_json_loads(content: str):
+    return (
+        orjson.loads(content)
+        if LEGACY_JSON_RESPONSE is ORJSONResponse
+        else json.loads(content)
+    )
+
+
 @app.get("/db/sessions", response_class=JSONResponse)
 async def get_all_sessions():
     """获取所有会话列表"""
     try:
         if DESKTOP_MODE:
-            return JSONResponse(
+            return LEGACY_JSON_RESPONSE(
                 content=[
                     legacy_meeting_projection(record)
                     for record in meeting_repository.list()
                 ]
             )
         sessions_json = db_storage.get_all_sessions()
-        return JSONResponse(content=json.loads(sessions_json))
+        return LEGACY_JSON_RESPONSE(content=legacy_json_loads(sessions_json))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取会话列表失败: {str(e)}")
 
@@ -1767,11 +2536,11 @@ async def get_session_details(session_id: str):
             record = meeting_repository.get(session_id)
             if record is None:
                 raise HTTPException(status_code=404, detail="会话不存在")
-            return JSONResponse(content=legacy_meeting_projection(record))
+            return LEGACY_JSON_RESPONSE(content=legacy_meeting_projection(record))
         session_json = db_storage.get_session_details(session_id)
         if not session_json or session_json == "null":
             raise HTTPException(status_code=404, detail="会话不存在")
-        return JSONResponse(content=json.loads(session_json))
+        return LEGACY_JSON_RESPONSE(content=legacy_json_loads(session_json))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取会话详情失败: {str(e)}")
 
@@ -1811,12 +2580,12 @@ async def on_transcript_received(session_id: str, transcript_data: dict) -> bool
         )
         if not inserted:
             return False
+        summary_scheduler.mark_input(session_id)
 
         # 更新会话状态
-        session = session_manager.get_session(session_id)
-        if session:
-            session.transcript_segments.append(segment)
-            session_manager.update_session(session)
+        await asyncio.to_thread(
+            session_manager.add_transcript_segment, session_id, segment
+        )
 
         # 通知前端
         await websocket_manager.broadcast_to_session(
@@ -1856,10 +2625,7 @@ async def on_summary_generated(session_id: str, summary_data: dict):
         timeline_event = meeting_ingestion.summary(session_id, summary_data)
 
         # 更新会话状态
-        session = session_manager.get_session(session_id)
-        if session:
-            session.current_summary = summary
-            session_manager.update_session(session)
+        await asyncio.to_thread(session_manager.update_summary, session_id, summary)
 
         # 通知前端
         await websocket_manager.broadcast_to_session(
@@ -1883,7 +2649,7 @@ async def on_summary_generated(session_id: str, summary_data: dict):
 async def persist_session(session_id: str) -> bool:
     if DESKTOP_MODE:
         return meeting_repository.get(session_id) is not None
-    session = session_manager.get_session(session_id)
+    session = await asyncio.to_thread(session_manager.get_session, session_id)
     if not session:
         return False
     return await asyncio.get_running_loop().run_in_executor(
@@ -1897,12 +2663,12 @@ async def on_image_result_received(session_id: str, image_result: dict):
     """收到图像 OCR 结果的回调"""
     try:
         # 更新会话状态
-        session = session_manager.get_session(session_id)
-        if session:
-
-            session.image_ocr_result.append(image_result)
+        if await asyncio.to_thread(
+            session_manager.mutate,
+            session_id,
+            lambda session: session.image_ocr_result.append(image_result),
+        ):
             logger.info(f"image_ocr_result: {image_result}")
-            session_manager.update_session(session)
         # 通知前端
         await websocket_manager.broadcast_to_session(
             session_id,
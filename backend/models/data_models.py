@@ -24,6 +24,7 @@ class MessageType(str, Enum):
 
     # 分析相关
     SUMMARY_GENERATED = "summary_generated"
+    SUMMARY_PARTIAL = "summary_partial"
     TASK_EXTRACTED = "task_extracted"
     IMAGE_OCR_RESULT = "image_ocr_result"
 
@@ -33,6 +33,7 @@ class EventProvenance(BaseModel):
     provider: str | None = None
     model: str | None = None
     request_id: str | None = None
+    reused_from: str | None = None
 
 
 class EvidenceSource(BaseModel):
@@ -76,6 +77,7 @@ class ScreenshotPayload(BaseModel):
     capture_status: Literal["available", "missing"] = "available"
     local_ocr_text: str | None = Field(default=None, max_length=20_000)
     ocr_engine: Literal["apple_vision"] | None = None
+    perceptual_hash: str | None = Field(default=None, pattern=r"^[0-9a-f]{16}$")
 
 
 class ScreenshotAnalysisPayload(BaseModel):
@@ -171,6 +173,15 @@ class MeetingEvent(BaseModel):
     payload: EventPayload
 
 
+class MeetingEventPage(BaseModel):
+    meeting_id: str
+    after: int
+    next_after: int
+    last_sequence: int
+    has_more: bool
+    events: list[MeetingEvent]
+
+
 class LegacyMigrationReference(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
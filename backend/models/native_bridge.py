@@ -19,3 +19,6 @@ class NativeAudioReceipt(BaseModel):
     sequence: int
     path: Path
     metadata_path: Path
+    offset: int | None = None
+    length: int | None = None
+    speech: bool | None = None
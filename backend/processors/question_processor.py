@@ -213,6 +213,8 @@ class QuestionProcessor:
 
         last_segment_count = 0
         check_count = 0
+        # 只拉取新增片段；会话没有变化时服务端按 ETag 返回 304，不再传输整份会话
+        etag = None
 
         try:
             while self.running and session_id == self.current_session_id:
@@ -224,27 +226,35 @@ class QuestionProcessor:
 
                 try:
                     response = requests.get(
-                        f"http://localhost:8000/api/sessions/{session_id}"
+                        f"http://localhost:8000/api/sessions/{session_id}",
+                        params={"after_segment": last_segment_count},
+                        headers={"If-None-Match": etag} if etag else {},
                     )
-                    if response.status_code == 200:
+                    if response.status_code == 304:
+                        logger.info("没有新的转录片段")
+                    elif response.status_code == 200:
                         session_data = response.json()
                         if session_data.get("success"):
+                            etag = response.headers.get("ETag")
                             session = session_data["session"]
-                            transcript_segments = session.get("transcript_segments", [])
+                            new_segments = session.get("transcript_segments", [])
+                            segment_count = session_data.get(
+                                "segment_count", last_segment_count + len(new_segments)
+                            )
 
                             logger.info(
-                                f"当前转录片段总数: {len(transcript_segments)}, 上次检查: {last_segment_count}"
+                                f"当前转录片段总数: {segment_count}, 上次检查: {last_segment_count}"
                             )
 
                             # 检查是否有新的转录片段
-                            if len(transcript_segments) > last_segment_count:
+                            if new_segments:
                                 logger.info(
-                                    f"检测到新的转录片段，当前总数: {len(transcript_segments)}"
+                                    f"检测到新的转录片段，新增: {len(new_segments)}"
                                 )
 
                                 # 处理新的转录片段
                                 result = await self.process_transcript_segments(
-                                    transcript_segments
+                                    new_segments
                                 )
 
                                 if result["success"] and result["questions"]:
@@ -293,10 +303,10 @@ class QuestionProcessor:
                                     logger.info(
                                         f"暂未生成问题: {result.get('message', '')}"
                                     )
-
-                                last_segment_count = len(transcript_segments)
                             else:
                                 logger.info("没有新的转录片段")
+
+                            last_segment_count = segment_count
                         else:
                             logger.error(f"获取会话数据失败: {session_data}")
                     else:
@@ -26,6 +26,7 @@ from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.data_models import IPCMessage, IPCCommand, IPCResponse, TranscriptionResult
+from services.voice_activity import VoiceActivityDetector
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +70,7 @@ class WhisperProcessor:
         self.chunk_size = 1024
         self.segment_duration = 10.0  # 每10秒提交一次
         self.model = "whisper-1"
+        self.voice_activity = VoiceActivityDetector(16000)
 
         # 初始化音频设备
         self._find_audio_device()
@@ -211,6 +213,14 @@ class WhisperProcessor:
             if sample_rate != 16000:
                 audio_data = resample_poly(audio_data, 16000, sample_rate)
 
+            # 只把有语音的部分送去转录，整段静音则跳过 API 调用
+            speech_segments = self.voice_activity.segments(audio_data)
+            if not speech_segments:
+                logger.info("音频片段没有检测到语音，跳过转录")
+                self.current_frames = []
+                return
+            audio_data = self.voice_activity.trim(audio_data, speech_segments)
+
             # 保存为WAV文件
             with wave.open(filename, "w") as wav_file:
                 wav_file.setnchannels(1)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class AssetExecutorOverloaded(RuntimeError):
+    def __init__(self, detail: str, status_code: int, retry_after: int = 1) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AssetExecutor:
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 32,
+        *,
+        max_wait_seconds: float = 10.0,
+        sample_size: int = 512,
+        name: str = "promptmeet-assets",
+    ):
+        if workers < 1 or max_queue < 0:
+            raise ValueError("资产处理线程数必须大于 0，队列长度不能为负数")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.name = name
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._counts = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "expired": 0,
+        }
+        self._queue_wait_ms: deque[float] = deque(maxlen=sample_size)
+        self._processing_ms: deque[float] = deque(maxlen=sample_size)
+
+    async def run(self, function: Callable[..., T], *args) -> T:
+        with self._lock:
+            # 排队和执行中的任务总数有上限，超出时立即拒绝而不是无限堆积。
+            if self._pending >= self.workers + self.max_queue:
+                self._counts["rejected"] += 1
+                raise AssetExecutorOverloaded("资产处理队列已满，请稍后重试", 429)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix=self.name
+                )
+            executor = self._executor
+            self._pending += 1
+            self._counts["submitted"] += 1
+        submitted_at = time.perf_counter()
+
+        def job() -> T:
+            started_at = time.perf_counter()
+            waited = started_at - submitted_at
+            with self._lock:
+                self._queue_wait_ms.append(waited * 1000)
+                if waited > self.max_wait_seconds:
+                    # 排队太久说明持续过载，放弃这项任务，让客户端稍后重试。
+                    self._counts["expired"] += 1
+                    raise AssetExecutorOverloaded("资产处理排队超时，请稍后重试", 503)
+                self._running += 1
+            failed = True
+            try:
+                result = function(*args)
+                failed = False
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._processing_ms.append(
+                        (time.perf_counter() - started_at) * 1000
+                    )
+                    self._counts["failed" if failed else "completed"] += 1
+
+        def settled(_) -> None:
+            with self._lock:
+                self._pending -= 1
+
+        # 名额在任务真正结束（或在排队时被取消）后才归还；调用方断开连接时
+        # 线程池里的任务仍在执行，不能提前放出名额。
+        try:
+            future = executor.submit(job)
+        except RuntimeError:
+            settled(None)
+            raise
+        future.add_done_callback(settled)
+        return await asyncio.wrap_future(future)
+
+    def metrics(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                **self._counts,
+                "queue_wait_ms": self._summary(self._queue_wait_ms),
+                "processing_ms": self._summary(self._processing_ms),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _summary(samples: deque[float]) -> dict[str, float]:
+        if not samples:
+            return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+        ordered = sorted(samples)
+        return {
+            "avg": round(sum(ordered) / len(ordered), 2),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            "max": round(ordered[-1], 2),
+        }
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from models.meeting_context import EventProvenance, ScreenshotAnalysisPayload
+
+SHA256 = re.compile(r"^[0-9a-f]{64}$")
+MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    analysis TEXT
+);
+CREATE TABLE IF NOT EXISTS asset_references (
+    meeting_id TEXT NOT NULL,
+    asset_id TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (meeting_id, asset_id)
+);
+CREATE INDEX IF NOT EXISTS asset_references_sha256 ON asset_references (sha256);
+"""
+
+
+@dataclass(frozen=True)
+class StoredAsset:
+    path: Path
+    sha256: str
+    deduplicated: bool
+
+
+@dataclass(frozen=True)
+class AssetLocation:
+    path: Path
+    sha256: str
+    mime_type: str
+
+
+@dataclass(frozen=True)
+class CachedAnalysis:
+    event_id: str
+    payload: ScreenshotAnalysisPayload
+    provenance: EventProvenance
+
+
+# 内容寻址的截图存储。索引放在 SQLite 里：每次入库只写一行，
+# 写事务（BEGIN IMMEDIATE）同时串行化多个 worker 对 blob 文件的移动。
+# 会议记录不会被删除，blob 只增不删，不做引用计数。
+class ScreenshotAssetStore:
+    def __init__(self, assets_directory: str | Path):
+        self.directory = Path(assets_directory) / "sha256"
+        self.index_path = self.directory / "index.sqlite3"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._database: sqlite3.Connection | None = None
+
+    def adopt(
+        self,
+        path: Path,
+        meeting_id: str,
+        asset_id: str,
+        sha256: str | None = None,
+    ) -> StoredAsset:
+        if self.directory.parent.resolve() not in path.resolve().parents:
+            raise ValueError("截图必须存储在 PromptMeet 数据目录内")
+        if sha256 is None:
+            sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        if not SHA256.fullmatch(sha256):
+            raise ValueError("截图摘要无效")
+        blob = self.directory / sha256[:2] / f"{sha256}{path.suffix.lower()}"
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO blobs (sha256, file) VALUES (?, ?)",
+                (sha256, blob.name),
+            )
+            (file,) = connection.execute(
+                "SELECT file FROM blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            blob = blob.with_name(file)
+            deduplicated = blob.is_file()
+            if deduplicated:
+                # 内容相同的截图只保留一份文件，新上传的副本直接丢弃。
+                path.unlink(missing_ok=True)
+            else:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(path, blob)
+            connection.execute(
+                "INSERT OR REPLACE INTO asset_references VALUES (?, ?, ?)",
+                (meeting_id, asset_id, sha256),
+            )
+        return StoredAsset(path=blob, sha256=sha256, deduplicated=deduplicated)
+
+    def locate(self, meeting_id: str, asset_id: str) -> AssetLocation | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT blobs.sha256, blobs.file FROM asset_references "
+                "JOIN blobs USING (sha256) WHERE meeting_id = ? AND asset_id = ?",
+                (meeting_id, asset_id),
+            ).fetchone()
+        if row is None:
+            return None
+        sha256, file = row
+        path = self.directory / sha256[:2] / file
+        return AssetLocation(
+            path=path,
+            sha256=sha256,
+            mime_type=MIME_TYPES.get(path.suffix, "application/octet-stream"),
+        )
+
+    def forget(self, meeting_id: str, asset_id: str) -> None:
+        # 截图入库失败时去掉这次写入的引用；blob 保留，重试上传时直接复用。
+        with self._transaction() as connection:
+            connection.execute(
+                "DELETE FROM asset_references WHERE meeting_id = ? AND asset_id = ?",
+                (meeting_id, asset_id),
+            )
+
+    def analysis(self, sha256: str) -> CachedAnalysis | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT analysis FROM blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        cached = json.loads(row[0])
+        return CachedAnalysis(
+            event_id=cached["event_id"],
+            payload=ScreenshotAnalysisPayload.model_validate(cached["payload"]),
+            provenance=EventProvenance.model_validate(cached["provenance"]),
+        )
+
+    def record_analysis(
+        self,
+        sha256: str,
+        event_id: str,
+        payload: ScreenshotAnalysisPayload,
+        provenance: EventProvenance,
+    ) -> None:
+        if payload.status != "completed":
+            return
+        analysis = {
+            "event_id": event_id,
+            "payload": payload.model_dump(mode="json"),
+            "provenance": provenance.model_dump(mode="json"),
+        }
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE blobs SET analysis = ? WHERE sha256 = ?",
+                (json.dumps(analysis, ensure_ascii=False), sha256),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._database is not None:
+                self._database.close()
+                self._database = None
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._database is None:
+                connection = sqlite3.connect(
+                    self.index_path,
+                    timeout=30,
+                    isolation_level=None,
+                    check_same_thread=False,
+                )
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(SCHEMA)
+                self._database = connection
+            return self._database
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import shutil
+import struct
+from collections.abc import AsyncIterator, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from services.native_audio_ingress import NativeAudioSpoolEntry
+
+EXPORT_LAYOUTS = {"mix", "split"}
+# 分轨导出为立体声：左声道麦克风，右声道系统声音；混合来源两侧都写入。
+SPLIT_CHANNELS = {"microphone": (0,), "system": (1,)}
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+WAV_MAX_DATA_BYTES = 0xFFFFFFFF - WAV_HEADER.size + 8
+# codec -> (ffmpeg 编码参数, media type, 扩展名)
+COMPRESSED_CODECS = {
+    "opus": (["-c:a", "libopus", "-b:a", "32k", "-f", "ogg"], "audio/ogg", "ogg"),
+    "flac": (["-c:a", "flac", "-f", "flac"], "audio/flac", "flac"),
+}
+COMPRESSED_READ_BYTES = 64 * 1024
+
+
+class AudioExportError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class _Placement:
+    start: int
+    frames: int
+    path: Path
+    offset: int
+    channels: int
+
+
+@dataclass(frozen=True)
+class _Track:
+    targets: tuple[int, ...]
+    placements: tuple[_Placement, ...]
+
+
+@dataclass(frozen=True)
+class AudioExportPlan:
+    sample_rate: int
+    channels: int
+    total_frames: int
+    tracks: tuple[_Track, ...]
+
+    @property
+    def data_bytes(self) -> int:
+        return self.total_frames * self.channels * 2
+
+    def wav_header(self) -> bytes:
+        block_align = self.channels * 2
+        return WAV_HEADER.pack(
+            b"RIFF",
+            WAV_HEADER.size - 8 + self.data_bytes,
+            b"WAVE",
+            b"fmt ",
+            16,
+            1,
+            self.channels,
+            self.sample_rate,
+            self.sample_rate * block_align,
+            block_align,
+            16,
+            b"data",
+            self.data_bytes,
+        )
+
+
+def plan_session_audio(
+    sources: Mapping[str, list[tuple[NativeAudioSpoolEntry, Path]]],
+    layout: str = "mix",
+) -> AudioExportPlan:
+    if layout not in EXPORT_LAYOUTS:
+        raise AudioExportError(f"不支持的音频导出布局: {layout}")
+    sample_rates = {
+        entry.sample_rate
+        for entries in sources.values()
+        for entry, _ in entries
+        if entry.length
+    }
+    if not sample_rates:
+        raise AudioExportError("会话没有可导出的音频")
+    if len(sample_rates) > 1:
+        raise AudioExportError("会话音频采样率不一致，无法导出")
+    sample_rate = sample_rates.pop()
+    tracks = []
+    total_frames = 0
+    for source, entries in sorted(sources.items()):
+        placements = []
+        cursor = 0
+        for entry, path in sorted(entries, key=lambda item: item[0].sequence):
+            frames = entry.length // (2 * entry.channels)
+            if not frames:
+                continue
+            # 有会议时间戳时按时间对齐，静音丢弃留下的空档补零；分片重叠时顺延。
+            start = max(cursor, entry.meeting_time_ms * sample_rate // 1000)
+            placements.append(
+                _Placement(start, frames, path, entry.offset, entry.channels)
+            )
+            cursor = start + frames
+        if not placements:
+            continue
+        targets = (0,) if layout == "mix" else SPLIT_CHANNELS.get(source, (0, 1))
+        tracks.append(_Track(targets, tuple(placements)))
+        total_frames = max(total_frames, cursor)
+    plan = AudioExportPlan(
+        sample_rate=sample_rate,
+        channels=1 if layout == "mix" else 2,
+        total_frames=total_frames,
+        tracks=tuple(tracks),
+    )
+    if plan.data_bytes > WAV_MAX_DATA_BYTES:
+        raise AudioExportError("导出音频超过 WAV 文件 4GB 上限")
+    return plan
+
+
+def iter_wav(plan: AudioExportPlan, block_frames: int = 16_000) -> Iterator[bytes]:
+    yield plan.wav_header()
+    handles: dict[Path, object] = {}
+    cursors = [0] * len(plan.tracks)
+    try:
+        for block_start in range(0, plan.total_frames, block_frames):
+            count = min(block_frames, plan.total_frames - block_start)
+            block_end = block_start + count
+            mixed = np.zeros((count, plan.channels), dtype=np.int32)
+            for index, track in enumerate(plan.tracks):
+                placements = track.placements
+                first = cursors[index]
+                while (
+                    first < len(placements)
+                    and placements[first].start + placements[first].frames
+                    <= block_start
+                ):
+                    first += 1
+                cursors[index] = first
+                for placement in placements[first:]:
+                    if placement.start >= block_end:
+                        break
+                    low = max(placement.start, block_start)
+                    high = min(placement.start + placement.frames, block_end)
+                    samples = _read_frames(
+                        handles, placement, low - placement.start, high - low
+                    )
+                    mixed[
+                        low - block_start : high - block_start, track.targets
+                    ] += samples[:, None]
+            yield np.clip(mixed, -32768, 32767).astype("<i2").tobytes()
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+
+def compression_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+async def iter_compressed(
+    plan: AudioExportPlan, codec: str, block_frames: int = 16_000
+) -> AsyncIterator[bytes]:
+    if codec not in COMPRESSED_CODECS:
+        raise AudioExportError(f"不支持的音频压缩格式: {codec}")
+    # 编码放在独立的 ffmpeg 进程里，事件循环只负责搬运数据。
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "wav",
+        "-i",
+        "pipe:0",
+        *COMPRESSED_CODECS[codec][0],
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+    async def feed() -> None:
+        blocks = iter_wav(plan, block_frames)
+        try:
+            while (block := await asyncio.to_thread(next, blocks, None)) is not None:
+                process.stdin.write(block)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            blocks.close()
+            process.stdin.close()
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while chunk := await process.stdout.read(COMPRESSED_READ_BYTES):
+            yield chunk
+        await feeder
+        if await process.wait() != 0:
+            raise AudioExportError("音频压缩失败")
+    finally:
+        feeder.cancel()
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+def _read_frames(
+    handles: dict[Path, object], placement: _Placement, first: int, count: int
+) -> np.ndarray:
+    handle = handles.get(placement.path)
+    if handle is None:
+        handle = open(placement.path, "rb")
+        handles[placement.path] = handle
+    frame_bytes = 2 * placement.channels
+    handle.seek(placement.offset + first * frame_bytes)
+    raw = handle.read(count * frame_bytes)
+    samples = np.zeros(count * placement.channels, dtype=np.int32)
+    # 预分配的 spool 文件尾部或被截断的分片读不满时按静音处理。
+    read = np.frombuffer(raw[: len(raw) - len(raw) % 2], dtype="<i2")
+    samples[: len(read)] = read
+    if placement.channels == 1:
+        return samples
+    return samples.reshape(count, placement.channels).sum(axis=1) // placement.channels
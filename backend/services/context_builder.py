@@ -19,6 +19,20 @@ from models.meeting_context import (
     SuggestionPayload,
     TranscriptPayload,
 )
+from services.perceptual_hash import NEAR_DUPLICATE_DISTANCE, near_duplicates
+
+
+def search_terms(value: str) -> list[str]:
+    # 英文数字按词切分，中文字符连成一串后取相邻二元组；保留重复项供全文索引计算词频。
+    value = value.casefold()
+    words = re.findall(r"[a-z0-9_]+", value)
+    chinese = "".join(
+        character for character in value if "\u4e00" <= character <= "\u9fff"
+    )
+    words.extend(
+        chinese[index : index + 2] for index in range(max(0, len(chinese) - 1))
+    )
+    return words
 
 
 @dataclass(frozen=True)
@@ -49,8 +63,13 @@ class ContextSelection:
 
 
 class MeetingContextBuilder:
-    def __init__(self, token_estimator: Callable[[str], int] | None = None):
+    def __init__(
+        self,
+        token_estimator: Callable[[str], int] | None = None,
+        near_duplicate_distance: int = NEAR_DUPLICATE_DISTANCE,
+    ):
         self.token_estimator = token_estimator or self._estimate_tokens
+        self.near_duplicate_distance = near_duplicate_distance
 
     def select(
         self,
@@ -71,6 +90,7 @@ class MeetingContextBuilder:
             and event.kind != EventKind.SUGGESTIONS
             and (event.kind != EventKind.LIFECYCLE or include_lifecycle)
         ]
+        candidates, aliases, notes = self._collapse_near_duplicates(candidates)
         if self._visual_query(question):
             visual_selection = self._select_latest_visual(
                 record,
@@ -92,9 +112,15 @@ class MeetingContextBuilder:
             for event in candidates
             if isinstance(event.payload, ScreenshotPayload)
         }
+        for alias, asset_id in aliases.items():
+            screenshots_by_asset[alias] = screenshots_by_asset[asset_id]
         selected: list[MeetingEvent] = []
         selected_ids: set[str] = set()
         spent = 0
+
+        def render(event: MeetingEvent) -> str:
+            return notes.get(event.event_id) or self.render_event(event)
+
         for candidate in ranked:
             if candidate.event_id in selected_ids:
                 continue
@@ -103,15 +129,13 @@ class MeetingContextBuilder:
                 screenshot = screenshots_by_asset.get(candidate.payload.asset_id)
                 if screenshot is not None and screenshot.event_id not in selected_ids:
                     bundle.append(screenshot)
-            bundle_cost = sum(
-                self.token_estimator(self.render_event(event)) for event in bundle
-            )
+            bundle_cost = sum(self.token_estimator(render(event)) for event in bundle)
             if bundle_cost <= event_budget - spent:
                 selected.extend(bundle)
                 selected_ids.update(event.event_id for event in bundle)
                 spent += bundle_cost
                 continue
-            candidate_cost = self.token_estimator(self.render_event(candidate))
+            candidate_cost = self.token_estimator(render(candidate))
             if candidate_cost <= event_budget - spent:
                 selected.append(candidate)
                 selected_ids.add(candidate.event_id)
@@ -141,6 +165,11 @@ class MeetingContextBuilder:
             estimated_tokens=spent + summary_cost,
             omitted_count=len(omitted),
             derived_summary=summary,
+            rendered_event_text={
+                event_id: text
+                for event_id, text in notes.items()
+                if event_id in selected_ids
+            },
         )
 
     def select_screenshot(
@@ -178,6 +207,64 @@ class MeetingContextBuilder:
             derived_summary=None,
         )
 
+    def _collapse_near_duplicates(
+        self, events: list[MeetingEvent]
+    ) -> tuple[list[MeetingEvent], dict[str, str], dict[str, str]]:
+        runs: list[list[MeetingEvent]] = []
+        for event in events:
+            if not isinstance(event.payload, ScreenshotPayload):
+                continue
+            # 和这一组的第一张比较，避免逐张微小变化把不同画面串成一组。
+            if runs and near_duplicates(
+                runs[-1][0].payload.perceptual_hash,
+                event.payload.perceptual_hash,
+                self.near_duplicate_distance,
+            ):
+                runs[-1].append(event)
+            else:
+                runs.append([event])
+        # 连续的近似截图只保留最新一张，其余截图和分析并入同一个证据包。
+        aliases: dict[str, str] = {}
+        notes: dict[str, str] = {}
+        dropped: set[str] = set()
+        for run in runs:
+            if len(run) < 2:
+                continue
+            latest = run[-1]
+            for event in run[:-1]:
+                aliases[event.payload.asset_id] = latest.payload.asset_id
+                dropped.add(event.event_id)
+            notes[latest.event_id] = (
+                f"{self.render_event(latest)}；同一画面共 {len(run)} 张近似截图，已合并"
+            )
+        if not aliases:
+            return events, aliases, notes
+        analyzed = {
+            event.payload.asset_id
+            for event in events
+            if isinstance(event.payload, ScreenshotAnalysisPayload)
+            and event.payload.asset_id not in aliases
+            and event.payload.status == "completed"
+        }
+        for event in reversed(events):
+            payload = event.payload
+            if (
+                not isinstance(payload, ScreenshotAnalysisPayload)
+                or payload.asset_id not in aliases
+            ):
+                continue
+            representative = aliases[payload.asset_id]
+            if payload.status == "completed" and representative not in analyzed:
+                # 最新截图还没有分析结果时，沿用这一组里最近一次完成的分析。
+                analyzed.add(representative)
+            else:
+                dropped.add(event.event_id)
+        return (
+            [event for event in events if event.event_id not in dropped],
+            aliases,
+            notes,
+        )
+
     def _select_latest_visual(
         self,
         record: MeetingRecord,
@@ -416,14 +503,7 @@ class MeetingContextBuilder:
 
     @staticmethod
     def _terms(value: str) -> set[str]:
-        words = set(re.findall(r"[a-z0-9_]+", value))
-        chinese = "".join(
-            character for character in value if "\u4e00" <= character <= "\u9fff"
-        )
-        words.update(
-            chinese[index : index + 2] for index in range(max(0, len(chinese) - 1))
-        )
-        return words
+        return set(search_terms(value))
 
     @staticmethod
     def _estimate_tokens(value: str) -> int:
@@ -4,6 +4,8 @@ import math
 import os
 import base64
 import re
+import time
+from collections import OrderedDict
 from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, replace
@@ -26,9 +28,11 @@ from services.context_builder import (
     ContextSelection,
     MeetingContextBuilder,
 )
+from services.image_preparation import VisionImagePreparer
 from services.meeting_ingestion import ScreenshotAnalysisResult
 from services.model_provider import ProviderConfiguration
 from services.prompt_builder import MeetingPromptBuilder, ProviderContentPart
+from services.summary_stream import StructuredSummaryStream
 
 
 @asynccontextmanager
@@ -126,6 +130,10 @@ class _DuckDuckGoResultParser(HTMLParser):
 
 class DesktopAgentService:
     MAX_TOOL_ROUNDS = 3
+    MAX_PARALLEL_TOOL_CALLS = 3
+    TOOL_CALL_TIMEOUT_SECONDS = 12.0
+    SEARCH_CACHE_TTL_SECONDS = 300.0
+    SEARCH_CACHE_SIZE = 128
     STREAM_COMPLETION_TIMEOUT_SECONDS = 120.0
 
     def __init__(
@@ -141,6 +149,10 @@ class DesktopAgentService:
             or self.environment.get("PROMPTMEET_DATA_DIR")
             or Path.home() / "Library/Application Support/PromptMeet"
         ).resolve()
+        self.image_preparer = VisionImagePreparer.from_environment(self.environment)
+        self._search_cache: OrderedDict[
+            tuple[str, int], tuple[float, list[dict[str, str]]]
+        ] = OrderedDict()
 
     async def answer_meeting(
         self,
@@ -233,7 +245,10 @@ class DesktopAgentService:
         search_enabled: bool,
     ) -> tuple[str, list[dict[str, str]], bool]:
         messages = [
-            {"role": message.role, "content": self._provider_content(message.content)}
+            {
+                "role": message.role,
+                "content": await self._provider_content(message.content),
+            }
             for message in prompt_request.messages
         ]
         web_sources: list[dict[str, str]] = []
@@ -271,16 +286,15 @@ class DesktopAgentService:
                             "tool_calls": tool_calls,
                         }
                     )
-                    for tool_call in tool_calls:
-                        messages.append(
-                            {
-                                "role": "tool",
-                                "tool_call_id": tool_call.get("id", "web_search"),
-                                "content": await self._execute_tool_call(
-                                    tool_call, web_sources
-                                ),
-                            }
-                        )
+                    outputs = await self._execute_tool_calls(tool_calls, web_sources)
+                    messages.extend(
+                        {
+                            "role": "tool",
+                            "tool_call_id": tool_call.get("id", "web_search"),
+                            "content": output,
+                        }
+                        for tool_call, output in zip(tool_calls, outputs)
+                    )
                     continue
                 if tool_calls:
                     answer = "抱歉，本次回答超过了工具调用上限。"
@@ -446,7 +460,9 @@ class DesktopAgentService:
             normalized.append(line.rstrip())
         return "\n".join(normalized).strip()
 
-    def _provider_content(self, content: str | list[ProviderContentPart]) -> object:
+    async def _provider_content(
+        self, content: str | list[ProviderContentPart]
+    ) -> object:
         if isinstance(content, str):
             return content
         encoded: list[dict[str, object]] = []
@@ -459,12 +475,17 @@ class DesktopAgentService:
             path = (self.assets_root / (part.relative_path or "")).resolve()
             if self.assets_root not in path.parents or not path.is_file():
                 raise FileNotFoundError("截图资源不可用")
-            mime_type = part.mime_type or "image/png"
-            data = base64.b64encode(path.read_bytes()).decode("ascii")
+            prepared = await asyncio.to_thread(
+                self.image_preparer.prepare,
+                path,
+                part.mime_type or "image/png",
+                part.sha256,
+            )
+            data = base64.b64encode(prepared.data).decode("ascii")
             encoded.append(
                 {
                     "type": "image_url",
-                    "image_url": {"url": f"data:{mime_type};base64,{data}"},
+                    "image_url": {"url": f"data:{prepared.mime_type};base64,{data}"},
                 }
             )
         return encoded
@@ -676,6 +697,83 @@ class DesktopAgentService:
         configuration = ProviderConfiguration.from_environment(
             dict(self.environment), purpose="summary"
         )
+        context_lines, covered_events, advanced_progress = self._summary_context(
+            configuration, source_events, source_progress
+        )
+        response_content = ""
+        try:
+            async with httpx.AsyncClient(timeout=90) as client:
+                response = await client.post(
+                    configuration.endpoint,
+                    headers={"Authorization": f"Bearer {configuration.api_key}"},
+                    json={
+                        "model": configuration.model,
+                        "messages": self._summary_messages(context_lines),
+                        "stream": False,
+                        "temperature": 0.1,
+                    },
+                )
+                response.raise_for_status()
+                response_content = response.json()["choices"][0]["message"][
+                    "content"
+                ].strip()
+        except httpx.HTTPError as error:
+            raise self._runtime_failure(configuration, "summary", error) from error
+        return self._summary_result(
+            configuration, response_content, covered_events, advanced_progress
+        )
+
+    async def stream_meeting_summary(
+        self,
+        record: MeetingRecord,
+        source_events: list,
+        source_progress: dict[str, int] | None,
+        emit: Callable[[dict], Awaitable[None]],
+    ) -> MeetingSummaryResult:
+        configuration = ProviderConfiguration.from_environment(
+            dict(self.environment), purpose="summary"
+        )
+        context_lines, covered_events, advanced_progress = self._summary_context(
+            configuration, source_events, source_progress
+        )
+        parser = StructuredSummaryStream()
+
+        async def forward(message: dict) -> None:
+            delta = message.get("data", {}).get("delta")
+            if not isinstance(delta, str):
+                return
+            for update in parser.feed(delta):
+                await emit({"data": update.as_data()})
+
+        try:
+            async with httpx.AsyncClient(timeout=90) as client:
+                message = await self._stream_agent_turn(
+                    client,
+                    configuration.endpoint,
+                    {"Authorization": f"Bearer {configuration.api_key}"},
+                    {
+                        "model": configuration.model,
+                        "messages": self._summary_messages(context_lines),
+                        "stream": True,
+                        "temperature": 0.1,
+                    },
+                    forward,
+                )
+        except (httpx.HTTPError, StreamTerminalError) as error:
+            raise self._runtime_failure(configuration, "summary", error) from error
+        return self._summary_result(
+            configuration,
+            str(message.get("content") or "").strip(),
+            covered_events,
+            advanced_progress,
+        )
+
+    def _summary_context(
+        self,
+        configuration: ProviderConfiguration,
+        source_events: list,
+        source_progress: dict[str, int] | None,
+    ) -> tuple[list[str], list, dict[str, int]]:
         context_budget = ContextBudget(
             total_tokens=min(configuration.capabilities.max_context_tokens, 10_000),
             answer_reserve=2_000,
@@ -758,40 +856,34 @@ class DesktopAgentService:
                 break
         if not advanced_progress:
             raise ValueError("没有可在当前预算内推进的会议证据")
-        response_content = ""
-        try:
-            async with httpx.AsyncClient(timeout=90) as client:
-                response = await client.post(
-                    configuration.endpoint,
-                    headers={"Authorization": f"Bearer {configuration.api_key}"},
-                    json={
-                        "model": configuration.model,
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": (
-                                    "你是会议总结助手。只输出 JSON 对象，字段为 summary_text、tasks、"
-                                    "key_points、decisions。tasks 每项包含 task、describe、priority、"
-                                    "assignee、deadline、status。没有行动项时 tasks 为空数组，不得编造。"
-                                    "输入中若包含此前结构化摘要，保留其中仍有效的待办、关键点与决策，"
-                                    "并结合新增证据更新。"
-                                ),
-                            },
-                            {
-                                "role": "user",
-                                "content": "\n".join(context_lines),
-                            },
-                        ],
-                        "stream": False,
-                        "temperature": 0.1,
-                    },
-                )
-                response.raise_for_status()
-                response_content = response.json()["choices"][0]["message"][
-                    "content"
-                ].strip()
-        except httpx.HTTPError as error:
-            raise self._runtime_failure(configuration, "summary", error) from error
+        return context_lines, covered_events, advanced_progress
+
+    @staticmethod
+    def _summary_messages(context_lines: list[str]) -> list[dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "你是会议总结助手。只输出 JSON 对象，字段为 summary_text、tasks、"
+                    "key_points、decisions。tasks 每项包含 task、describe、priority、"
+                    "assignee、deadline、status。没有行动项时 tasks 为空数组，不得编造。"
+                    "输入中若包含此前结构化摘要，保留其中仍有效的待办、关键点与决策，"
+                    "并结合新增证据更新。"
+                ),
+            },
+            {
+                "role": "user",
+                "content": "\n".join(context_lines),
+            },
+        ]
+
+    @staticmethod
+    def _summary_result(
+        configuration: ProviderConfiguration,
+        response_content: str,
+        covered_events: list,
+        advanced_progress: dict[str, int],
+    ) -> MeetingSummaryResult:
         if response_content.startswith("```"):
             response_content = (
                 response_content.split("\n", 1)[1].rsplit("```", 1)[0].strip()
@@ -1093,11 +1185,40 @@ class DesktopAgentService:
             },
         }
 
+    async def _execute_tool_calls(
+        self,
+        tool_calls: list[dict],
+        sources: list[dict[str, str]],
+    ) -> list[str]:
+        semaphore = asyncio.Semaphore(self.MAX_PARALLEL_TOOL_CALLS)
+
+        async def bounded(tool_call: dict) -> str | tuple[str, list[dict[str, str]]]:
+            async with semaphore:
+                return await self._run_tool_call(tool_call)
+
+        outcomes = await asyncio.gather(*(bounded(call) for call in tool_calls))
+        # 搜索并发执行，但来源编号按调用顺序分配，保证引用稳定。
+        return [self._tool_output(outcome, sources) for outcome in outcomes]
+
     async def _execute_tool_call(
         self,
         tool_call: dict,
         sources: list[dict[str, str]],
     ) -> str:
+        return self._tool_output(await self._run_tool_call(tool_call), sources)
+
+    def _tool_output(
+        self,
+        outcome: str | tuple[str, list[dict[str, str]]],
+        sources: list[dict[str, str]],
+    ) -> str:
+        if isinstance(outcome, str):
+            return outcome
+        return self._search_results_to_toon(*outcome, sources)
+
+    async def _run_tool_call(
+        self, tool_call: dict
+    ) -> str | tuple[str, list[dict[str, str]]]:
         function = tool_call.get("function") or {}
         if function.get("name") != "web_search":
             return (
@@ -1131,14 +1252,31 @@ class DesktopAgentService:
             )
         query = " ".join(query.split())
         try:
-            results = await self.web_search(query, limit)
+            results = await asyncio.wait_for(
+                self._cached_search(query, limit),
+                timeout=self.TOOL_CALL_TIMEOUT_SECONDS,
+            )
         except Exception:
             return (
                 "error: web search unavailable\n"
                 f"query: {self._toon_string(query)}\n"
                 "help: Answer from existing knowledge or try another concise query."
             )
-        return self._search_results_to_toon(query, results, sources)
+        return query, results
+
+    async def _cached_search(self, query: str, limit: int) -> list[dict[str, str]]:
+        key = (query.casefold(), limit)
+        cached = self._search_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self.SEARCH_CACHE_TTL_SECONDS:
+            self._search_cache.move_to_end(key)
+            return cached[1]
+        results = await self.web_search(query, limit)
+        self._search_cache[key] = (time.monotonic(), results)
+        self._search_cache.move_to_end(key)
+        while len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return results
 
     @classmethod
     def _search_results_to_toon(
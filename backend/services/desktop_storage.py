@@ -51,10 +51,9 @@ class DesktopSessionStorage:
         export_directory = self.root / "exports"
         export_directory.mkdir(parents=True, exist_ok=True)
         path = export_directory / f"{session_id}.json"
-        path.write_text(
-            json.dumps(session, ensure_ascii=False, indent=2, default=str),
-            encoding="utf-8",
-        )
+        # 逐段编码写入文件，不在内存里拼出整份 JSON 字符串
+        with path.open("w", encoding="utf-8") as handle:
+            json.dump(session, handle, ensure_ascii=False, indent=2, default=str)
         return str(path)
 
     def _read_sessions(self) -> dict[str, dict]:
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# 消息只需要活到所有 worker 轮询过一次，保留一分钟足够应付短暂卡顿
+RETENTION_SECONDS = 60.0
+POLL_BATCH = 500
+
+
+# 多 worker 之间转发 WebSocket 广播：每个进程把广播写进共享的 SQLite 表，
+# 再轮询其他进程写入的消息，投递给连在本进程上的客户端。
+class SQLiteEventBus:
+    def __init__(
+        self,
+        path: str | Path,
+        poll_interval: float = 0.05,
+        retention_seconds: float = RETENTION_SECONDS,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS broadcasts ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, "
+            "session_id TEXT NOT NULL, message TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        # 只转发启动之后的广播，历史事件由客户端按序号补齐
+        (self._last_id,) = self._connection.execute(
+            "SELECT coalesce(max(id), 0) FROM broadcasts"
+        ).fetchone()
+        self.stats = {"published": 0, "received": 0}
+        # 写入交给单独的线程，事件循环只负责入队；单线程消费保持本进程的发布顺序
+        self._outbox: queue.SimpleQueue[tuple[str, str, float] | None] = (
+            queue.SimpleQueue()
+        )
+        self._writer = threading.Thread(
+            target=self._write_loop, name="event-bus-writer", daemon=True
+        )
+        self._writer.start()
+
+    def publish(self, session_id: str, message: dict) -> None:
+        encoded = json.dumps(message, ensure_ascii=False, default=str)
+        self._outbox.put((session_id, encoded, time.time()))
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._outbox.get()
+            if item is None:
+                return
+            batch = [item]
+            # 积压时一次事务写入整批，减少 WAL 提交次数
+            while True:
+                try:
+                    item = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._insert(batch)
+                    return
+                batch.append(item)
+            self._insert(batch)
+
+    def _insert(self, batch: list[tuple[str, str, float]]) -> None:
+        try:
+            with self._lock:
+                self._connection.execute("BEGIN IMMEDIATE")
+                try:
+                    self._connection.executemany(
+                        "INSERT INTO broadcasts "
+                        "(origin, session_id, message, created_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        [
+                            (self.origin, session_id, encoded, created_at)
+                            for session_id, encoded, created_at in batch
+                        ],
+                    )
+                except BaseException:
+                    self._connection.execute("ROLLBACK")
+                    raise
+                self._connection.execute("COMMIT")
+        except sqlite3.Error as error:
+            logger.warning(f"跨进程广播写入失败，丢弃 {len(batch)} 条: {error}")
+            return
+        self.stats["published"] += len(batch)
+
+    def poll(self) -> list[tuple[str, dict]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, origin, session_id, message FROM broadcasts "
+                "WHERE id > ? ORDER BY id LIMIT ?",
+                (self._last_id, POLL_BATCH),
+            ).fetchall()
+        if rows:
+            self._last_id = rows[-1][0]
+        received = [
+            (session_id, json.loads(message))
+            for _, origin, session_id, message in rows
+            if origin != self.origin
+        ]
+        self.stats["received"] += len(received)
+        return received
+
+    def prune(self) -> None:
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM broadcasts WHERE created_at < ?",
+                (time.time() - self.retention_seconds,),
+            )
+
+    async def run(self, deliver: Callable[[str, dict], Awaitable[None]]) -> None:
+        pruned_at = time.monotonic()
+        while True:
+            received = []
+            try:
+                received = await asyncio.to_thread(self.poll)
+                for session_id, message in received:
+                    await deliver(session_id, message)
+                if time.monotonic() - pruned_at >= self.retention_seconds:
+                    await asyncio.to_thread(self.prune)
+                    pruned_at = time.monotonic()
+            except sqlite3.Error as error:
+                logger.warning(f"跨进程广播轮询失败: {error}")
+            if len(received) < POLL_BATCH:
+                await asyncio.sleep(self.poll_interval)
+
+    def close(self) -> None:
+        self._outbox.put(None)
+        self._writer.join(timeout=5)
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from models.meeting_context import MeetingEvent, MeetingRecord
+
+
+@dataclass
+class _Offsets:
+    sequences: list[int] = field(default_factory=list)
+    offsets: list[int] = field(default_factory=list)
+    size: int = 0
+
+
+# 每个会议一份 "sequence<TAB>事件 JSON" 行日志；按序号定位偏移量后只解析需要的事件。
+class MeetingEventIndex:
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._offsets: dict[str, _Offsets] = {}
+
+    def append(self, event: MeetingEvent) -> None:
+        line = f"{event.sequence}\t{event.model_dump_json()}\n".encode("utf-8")
+        with self._lock:
+            path = self._path(event.meeting_id)
+            offsets = self._offsets.get(event.meeting_id)
+            if (
+                offsets is None
+                or not path.exists()
+                or path.stat().st_size != offsets.size
+            ):
+                # 进程内还没有这份索引，或其他进程已经改过行日志：下次读取时再按记录文件判断是否需要重建。
+                self._offsets.pop(event.meeting_id, None)
+                return
+            with path.open("ab") as handle:
+                handle.write(line)
+            offsets.sequences.append(event.sequence)
+            offsets.offsets.append(offsets.size)
+            offsets.size += len(line)
+
+    def rebuild(self, record: MeetingRecord) -> None:
+        offsets = _Offsets()
+        lines = []
+        for event in record.events:
+            line = f"{event.sequence}\t{event.model_dump_json()}\n".encode("utf-8")
+            offsets.sequences.append(event.sequence)
+            offsets.offsets.append(offsets.size)
+            offsets.size += len(line)
+            lines.append(line)
+        with self._lock:
+            path = self._path(record.meeting_id)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_bytes(b"".join(lines))
+            temporary.replace(path)
+            self._offsets[record.meeting_id] = offsets
+
+    def events_after(
+        self,
+        record_path: Path,
+        load: Callable[[], MeetingRecord],
+        after: int,
+        limit: int,
+    ) -> tuple[list[MeetingEvent], int]:
+        meeting_id = record_path.stem
+        with self._lock:
+            offsets = self._load(meeting_id, record_path, load)
+            start = bisect.bisect_right(offsets.sequences, after)
+            selected = offsets.offsets[start : start + limit]
+            last_sequence = offsets.sequences[-1] if offsets.sequences else 0
+            if not selected:
+                return [], last_sequence
+            with self._path(meeting_id).open("rb") as handle:
+                handle.seek(selected[0])
+                lines = [handle.readline() for _ in selected]
+        events = [
+            MeetingEvent.model_validate_json(line.split(b"\t", 1)[1]) for line in lines
+        ]
+        return events, last_sequence
+
+    def iter_lines(
+        self, record_path: Path, load: Callable[[], MeetingRecord]
+    ) -> Iterator[bytes]:
+        meeting_id = record_path.stem
+        with self._lock:
+            offsets = self._load(meeting_id, record_path, load)
+            # 在锁内打开文件并记下长度：之后的重建只替换路径，不影响这个句柄。
+            handle = self._path(meeting_id).open("rb")
+            size = offsets.size
+        return self._read_lines(handle, size)
+
+    @staticmethod
+    def _read_lines(handle, size: int) -> Iterator[bytes]:
+        with handle:
+            consumed = 0
+            for line in handle:
+                consumed += len(line)
+                if consumed > size:
+                    return
+                yield line.split(b"\t", 1)[1].rstrip(b"\n")
+
+    def last_sequence(
+        self, record_path: Path, load: Callable[[], MeetingRecord]
+    ) -> int:
+        with self._lock:
+            offsets = self._load(record_path.stem, record_path, load)
+            return offsets.sequences[-1] if offsets.sequences else 0
+
+    def _load(
+        self, meeting_id: str, record_path: Path, load: Callable[[], MeetingRecord]
+    ) -> _Offsets:
+        path = self._path(meeting_id)
+        # 行日志总是在记录文件之后写入；比记录旧说明写入中断或记录被外部改动，按记录重建。
+        if (
+            not path.exists()
+            or path.stat().st_mtime_ns < record_path.stat().st_mtime_ns
+        ):
+            self.rebuild(load())
+            return self._offsets[meeting_id]
+        offsets = self._offsets.get(meeting_id)
+        if offsets is not None and offsets.size == path.stat().st_size:
+            return offsets
+        offsets = _Offsets()
+        with path.open("rb") as handle:
+            for line in handle:
+                offsets.sequences.append(int(line.split(b"\t", 1)[0]))
+                offsets.offsets.append(offsets.size)
+                offsets.size += len(line)
+        self._offsets[meeting_id] = offsets
+        return offsets
+
+    def _path(self, meeting_id: str) -> Path:
+        return self.directory / f"{meeting_id}.jsonl"
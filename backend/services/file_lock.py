@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 没有 fcntl，只保留进程内互斥（桌面版只有一个进程）
+    fcntl = None
+
+
+# 进程内可重入、进程间互斥的锁：同一线程嵌套获取时只在最外层加/解 flock。
+class InterProcessLock:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._handle = None
+
+    def acquire(self) -> bool:
+        self._lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                if self._handle is None:
+                    self._handle = self.path.open("a+b")
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return True
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._handle is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+        self._lock.release()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._depth == 0 and self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def __enter__(self) -> InterProcessLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
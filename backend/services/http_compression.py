@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# 超过这个大小的响应在线程里压缩，避免阻塞事件循环。
+THREAD_THRESHOLD = 1024 * 1024
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, parameters = item.strip().partition(";")
+        if parameters.replace(" ", "") in {"q=0", "q=0.0", "q=0.00", "q=0.000"}:
+            continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal pending
+            if message["type"] == "http.response.start":
+                pending = message
+                return
+            if message["type"] != "http.response.body" or pending is None:
+                await send(message)
+                return
+            start, pending = pending, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            # 流式响应（音频导出、NDJSON）保持原样逐块发送，只压缩一次性返回的大 JSON/文本。
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+            arguments = (body, encoding, self.gzip_level, self.brotli_quality)
+            if len(body) >= THREAD_THRESHOLD:
+                compressed = await asyncio.to_thread(compress, *arguments)
+            else:
+                compressed = compress(*arguments)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
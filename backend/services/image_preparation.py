@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+PREPARED_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "webp": ("WEBP", "image/webp", "webp"),
+}
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    elapsed_ms: float
+    cached: bool = False
+
+    @property
+    def prepared_bytes(self) -> int:
+        return len(self.data)
+
+
+class VisionImagePreparer:
+    def __init__(
+        self,
+        *,
+        max_dimension: int = 1600,
+        quality: int = 80,
+        image_format: str = "jpeg",
+    ):
+        if image_format not in PREPARED_FORMATS:
+            raise ValueError(f"不支持的视觉图片格式: {image_format}")
+        if not 1 <= quality <= 100:
+            raise ValueError("视觉图片质量必须在 1 到 100 之间")
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.image_format = image_format
+
+    @classmethod
+    def from_environment(cls, environment: Mapping[str, str]) -> VisionImagePreparer:
+        return cls(
+            max_dimension=int(
+                environment.get("PROMPTMEET_VISION_MAX_DIMENSION", "1600") or 0
+            ),
+            quality=int(environment.get("PROMPTMEET_VISION_IMAGE_QUALITY", "80")),
+            image_format=environment.get(
+                "PROMPTMEET_VISION_IMAGE_FORMAT", "jpeg"
+            ).lower(),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None and self.max_dimension > 0
+
+    def variant_path(self, path: Path, sha256: str) -> Path:
+        extension = PREPARED_FORMATS[self.image_format][2]
+        name = f"{sha256}-{self.max_dimension}-q{self.quality}.{extension}"
+        return path.parent / ".prepared" / name
+
+    def prepare(
+        self, path: Path, mime_type: str, sha256: str | None = None
+    ) -> PreparedImage:
+        started = time.perf_counter()
+        original_bytes = path.stat().st_size
+        if not self.enabled:
+            return self._original(path, mime_type, original_bytes, started)
+        original = None
+        if not sha256:
+            original = path.read_bytes()
+            sha256 = hashlib.sha256(original).hexdigest()
+        variant = self.variant_path(path, sha256)
+        if variant.is_file():
+            return PreparedImage(
+                data=variant.read_bytes(),
+                mime_type=PREPARED_FORMATS[self.image_format][1],
+                original_bytes=original_bytes,
+                elapsed_ms=self._elapsed(started),
+                cached=True,
+            )
+        if original is None:
+            original = path.read_bytes()
+        try:
+            encoded = self._encode(original)
+        except (OSError, ValueError, Image.DecompressionBombError) as error:
+            logger.debug("截图无法解码，按原图发送: %s, error=%s", path, error)
+            encoded = None
+        if encoded is None or len(encoded) >= original_bytes:
+            return PreparedImage(
+                data=original,
+                mime_type=mime_type,
+                original_bytes=original_bytes,
+                elapsed_ms=self._elapsed(started),
+            )
+        variant.parent.mkdir(parents=True, exist_ok=True)
+        temporary = variant.with_suffix(f"{variant.suffix}.tmp")
+        temporary.write_bytes(encoded)
+        os.replace(temporary, variant)
+        prepared = PreparedImage(
+            data=encoded,
+            mime_type=PREPARED_FORMATS[self.image_format][1],
+            original_bytes=original_bytes,
+            elapsed_ms=self._elapsed(started),
+        )
+        logger.info(
+            "截图已压缩后发送给视觉模型: %s -> %s 字节, %.1f ms",
+            original_bytes,
+            prepared.prepared_bytes,
+            prepared.elapsed_ms,
+        )
+        return prepared
+
+    def _encode(self, original: bytes) -> bytes:
+        pillow_format = PREPARED_FORMATS[self.image_format][0]
+        with Image.open(io.BytesIO(original)) as image:
+            image.thumbnail(
+                (self.max_dimension, self.max_dimension),
+                Image.Resampling.LANCZOS,
+                reducing_gap=3.0,
+            )
+            has_alpha = image.mode in {"RGBA", "LA"} or "transparency" in image.info
+            if not has_alpha:
+                image = image.convert("RGB")
+            elif pillow_format == "WEBP":
+                image = image.convert("RGBA")
+            else:
+                # JPEG 没有透明通道；铺白底，避免透明区域被编码成黑色。
+                rgba = image.convert("RGBA")
+                image = Image.new("RGB", rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.getchannel("A"))
+            output = io.BytesIO()
+            image.save(output, format=pillow_format, quality=self.quality)
+            return output.getvalue()
+
+    @staticmethod
+    def _original(
+        path: Path, mime_type: str, original_bytes: int, started: float
+    ) -> PreparedImage:
+        return PreparedImage(
+            data=path.read_bytes(),
+            mime_type=mime_type,
+            original_bytes=original_bytes,
+            elapsed_ms=VisionImagePreparer._elapsed(started),
+        )
+
+    @staticmethod
+    def _elapsed(started: float) -> float:
+        return (time.perf_counter() - started) * 1000
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import io
+import zipfile
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from models.meeting_context import MeetingEvent, MeetingRecord, ScreenshotPayload
+from services.meeting_repository import MeetingRepository
+
+# format -> (media type, 扩展名)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "zip": ("application/zip", "zip"),
+}
+EXPORT_CHUNK_BYTES = 64 * 1024
+# 事件 JSON 由 model_dump_json 紧凑输出，截图事件可以直接按原文识别，不必逐行解析。
+SCREENSHOT_MARKER = b'"kind":"screenshot"'
+EVENT_PREFIX = b'{"type":"event","event":'
+
+
+class _ArchiveSink(io.RawIOBase):
+    # 不可 seek 的输出：zipfile 会改用数据描述符，写出的字节随时取走交给响应。
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self.pending = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.pending = 0
+        return data
+
+
+def meeting_lines(
+    repository: MeetingRepository, header: MeetingRecord
+) -> Iterator[bytes]:
+    meeting = header.model_dump_json(exclude={"events"}).encode("utf-8")
+    yield b'{"type":"meeting","meeting":' + meeting + b"}\n"
+    for event in repository.iter_event_json(header.meeting_id):
+        yield EVENT_PREFIX + event + b"}\n"
+
+
+def iter_ndjson(
+    repository: MeetingRepository, headers: Iterable[MeetingRecord]
+) -> Iterator[bytes]:
+    buffer = bytearray()
+    for header in headers:
+        for line in meeting_lines(repository, header):
+            buffer += line
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def iter_zip(
+    repository: MeetingRepository, headers: Iterable[MeetingRecord]
+) -> Iterator[bytes]:
+    sink = _ArchiveSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for header in headers:
+            screenshots: list[ScreenshotPayload] = []
+            with archive.open(f"{header.meeting_id}/meeting.ndjson", "w") as entry:
+                for line in meeting_lines(repository, header):
+                    entry.write(line)
+                    if SCREENSHOT_MARKER in line:
+                        event = MeetingEvent.model_validate_json(
+                            line[len(EVENT_PREFIX) : -2]
+                        )
+                        if isinstance(event.payload, ScreenshotPayload):
+                            screenshots.append(event.payload)
+                    if sink.pending >= EXPORT_CHUNK_BYTES:
+                        yield sink.drain()
+            for payload in screenshots:
+                path = asset_path(repository, header.meeting_id, payload)
+                if path is None:
+                    continue
+                info = zipfile.ZipInfo(
+                    f"{header.meeting_id}/assets/{payload.asset_id}{path.suffix}",
+                    date_time=header.started_at.timetuple()[:6],
+                )
+                # 图片本身已压缩，原样存入
+                info.compress_type = zipfile.ZIP_STORED
+                info.file_size = path.stat().st_size
+                with archive.open(info, "w") as entry, path.open("rb") as source:
+                    while chunk := source.read(EXPORT_CHUNK_BYTES):
+                        entry.write(chunk)
+                        if sink.pending >= EXPORT_CHUNK_BYTES:
+                            yield sink.drain()
+            if sink.pending:
+                yield sink.drain()
+    # 中央目录在关闭归档时写出
+    if sink.pending:
+        yield sink.drain()
+
+
+def asset_path(
+    repository: MeetingRepository, meeting_id: str, payload: ScreenshotPayload
+) -> Path | None:
+    location = repository.screenshot_assets.locate(meeting_id, payload.asset_id)
+    path = (
+        location.path
+        if location is not None
+        else repository.root / payload.relative_path
+    ).resolve()
+    if repository.root.resolve() not in path.parents or not path.is_file():
+        return None
+    return path
+
+
+def iter_export(
+    repository: MeetingRepository,
+    headers: Iterable[MeetingRecord],
+    export_format: str,
+) -> Iterator[bytes]:
+    if export_format == "zip":
+        return iter_zip(repository, headers)
+    return iter_ndjson(repository, headers)
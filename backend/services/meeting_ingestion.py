@@ -33,6 +33,7 @@ class ScreenshotAnalysisResult:
     model: str | None = None
     evidence_kind: str = "none"
     image_rejection: str | None = None
+    reused_from: str | None = None
 
 
 class MeetingIngestionService:
@@ -96,26 +97,40 @@ class MeetingIngestionService:
         *,
         local_ocr_text: str | None = None,
         ocr_engine: str | None = None,
+        sha256: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        asset_id: str | None = None,
+        perceptual_hash: str | None = None,
     ) -> MeetingEvent:
         resolved = path.resolve()
         root = self.repository.root.resolve()
         if root not in resolved.parents:
             raise ValueError("截图必须存储在 PromptMeet 数据目录内")
-        data = resolved.read_bytes()
-        width, height = self._dimensions(data, mime_type)
+        if sha256 is None:
+            data = resolved.read_bytes()
+            sha256 = hashlib.sha256(data).hexdigest()
+            width, height = self._dimensions(data, mime_type)
+        elif not resolved.is_file():
+            raise FileNotFoundError(resolved)
+        elif width is None and height is None:
+            # 摘要由调用方提供时，尺寸只需读文件头
+            with resolved.open("rb") as image:
+                width, height = self._dimensions(image.read(24), mime_type)
         event = MeetingEvent(
             occurred_at=datetime.now(UTC),
             kind=EventKind.SCREENSHOT,
             provenance=EventProvenance(source="native_screenshot"),
             payload=ScreenshotPayload(
-                asset_id=resolved.stem,
+                asset_id=asset_id or resolved.stem,
                 relative_path=resolved.relative_to(root).as_posix(),
                 mime_type=mime_type,
-                sha256=hashlib.sha256(data).hexdigest(),
+                sha256=sha256,
                 width=width,
                 height=height,
                 local_ocr_text=(local_ocr_text or "").strip() or None,
                 ocr_engine=ocr_engine if local_ocr_text else None,
+                perceptual_hash=perceptual_hash,
             ),
         )
         return self.repository.append(meeting_id, event).events[-1]
@@ -133,6 +148,7 @@ class MeetingIngestionService:
                 source="multimodal_analysis",
                 provider=result.provider,
                 model=result.model,
+                reused_from=result.reused_from,
             ),
             payload=ScreenshotAnalysisPayload(
                 asset_id=asset_id,
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-import threading
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from pathlib import Path
 
@@ -15,6 +15,10 @@ from models.meeting_context import (
     SummaryPayload,
     TranscriptPayload,
 )
+from services.asset_store import ScreenshotAssetStore
+from services.event_index import MeetingEventIndex
+from services.file_lock import InterProcessLock
+from services.search_index import MeetingSearchIndex, SearchHit
 
 
 class MeetingNotFoundError(KeyError):
@@ -32,7 +36,16 @@ class MeetingRepository:
         self.assets_directory = self.root / "assets"
         self.records_directory.mkdir(parents=True, exist_ok=True)
         self.assets_directory.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.RLock()
+        self.screenshot_assets = ScreenshotAssetStore(self.assets_directory)
+        self.event_index = MeetingEventIndex(self.records_directory / "events")
+        self.headers_directory = self.records_directory / "headers"
+        self.headers_directory.mkdir(parents=True, exist_ok=True)
+        self.search_index = MeetingSearchIndex(
+            self.records_directory / "search.sqlite3"
+        )
+        self._search_synced = False
+        # 多个 worker 共用同一数据目录时，读改写整份记录必须跨进程串行
+        self._lock = InterProcessLock(self.records_directory / ".lock")
 
     def create(self, meeting_id: str, started_at: datetime) -> MeetingRecord:
         with self._lock:
@@ -58,7 +71,7 @@ class MeetingRepository:
             updated = record.model_copy(
                 update={"events": [*record.events, bound_event]}
             )
-            self._write(updated)
+            self._write(updated, appended=bound_event)
             return updated
 
     def append_transcript(
@@ -89,7 +102,7 @@ class MeetingRepository:
             updated = record.model_copy(
                 update={"events": [*record.events, bound_event]}
             )
-            self._write(updated)
+            self._write(updated, appended=bound_event)
             return bound_event, True
 
     def finish(
@@ -103,7 +116,7 @@ class MeetingRepository:
             if record is None or record.status == MeetingStatus.RECOVERY_REQUIRED:
                 raise MeetingNotFoundError(meeting_id)
             updated = record.model_copy(update={"ended_at": ended_at, "status": status})
-            self._write(updated)
+            self._write(updated, events_changed=False)
             return updated
 
     def set_title(self, meeting_id: str, title: str) -> MeetingRecord:
@@ -112,7 +125,7 @@ class MeetingRepository:
             if record is None or record.status == MeetingStatus.RECOVERY_REQUIRED:
                 raise MeetingNotFoundError(meeting_id)
             updated = record.model_copy(update={"title": title})
-            self._write(updated)
+            self._write(updated, events_changed=False)
             return updated
 
     def enrich_transcript_translation(
@@ -162,6 +175,30 @@ class MeetingRepository:
                 return None
             return self._read(path)
 
+    def events_after(
+        self, meeting_id: str, after: int = 0, limit: int = 500
+    ) -> tuple[list[MeetingEvent], int]:
+        with self._lock:
+            path = self._path(meeting_id)
+            if not path.exists():
+                self._migrate_legacy()
+            if not path.exists():
+                raise MeetingNotFoundError(meeting_id)
+            return self.event_index.events_after(
+                path, lambda: self._read(path), after, limit
+            )
+
+    def revision(self, meeting_id: str) -> tuple[int, int]:
+        # (最后一个事件序号, 记录文件修改时间)；标题、状态和翻译等原地修改不产生新序号。
+        with self._lock:
+            path = self._path(meeting_id)
+            if not path.exists():
+                self._migrate_legacy()
+            if not path.exists():
+                raise MeetingNotFoundError(meeting_id)
+            sequence = self.event_index.last_sequence(path, lambda: self._read(path))
+            return sequence, path.stat().st_mtime_ns
+
     def list(self) -> list[MeetingRecord]:
         with self._lock:
             self._migrate_legacy()
@@ -170,6 +207,77 @@ class MeetingRepository:
             ]
             return sorted(records, key=lambda record: record.started_at, reverse=True)
 
+    def header(self, meeting_id: str) -> MeetingRecord:
+        # 不含事件的会议元数据，导出和按日期筛选时不必解析整份记录。
+        with self._lock:
+            path = self._path(meeting_id)
+            if not path.exists():
+                self._migrate_legacy()
+            if not path.exists():
+                raise MeetingNotFoundError(meeting_id)
+            header_path = self._header_path(meeting_id)
+            if (
+                not header_path.exists()
+                or header_path.stat().st_mtime_ns < path.stat().st_mtime_ns
+            ):
+                self._write_header(self._read(path))
+            return MeetingRecord.model_validate_json(
+                header_path.read_text(encoding="utf-8")
+            )
+
+    def headers(
+        self,
+        started_from: datetime | None = None,
+        started_before: datetime | None = None,
+    ) -> list[MeetingRecord]:
+        with self._lock:
+            self._migrate_legacy()
+            meeting_ids = [path.stem for path in self.records_directory.glob("*.json")]
+        headers = []
+        for meeting_id in meeting_ids:
+            try:
+                header = self.header(meeting_id)
+            except MeetingNotFoundError:
+                continue
+            if started_from is not None and header.started_at < started_from:
+                continue
+            if started_before is not None and header.started_at >= started_before:
+                continue
+            headers.append(header)
+        return sorted(headers, key=lambda header: header.started_at)
+
+    def iter_event_json(self, meeting_id: str) -> Iterator[bytes]:
+        # 逐行返回事件 JSON 原文，内存只占一行
+        with self._lock:
+            path = self._path(meeting_id)
+            if not path.exists():
+                self._migrate_legacy()
+            if not path.exists():
+                raise MeetingNotFoundError(meeting_id)
+            return self.event_index.iter_lines(path, lambda: self._read(path))
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        if not self._search_synced:
+            self._sync_search_index()
+        return self.search_index.search(query, limit)
+
+    def _sync_search_index(self) -> None:
+        # 首次查询时按修改时间对齐索引：补上索引建立前或其他进程写入的记录，删掉已消失的会议。
+        # 逐个会议加锁，补建大量历史记录时不会长时间挡住正在进行的会议写入。
+        with self._lock:
+            self._migrate_legacy()
+            indexed = self.search_index.indexed_meetings()
+            paths = list(self.records_directory.glob("*.json"))
+        for path in paths:
+            with self._lock:
+                if not path.exists():
+                    continue
+                mtime_ns = path.stat().st_mtime_ns
+                if indexed.get(path.stem) != mtime_ns:
+                    self.search_index.index_record(self._read(path), mtime_ns)
+        self.search_index.remove_meetings(set(indexed) - {path.stem for path in paths})
+        self._search_synced = True
+
     def _read(self, path: Path) -> MeetingRecord:
         try:
             return MeetingRecord.model_validate_json(path.read_text(encoding="utf-8"))
@@ -179,7 +287,12 @@ class MeetingRepository:
                 f"无法读取本地会议记录，原文件已保留：{error.__class__.__name__}",
             )
 
-    def _write(self, record: MeetingRecord) -> None:
+    def _write(
+        self,
+        record: MeetingRecord,
+        appended: MeetingEvent | None = None,
+        events_changed: bool = True,
+    ) -> None:
         path = self._path(record.meeting_id)
         temporary = path.with_suffix(".tmp")
         temporary.write_text(
@@ -187,6 +300,29 @@ class MeetingRepository:
             encoding="utf-8",
         )
         temporary.replace(path)
+        self._write_header(record)
+        mtime_ns = path.stat().st_mtime_ns
+        if appended is not None:
+            self.event_index.append(appended)
+            self.search_index.index_event(appended, mtime_ns)
+        else:
+            self.event_index.rebuild(record)
+            if events_changed:
+                self.search_index.index_record(record, mtime_ns)
+            else:
+                self.search_index.touch(record.meeting_id, mtime_ns)
+
+    def _write_header(self, record: MeetingRecord) -> None:
+        path = self._header_path(record.meeting_id)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(
+            record.model_copy(update={"events": []}).model_dump_json(),
+            encoding="utf-8",
+        )
+        temporary.replace(path)
+
+    def _header_path(self, meeting_id: str) -> Path:
+        return self.headers_directory / f"{meeting_id}.json"
 
     def _path(self, meeting_id: str) -> Path:
         if (
@@ -1,10 +1,31 @@
+import asyncio
+import os
 import re
+import struct
+import time
+from collections.abc import Callable
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from threading import Lock
 
+import numpy as np
+
 from models.native_bridge import NativeAudioChunk, NativeAudioReceipt
+from services.file_lock import InterProcessLock
+from services.voice_activity import VoiceActivityDetector
 
 SESSION_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+# sequence, offset, length, captured_at(微秒), meeting_time_ms, sample_rate, channels, flags
+SPOOL_INDEX_RECORD = struct.Struct("<QQIqQIBB2x")
+SPEECH_FLAG = 1
+SILENCE_FLAG = 2
+VAD_MODES = {"off", "mark", "drop"}
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+SPOOL_BUFFER_BYTES = 256 * 1024
+# 流式上传帧头：payload_length, sequence, captured_at(微秒，0 表示服务端时间), meeting_time_ms
+STREAM_FRAME_HEADER = struct.Struct("<IQqQ")
 
 
 class NativeAudioValidationError(ValueError):
@@ -18,11 +39,326 @@ class NativeAudioSequenceError(ValueError):
         self.received = received
 
 
+@dataclass(frozen=True)
+class NativeAudioSpoolEntry:
+    sequence: int
+    offset: int
+    length: int
+    captured_at: datetime
+    meeting_time_ms: int
+    sample_rate: int
+    channels: int
+    speech: bool | None = None
+
+    @property
+    def duration_ms(self) -> int:
+        return self.length * 1000 // (2 * self.channels * self.sample_rate)
+
+    def pack(self) -> bytes:
+        captured_at = self.captured_at
+        if captured_at.tzinfo is None:
+            captured_at = captured_at.replace(tzinfo=UTC)
+        return SPOOL_INDEX_RECORD.pack(
+            self.sequence,
+            self.offset,
+            self.length,
+            (captured_at - EPOCH) // timedelta(microseconds=1),
+            self.meeting_time_ms,
+            self.sample_rate,
+            self.channels,
+            {True: SPEECH_FLAG, False: SILENCE_FLAG}.get(self.speech, 0),
+        )
+
+    @classmethod
+    def unpack(cls, record: bytes) -> "NativeAudioSpoolEntry":
+        (
+            sequence,
+            offset,
+            length,
+            captured_us,
+            meeting_ms,
+            sample_rate,
+            channels,
+            flags,
+        ) = SPOOL_INDEX_RECORD.unpack(record)
+        return cls(
+            sequence=sequence,
+            offset=offset,
+            length=length,
+            captured_at=EPOCH + timedelta(microseconds=captured_us),
+            meeting_time_ms=meeting_ms,
+            sample_rate=sample_rate,
+            channels=channels,
+            speech={SPEECH_FLAG: True, SILENCE_FLAG: False}.get(flags),
+        )
+
+
+class _SpoolWriter:
+    def __init__(self, data_path: Path, index_path: Path, preallocate_bytes: int):
+        self.data_path = data_path
+        self.index_path = index_path
+        self.preallocate_bytes = preallocate_bytes
+        entries = read_spool_index(index_path)
+        self.data_end = max(
+            (entry.offset + entry.length for entry in entries), default=0
+        )
+        self.data = open(
+            data_path,
+            "r+b" if data_path.exists() else "w+b",
+            buffering=SPOOL_BUFFER_BYTES,
+        )
+        self.allocated = os.fstat(self.data.fileno()).st_size
+        self.data.seek(self.data_end)
+        self.index = open(index_path, "ab")
+        self.dirty = False
+        self.closed = False
+        # 写入只持有 _lock；fsync 持有 _sync_lock，和写入并行，只与关闭互斥。
+        self._lock = Lock()
+        self._sync_lock = Lock()
+
+    def append(
+        self,
+        chunk: NativeAudioChunk,
+        payload: bytes,
+        speech: bool | None = None,
+    ) -> NativeAudioSpoolEntry:
+        end = self.data_end + len(payload)
+        if end > self.allocated:
+            self.allocated = end + self.preallocate_bytes
+            self._preallocate()
+        entry = NativeAudioSpoolEntry(
+            sequence=chunk.sequence,
+            offset=self.data_end,
+            length=len(payload),
+            captured_at=chunk.captured_at,
+            meeting_time_ms=chunk.meeting_time_ms,
+            sample_rate=chunk.sample_rate,
+            channels=chunk.channels,
+            speech=speech,
+        )
+        with self._lock:
+            self.data.write(payload)
+            self.index.write(entry.pack())
+            self.data_end = end
+            self.dirty = True
+        return entry
+
+    def advance(self, entries: list[NativeAudioSpoolEntry]) -> None:
+        # 其他 worker 追加了索引项：写入位置移到它们的数据之后，避免覆盖。
+        with self._lock:
+            end = max((entry.offset + entry.length for entry in entries), default=0)
+            if end > self.data_end:
+                self.data_end = end
+                self.data.seek(end)
+            self.allocated = max(self.allocated, os.fstat(self.data.fileno()).st_size)
+
+    def flush(self) -> None:
+        with self._lock:
+            self.data.flush()
+            self.index.flush()
+
+    def sync(self) -> None:
+        with self._sync_lock:
+            with self._lock:
+                if self.closed or not self.dirty:
+                    return
+                self.data.flush()
+                self.index.flush()
+                self.dirty = False
+            # 先落盘音频再落盘索引，尽量避免索引指向尚未持久化的数据。
+            os.fsync(self.data.fileno())
+            os.fsync(self.index.fileno())
+
+    def close(self) -> None:
+        with self._sync_lock, self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            # 去掉预分配留下的零填充，直接读取 .pcm 的工具不会读到尾部静音。
+            self.data.flush()
+            if self.allocated > self.data_end:
+                os.ftruncate(self.data.fileno(), self.data_end)
+                self.allocated = self.data_end
+            os.fsync(self.data.fileno())
+            self.index.flush()
+            os.fsync(self.index.fileno())
+            self.data.close()
+            self.index.close()
+
+    def _preallocate(self) -> None:
+        self.data.flush()
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self.data.fileno(), 0, self.allocated)
+                return
+            except OSError:
+                pass
+        os.ftruncate(self.data.fileno(), self.allocated)
+
+
+@dataclass(frozen=True)
+class NativeAudioFrame:
+    sequence: int
+    captured_at: datetime | None
+    meeting_time_ms: int
+    payload: bytes
+
+
+class NativeAudioFrameDecoder:
+    def __init__(self, max_payload_bytes: int) -> None:
+        self.max_payload_bytes = max_payload_bytes
+        self._buffer = bytearray()
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> list[NativeAudioFrame]:
+        self._buffer += data
+        frames = []
+        header_size = STREAM_FRAME_HEADER.size
+        start = 0
+        while len(self._buffer) - start >= header_size:
+            length, sequence, captured_us, meeting_ms = STREAM_FRAME_HEADER.unpack_from(
+                self._buffer, start
+            )
+            if length == 0 or length > self.max_payload_bytes:
+                raise NativeAudioValidationError("音频帧长度无效")
+            end = start + header_size + length
+            if len(self._buffer) < end:
+                break
+            frames.append(
+                NativeAudioFrame(
+                    sequence=sequence,
+                    captured_at=(
+                        EPOCH + timedelta(microseconds=captured_us)
+                        if captured_us
+                        else None
+                    ),
+                    meeting_time_ms=meeting_ms,
+                    payload=bytes(self._buffer[start + header_size : end]),
+                )
+            )
+            start = end
+        del self._buffer[:start]
+        return frames
+
+    @staticmethod
+    def encode(
+        sequence: int,
+        payload: bytes,
+        *,
+        captured_at: datetime | None = None,
+        meeting_time_ms: int = 0,
+    ) -> bytes:
+        captured_us = (
+            (captured_at - EPOCH) // timedelta(microseconds=1) if captured_at else 0
+        )
+        return (
+            STREAM_FRAME_HEADER.pack(
+                len(payload), sequence, captured_us, meeting_time_ms
+            )
+            + payload
+        )
+
+
+class _SequenceWindow:
+    # floor 以下的序号全部已收到；floor 之上的乱序到达记录在位图里。
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.floor = 0
+        self.bits = 0
+        self.highest = -1
+
+    def add(self, sequence: int) -> bool:
+        if sequence < self.floor:
+            return False
+        offset = sequence - self.floor
+        if offset >= self.size:
+            # 超出窗口的空洞视为已丢失，不再等待补发。
+            shift = offset - self.size + 1
+            self.bits >>= shift
+            self.floor += shift
+            offset = self.size - 1
+        mask = 1 << offset
+        if self.bits & mask:
+            return False
+        self.bits |= mask
+        while self.bits & 1:
+            self.bits >>= 1
+            self.floor += 1
+        self.highest = max(self.highest, sequence)
+        return True
+
+
+def speech_segments(entries: list[NativeAudioSpoolEntry]) -> list[tuple[int, int]]:
+    segments: list[tuple[int, int]] = []
+    start: int | None = None
+    end = 0
+    for entry in sorted(entries, key=lambda item: item.meeting_time_ms):
+        if entry.speech is False:
+            if start is not None:
+                segments.append((start, entry.meeting_time_ms))
+                start = None
+            continue
+        if start is None:
+            start = entry.meeting_time_ms
+        end = entry.meeting_time_ms + entry.duration_ms
+    if start is not None:
+        segments.append((start, end))
+    return segments
+
+
+def read_spool_index(index_path: Path, start: int = 0) -> list[NativeAudioSpoolEntry]:
+    if not index_path.exists():
+        return []
+    with index_path.open("rb") as handle:
+        handle.seek(start)
+        raw = handle.read()
+    size = SPOOL_INDEX_RECORD.size
+    # 进程异常退出时最后一条记录可能只写了一半，直接忽略。
+    return [
+        NativeAudioSpoolEntry.unpack(raw[start : start + size])
+        for start in range(0, len(raw) - size + 1, size)
+    ]
+
+
 class NativeAudioIngress:
-    def __init__(self, root: Path, max_payload_bytes: int = 4 * 1024 * 1024) -> None:
+    def __init__(
+        self,
+        root: Path,
+        max_payload_bytes: int = 4 * 1024 * 1024,
+        *,
+        spool: bool = False,
+        fsync_interval_seconds: float = 1.0,
+        preallocate_bytes: int = 8 * 1024 * 1024,
+        sequence_window: int = 4096,
+        idle_seconds: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+        vad_mode: str = "off",
+        shared: bool = False,
+    ) -> None:
+        if vad_mode not in VAD_MODES:
+            raise ValueError(f"不支持的语音检测模式: {vad_mode}")
         self.root = Path(root)
         self.max_payload_bytes = max_payload_bytes
-        self._seen_sequences: dict[str, set[int]] = {}
+        self.spool = spool
+        self.fsync_interval_seconds = fsync_interval_seconds
+        self.preallocate_bytes = preallocate_bytes
+        self.sequence_window = sequence_window
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self._sequences: dict[str, _SequenceWindow] = {}
+        self._last_active: dict[str, float] = {}
+        self._writers: dict[tuple[str, str], _SpoolWriter] = {}
+        self.vad_mode = vad_mode
+        self._detectors: dict[int, VoiceActivityDetector] = {}
+        self._hangover: dict[tuple[str, str], int] = {}
+        # 多个 worker 写同一个会话时，按会话加跨进程锁，并在锁内读取其他 worker
+        # 追加的 .idx 尾部，更新写入位置和已收到的序号。
+        self.shared = shared
+        self._session_locks: dict[str, InterProcessLock] = {}
+        self._index_offsets: dict[tuple[str, str], int] = {}
         self._lock = Lock()
 
     def accept(
@@ -34,19 +370,34 @@ class NativeAudioIngress:
         self._validate(session_id, payload)
 
         with self._lock:
-            seen = self._seen_sequences.setdefault(session_id, set())
-            if chunk.sequence in seen:
-                raise NativeAudioSequenceError(
-                    max(seen, default=-1) + 1, chunk.sequence
-                )
-
+            now = self.clock()
+            self._evict_idle(now)
+            self._last_active[session_id] = now
             session_dir = self.root / session_id
             session_dir.mkdir(parents=True, exist_ok=True)
-            path = session_dir / f"{chunk.sequence:08d}-{chunk.source}.pcm"
-            metadata_path = path.with_suffix(".json")
-            path.write_bytes(payload)
-            metadata_path.write_text(chunk.model_dump_json(), encoding="utf-8")
-            seen.add(chunk.sequence)
+            with self._session_lock(session_id):
+                sequences = self._sequences.get(session_id)
+                if sequences is None:
+                    sequences = self._restore_sequences(session_id)
+                    self._sequences[session_id] = sequences
+                elif self.shared:
+                    for entry in self._catch_up(session_id):
+                        sequences.add(entry.sequence)
+                if not sequences.add(chunk.sequence) or (
+                    self.shared
+                    and not self.spool
+                    and any(session_dir.glob(f"{chunk.sequence:08d}-*.json"))
+                ):
+                    raise NativeAudioSequenceError(
+                        sequences.highest + 1, chunk.sequence
+                    )
+
+                if self.spool:
+                    return self._append_to_spool(session_id, chunk, payload)
+                path = session_dir / f"{chunk.sequence:08d}-{chunk.source}.pcm"
+                metadata_path = path.with_suffix(".json")
+                path.write_bytes(payload)
+                metadata_path.write_text(chunk.model_dump_json(), encoding="utf-8")
 
         return NativeAudioReceipt(
             sequence=chunk.sequence,
@@ -54,9 +405,201 @@ class NativeAudioIngress:
             metadata_path=metadata_path,
         )
 
+    def spool_entries(
+        self, session_id: str, source: str
+    ) -> list[NativeAudioSpoolEntry]:
+        with self._lock:
+            writer = self._writers.get((session_id, source))
+            if writer is not None:
+                writer.data.flush()
+                writer.index.flush()
+            return read_spool_index(self.root / session_id / f"{source}.idx")
+
+    def session_audio(
+        self, session_id: str
+    ) -> dict[str, list[tuple[NativeAudioSpoolEntry, Path]]]:
+        if not SESSION_ID.fullmatch(session_id):
+            raise NativeAudioValidationError("会话 ID 无效")
+        session_dir = self.root / session_id
+        with self._lock:
+            for key, writer in self._writers.items():
+                if key[0] == session_id:
+                    writer.data.flush()
+                    writer.index.flush()
+        tracks: dict[str, list[tuple[NativeAudioSpoolEntry, Path]]] = {}
+        if not session_dir.is_dir():
+            return tracks
+        for index_path in sorted(session_dir.glob("*.idx")):
+            data_path = index_path.with_suffix(".pcm")
+            tracks.setdefault(index_path.stem, []).extend(
+                (entry, data_path) for entry in read_spool_index(index_path)
+            )
+        # 兼容逐分片文件布局：每个分片一个 .pcm 和一个 .json。
+        for metadata_path in sorted(session_dir.glob("*-*.json")):
+            data_path = metadata_path.with_suffix(".pcm")
+            if not data_path.is_file():
+                continue
+            chunk = NativeAudioChunk.model_validate_json(metadata_path.read_bytes())
+            tracks.setdefault(chunk.source, []).append(
+                (
+                    NativeAudioSpoolEntry(
+                        sequence=chunk.sequence,
+                        offset=0,
+                        length=data_path.stat().st_size,
+                        captured_at=chunk.captured_at,
+                        meeting_time_ms=chunk.meeting_time_ms,
+                        sample_rate=chunk.sample_rate,
+                        channels=chunk.channels,
+                    ),
+                    data_path,
+                )
+            )
+        for entries in tracks.values():
+            entries.sort(key=lambda item: item[0].sequence)
+        return tracks
+
+    def flush(self) -> None:
+        # fsync 不持有全局锁，其他会话和音源的写入不必等待磁盘。
+        with self._lock:
+            writers = list(self._writers.values())
+        for writer in writers:
+            writer.sync()
+
+    async def run_flush(self) -> None:
+        if not self.spool:
+            return
+        while True:
+            await asyncio.sleep(self.fsync_interval_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def close(self, session_id: str | None = None) -> None:
+        with self._lock:
+            self._close_writers(session_id)
+
     def reset(self, session_id: str) -> None:
         with self._lock:
-            self._seen_sequences.pop(session_id, None)
+            # 保留一个空的跟踪器，避免下一次写入又从磁盘恢复旧序号。
+            self._sequences[session_id] = _SequenceWindow(self.sequence_window)
+            self._last_active[session_id] = self.clock()
+        self.close(session_id)
+
+    def tracked_sessions(self) -> list[str]:
+        with self._lock:
+            return list(self._sequences)
+
+    def _evict_idle(self, now: float) -> None:
+        for session_id, last_active in list(self._last_active.items()):
+            if now - last_active < self.idle_seconds:
+                continue
+            self._last_active.pop(session_id)
+            self._sequences.pop(session_id, None)
+            self._close_writers(session_id)
+            for key in list(self._index_offsets):
+                if key[0] == session_id:
+                    del self._index_offsets[key]
+
+    def _close_writers(self, session_id: str | None) -> None:
+        for key in list(self._writers):
+            if session_id is None or key[0] == session_id:
+                with self._session_lock(key[0]):
+                    if self.shared:
+                        # 截断 .pcm 之前先跟上其他 worker 的写入，不截掉它们的数据。
+                        self._catch_up(key[0])
+                    self._writers.pop(key).close()
+                self._hangover.pop(key, None)
+        for locked in list(self._session_locks):
+            if session_id is None or locked == session_id:
+                self._session_locks.pop(locked).close()
+
+    def _session_lock(self, session_id: str) -> InterProcessLock | nullcontext:
+        if not self.shared:
+            return nullcontext()
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = InterProcessLock(self.root / session_id / ".lock")
+            self._session_locks[session_id] = lock
+        return lock
+
+    def _catch_up(self, session_id: str) -> list[NativeAudioSpoolEntry]:
+        # 读取本进程上次读到之后追加的索引项；本进程自己的写入已经计入偏移量。
+        appended: list[NativeAudioSpoolEntry] = []
+        for index_path in (self.root / session_id).glob("*.idx"):
+            key = (session_id, index_path.stem)
+            start = self._index_offsets.get(key, 0)
+            entries = read_spool_index(index_path, start)
+            if not entries:
+                continue
+            self._index_offsets[key] = start + len(entries) * SPOOL_INDEX_RECORD.size
+            writer = self._writers.get(key)
+            if writer is not None:
+                writer.advance(entries)
+            appended.extend(entries)
+        return appended
+
+    def _restore_sequences(self, session_id: str) -> _SequenceWindow:
+        sequences = _SequenceWindow(self.sequence_window)
+        session_dir = self.root / session_id
+        if not session_dir.is_dir():
+            return sequences
+        restored = [entry.sequence for entry in self._catch_up(session_id)]
+        for metadata_path in session_dir.glob("*.json"):
+            prefix = metadata_path.name.split("-", 1)[0]
+            if prefix.isdigit():
+                restored.append(int(prefix))
+        for sequence in sorted(restored):
+            sequences.add(sequence)
+        return sequences
+
+    def _append_to_spool(
+        self, session_id: str, chunk: NativeAudioChunk, payload: bytes
+    ) -> NativeAudioReceipt:
+        key = (session_id, chunk.source)
+        writer = self._writers.get(key)
+        if writer is None:
+            session_dir = self.root / session_id
+            writer = _SpoolWriter(
+                session_dir / f"{chunk.source}.pcm",
+                session_dir / f"{chunk.source}.idx",
+                self.preallocate_bytes,
+            )
+            self._writers[key] = writer
+        speech = self._detect_speech(key, chunk, payload)
+        if speech is False and self.vad_mode == "drop":
+            # 静音只记录索引项以保留时间线和序号，不写入 PCM。
+            payload = b""
+        entry = writer.append(chunk, payload, speech)
+        self._index_offsets[key] = (
+            self._index_offsets.get(key, 0) + SPOOL_INDEX_RECORD.size
+        )
+        if self.shared:
+            # 释放跨进程锁之前写出缓冲，其他 worker 才能读到新的索引尾部。
+            writer.flush()
+        return NativeAudioReceipt(
+            sequence=chunk.sequence,
+            path=writer.data_path,
+            metadata_path=writer.index_path,
+            offset=entry.offset,
+            length=entry.length,
+            speech=speech,
+        )
+
+    def _detect_speech(
+        self, key: tuple[str, str], chunk: NativeAudioChunk, payload: bytes
+    ) -> bool | None:
+        if self.vad_mode == "off":
+            return None
+        detector = self._detectors.get(chunk.sample_rate)
+        if detector is None:
+            detector = VoiceActivityDetector(chunk.sample_rate)
+            self._detectors[chunk.sample_rate] = detector
+        frame_bytes = 2 * chunk.channels
+        samples = np.frombuffer(
+            payload[: len(payload) - len(payload) % frame_bytes], dtype="<i2"
+        ).reshape(-1, chunk.channels)
+        speech, self._hangover[key] = detector.speech_frames(
+            samples, carried_hangover=self._hangover.get(key, 0)
+        )
+        return bool(speech.any())
 
     def _validate(self, session_id: str, payload: bytes) -> None:
         if not SESSION_ID.fullmatch(session_id):
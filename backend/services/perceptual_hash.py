@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from models.meeting_context import (
+    MeetingEvent,
+    MeetingRecord,
+    ScreenshotAnalysisPayload,
+    ScreenshotPayload,
+)
+from services.asset_store import CachedAnalysis
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# 64 位 dHash 的汉明距离；光标闪烁、时钟变化一般在 0-4 之间，换页通常超过 20。
+NEAR_DUPLICATE_DISTANCE = 6
+HASH_SIZE = 8
+# 先缩到 8 倍大小再用 NumPy 做块平均，比直接缩到 9x8 更能抗锯齿和噪点。
+OVERSAMPLE = 8
+
+
+def difference_hash(path: Path) -> str | None:
+    if Image is None:
+        return None
+    size = ((HASH_SIZE + 1) * OVERSAMPLE, HASH_SIZE * OVERSAMPLE)
+    try:
+        with Image.open(path) as image:
+            image.draft("L", size)
+            pixels = np.asarray(
+                image.convert("L").resize(size, Image.Resampling.BOX),
+                dtype=np.float32,
+            )
+    except (OSError, ValueError, Image.DecompressionBombError) as error:
+        logger.debug("截图无法计算感知哈希: %s, error=%s", path, error)
+        return None
+    cells = pixels.reshape(HASH_SIZE, OVERSAMPLE, HASH_SIZE + 1, OVERSAMPLE).mean(
+        axis=(1, 3)
+    )
+    bits = (cells[:, 1:] > cells[:, :-1]).flatten()
+    return f"{int(np.packbits(bits).view('>u8')[0]):016x}"
+
+
+def hamming_distance(left: str, right: str) -> int:
+    return (int(left, 16) ^ int(right, 16)).bit_count()
+
+
+def near_duplicates(left: str | None, right: str | None, max_distance: int) -> bool:
+    return (
+        max_distance >= 0
+        and left is not None
+        and right is not None
+        and hamming_distance(left, right) <= max_distance
+    )
+
+
+def previous_near_duplicate_analysis(
+    record: MeetingRecord, screenshot_event: MeetingEvent, max_distance: int
+) -> CachedAnalysis | None:
+    payload = screenshot_event.payload
+    if not isinstance(payload, ScreenshotPayload):
+        return None
+    previous = next(
+        (
+            event
+            for event in reversed(record.events)
+            if event.sequence < screenshot_event.sequence
+            and isinstance(event.payload, ScreenshotPayload)
+        ),
+        None,
+    )
+    if previous is None:
+        return None
+    analyses = {
+        event.event_id: event
+        for event in record.events
+        if isinstance(event.payload, ScreenshotAnalysisPayload)
+        and event.payload.status == "completed"
+    }
+    screenshots = {
+        event.payload.asset_id: event
+        for event in record.events
+        if isinstance(event.payload, ScreenshotPayload)
+    }
+    anchor = previous
+    analysis = next(
+        (
+            event
+            for event in reversed(analyses.values())
+            if event.payload.asset_id == previous.payload.asset_id
+        ),
+        None,
+    )
+    # 上一张的分析是复用来的就沿 reused_from 找回真正分析过的截图，
+    # 和它比较而不是和上一张比较，避免一串近似截图逐张漂移到别的画面。
+    visited: set[str] = set()
+    while (
+        analysis is not None
+        and analysis.provenance.reused_from in analyses
+        and analysis.event_id not in visited
+    ):
+        visited.add(analysis.event_id)
+        source = analyses[analysis.provenance.reused_from]
+        source_screenshot = screenshots.get(source.payload.asset_id)
+        if source_screenshot is None:
+            break
+        analysis, anchor = source, source_screenshot
+    if analysis is None or not near_duplicates(
+        anchor.payload.perceptual_hash, payload.perceptual_hash, max_distance
+    ):
+        return None
+    return CachedAnalysis(
+        event_id=analysis.event_id,
+        payload=analysis.payload,
+        provenance=analysis.provenance,
+    )
@@ -14,6 +14,7 @@ class ProviderContentPart:
     relative_path: str | None = None
     mime_type: str | None = None
     source_id: str | None = None
+    sha256: str | None = None
 
 
 @dataclass(frozen=True)
@@ -91,6 +92,7 @@ class MeetingPromptBuilder:
                             relative_path=payload.relative_path,
                             mime_type=payload.mime_type,
                             source_id=f"M{event.sequence}",
+                            sha256=payload.sha256,
                         ),
                     ]
                 )
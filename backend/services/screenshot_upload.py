@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+SCREENSHOT_MIME_TYPES = {"image/png": "png", "image/jpeg": "jpg"}
+MAX_SCREENSHOT_BYTES = 20 * 1024 * 1024
+MAX_PART_HEADER_BYTES = 16 * 1024
+# 上传内容攒到这么多再交给线程写盘，避免每个小块都切换一次线程
+UPLOAD_WRITE_BYTES = 256 * 1024
+PART_NAME = re.compile(r'\bname="([^"]*)"')
+
+
+class ScreenshotUploadError(ValueError):
+    def __init__(self, detail: str, status_code: int = 422) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class StoredScreenshot:
+    path: Path
+    mime_type: str
+    sha256: str
+    size: int
+    width: int | None = None
+    height: int | None = None
+
+
+class ScreenshotSink:
+    def __init__(
+        self,
+        path: Path,
+        mime_type: str,
+        max_bytes: int = MAX_SCREENSHOT_BYTES,
+    ) -> None:
+        if mime_type not in SCREENSHOT_MIME_TYPES:
+            raise ScreenshotUploadError("只接受 PNG 或 JPEG 截图")
+        self.path = path
+        self.mime_type = mime_type
+        self.signature = PNG_SIGNATURE if mime_type == "image/png" else JPEG_SIGNATURE
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        # PNG 的签名和 IHDR 宽高都在前 24 字节里，边写边留下这一段即可。
+        self._head = bytearray()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise ScreenshotUploadError("截图超过大小限制", 413)
+        if len(self._head) < 24:
+            self._head += chunk[: 24 - len(self._head)]
+            # 已到达的前几个字节和签名不符就立即拒绝，不必等整张图写完
+            known = min(len(self._head), len(self.signature))
+            if self._head[:known] != self.signature[:known]:
+                raise ScreenshotUploadError("只接受 PNG 或 JPEG 截图")
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self) -> StoredScreenshot:
+        self._file.close()
+        head = bytes(self._head)
+        if not head.startswith(self.signature):
+            self.discard()
+            raise ScreenshotUploadError("只接受 PNG 或 JPEG 截图")
+        width = height = None
+        if self.mime_type == "image/png" and len(head) >= 24:
+            width = int.from_bytes(head[16:20], "big")
+            height = int.from_bytes(head[20:24], "big")
+        return StoredScreenshot(
+            path=self.path,
+            mime_type=self.mime_type,
+            sha256=self._digest.hexdigest(),
+            size=self.size,
+            width=width,
+            height=height,
+        )
+
+    def discard(self) -> None:
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class MultipartReader:
+    def __init__(self, chunks: AsyncIterator[bytes], boundary: str) -> None:
+        self._chunks = aiter(chunks)
+        # 预置 CRLF，让第一个分隔符和后续分隔符的形式一致。
+        self._buffer = bytearray(b"\r\n")
+        self._delimiter = b"\r\n--" + boundary.encode("latin-1")
+        self._in_part = False
+        self._finished = False
+
+    async def next_part(self) -> dict[str, str] | None:
+        if self._finished:
+            return None
+        async for _ in self._until_delimiter():
+            pass
+        del self._buffer[: len(self._delimiter)]
+        await self._require(2)
+        if self._buffer[:2] == b"--":
+            self._finished = True
+            return None
+        while (end := self._buffer.find(b"\r\n\r\n")) < 0:
+            if len(self._buffer) > MAX_PART_HEADER_BYTES:
+                raise ScreenshotUploadError("multipart 头部过大")
+            await self._require(len(self._buffer) + 1)
+        try:
+            header_text = bytes(self._buffer[2:end]).decode("utf-8")
+        except UnicodeDecodeError as error:
+            raise ScreenshotUploadError("multipart 头部不是 UTF-8") from error
+        headers = {}
+        for line in header_text.split("\r\n"):
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        del self._buffer[: end + 4]
+        self._in_part = True
+        return headers
+
+    async def read(self) -> AsyncIterator[bytes]:
+        if not self._in_part:
+            return
+        async for chunk in self._until_delimiter():
+            yield chunk
+        self._in_part = False
+
+    async def read_text(self, max_bytes: int) -> str:
+        data = bytearray()
+        async for chunk in self.read():
+            data += chunk
+            if len(data) > max_bytes:
+                raise ScreenshotUploadError("multipart 字段超过大小限制")
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError as error:
+            raise ScreenshotUploadError("multipart 字段不是 UTF-8") from error
+
+    @staticmethod
+    def part_name(headers: dict[str, str]) -> str | None:
+        match = PART_NAME.search(headers.get("content-disposition", ""))
+        return match.group(1) if match else None
+
+    async def _until_delimiter(self) -> AsyncIterator[bytes]:
+        keep = len(self._delimiter) - 1
+        while (index := self._buffer.find(self._delimiter)) < 0:
+            # 末尾可能是被切开的分隔符前缀，留到下一块再判断。
+            if len(self._buffer) > keep:
+                ready = bytes(self._buffer[:-keep])
+                del self._buffer[:-keep]
+                yield ready
+            if not await self._fill():
+                raise ScreenshotUploadError("multipart 请求体不完整")
+        if index:
+            ready = bytes(self._buffer[:index])
+            del self._buffer[:index]
+            yield ready
+
+    async def _require(self, size: int) -> None:
+        while len(self._buffer) < size:
+            if not await self._fill():
+                raise ScreenshotUploadError("multipart 请求体不完整")
+
+    async def _fill(self) -> bool:
+        chunk = await anext(self._chunks, None)
+        if chunk is None:
+            return False
+        self._buffer += chunk
+        return True
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from models.meeting_context import (
+    AnswerPayload,
+    MeetingEvent,
+    MeetingRecord,
+    ScreenshotAnalysisPayload,
+    ScreenshotPayload,
+    SummaryPayload,
+    TranscriptPayload,
+)
+from services.context_builder import search_terms
+
+SNIPPET_RADIUS = 40
+# 每次查询最多给这么多文档打分；按词的文档频率从低到高收集候选，常见词只取最近的文档。
+MAX_CANDIDATES = 5000
+# BM25 参数
+TERM_SATURATION = 1.2
+LENGTH_WEIGHT = 0.75
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    meeting_id TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    document_id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    sequence INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    occurred_at TEXT NOT NULL,
+    text TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    UNIQUE (meeting_id, sequence)
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term_id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    document_id INTEGER NOT NULL,
+    frequency INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    PRIMARY KEY (term_id, document_id)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    meeting_id: str
+    sequence: int
+    kind: str
+    occurred_at: datetime
+    snippet: str
+    score: float
+
+
+def searchable_text(event: MeetingEvent) -> str:
+    payload = event.payload
+    if isinstance(payload, TranscriptPayload):
+        parts = [payload.text, payload.translated_text]
+    elif isinstance(payload, ScreenshotPayload):
+        parts = [payload.local_ocr_text]
+    elif isinstance(payload, ScreenshotAnalysisPayload):
+        parts = [payload.text]
+    elif isinstance(payload, AnswerPayload):
+        parts = [payload.answer]
+    elif isinstance(payload, SummaryPayload):
+        parts = [payload.summary_text, *payload.key_points, *payload.decisions]
+    else:
+        return ""
+    return "\n".join(part.strip() for part in parts if part and part.strip())
+
+
+# 所有会议共用一份 SQLite 倒排索引：追加事件时增量写入，记录被改写时按会议整体重建。
+class MeetingSearchIndex:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        # 首次读写时才打开，导入模块、构造仓库时不在磁盘上留下数据库文件
+        self._database: sqlite3.Connection | None = None
+        # (文档数, 总词数)，本连接写入时增量维护，避免每次查询都全表统计；
+        # 其他进程提交后 data_version 会变化，届时重新统计
+        self._statistics: tuple[int, int] | None = None
+        self._data_version: int | None = None
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._database is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(SCHEMA)
+                self._database = connection
+            return self._database
+
+    def index_event(self, event: MeetingEvent, mtime_ns: int) -> None:
+        with self._lock, self._connection:
+            self._remove_documents(
+                "WHERE meeting_id = ? AND sequence = ?",
+                (event.meeting_id, event.sequence),
+            )
+            self._insert_documents([event])
+            self._mark(event.meeting_id, mtime_ns)
+
+    def index_record(self, record: MeetingRecord, mtime_ns: int) -> None:
+        with self._lock, self._connection:
+            self._remove_documents("WHERE meeting_id = ?", (record.meeting_id,))
+            self._insert_documents(record.events)
+            self._mark(record.meeting_id, mtime_ns)
+
+    def touch(self, meeting_id: str, mtime_ns: int) -> None:
+        with self._lock, self._connection:
+            self._mark(meeting_id, mtime_ns)
+
+    def indexed_meetings(self) -> dict[str, int]:
+        with self._lock:
+            return dict(
+                self._connection.execute("SELECT meeting_id, mtime_ns FROM meetings")
+            )
+
+    def remove_meetings(self, meeting_ids: Iterable[str]) -> None:
+        with self._lock, self._connection:
+            for meeting_id in meeting_ids:
+                self._remove_documents("WHERE meeting_id = ?", (meeting_id,))
+                self._connection.execute(
+                    "DELETE FROM meetings WHERE meeting_id = ?", (meeting_id,)
+                )
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        terms = sorted(set(search_terms(query)))
+        if not terms:
+            return []
+        with self._lock:
+            document_count, total_length = self._document_statistics()
+            average_length = total_length / document_count if document_count else 1.0
+            weighted = []
+            for term in terms:
+                row = self._connection.execute(
+                    "SELECT term_id, (SELECT count(*) FROM postings "
+                    "WHERE postings.term_id = terms.term_id) "
+                    "FROM terms WHERE term = ?",
+                    (term,),
+                ).fetchone()
+                if row is None or not row[1]:
+                    continue
+                term_id, frequency = row
+                weight = math.log(
+                    1 + (document_count - frequency + 0.5) / (frequency + 0.5)
+                )
+                weighted.append((frequency, term_id, weight))
+            if not weighted:
+                return []
+            weighted.sort()
+            candidate_queries = []
+            candidate_parameters: list[int] = []
+            remaining = MAX_CANDIDATES
+            for frequency, term_id, _ in weighted:
+                if remaining <= 0:
+                    break
+                candidate_queries.append(
+                    "SELECT * FROM (SELECT document_id FROM postings "
+                    "WHERE term_id = ? ORDER BY document_id DESC LIMIT ?)"
+                )
+                candidate_parameters.extend((term_id, remaining))
+                remaining -= frequency
+            values = ", ".join("(?, ?)" for _ in weighted)
+            # 先按命中的不同词数排序（和上下文构建的相关度一致），再按 BM25 分数排序
+            rows = self._connection.execute(
+                f"""
+                WITH query(term_id, weight) AS (VALUES {values}),
+                candidates(document_id) AS ({" UNION ".join(candidate_queries)}),
+                ranked AS (
+                    SELECT postings.document_id,
+                           SUM(query.weight * postings.frequency * ? /
+                               (postings.frequency
+                                + ? * (? + ? * postings.length / ?))) AS score,
+                           COUNT(*) AS matched
+                    FROM candidates CROSS JOIN query
+                    JOIN postings ON postings.term_id = query.term_id
+                        AND postings.document_id = candidates.document_id
+                    GROUP BY postings.document_id
+                    ORDER BY matched DESC, score DESC, postings.document_id DESC
+                    LIMIT ?
+                )
+                SELECT documents.meeting_id, documents.sequence, documents.kind,
+                       documents.occurred_at, documents.text, ranked.score
+                FROM ranked JOIN documents USING (document_id)
+                ORDER BY ranked.matched DESC, ranked.score DESC,
+                         ranked.document_id DESC
+                """,
+                [
+                    *(
+                        value
+                        for _, term_id, weight in weighted
+                        for value in (term_id, weight)
+                    ),
+                    *candidate_parameters,
+                    TERM_SATURATION + 1,
+                    TERM_SATURATION,
+                    1 - LENGTH_WEIGHT,
+                    LENGTH_WEIGHT,
+                    average_length,
+                    limit,
+                ],
+            ).fetchall()
+        return [
+            SearchHit(
+                meeting_id=meeting_id,
+                sequence=sequence,
+                kind=kind,
+                occurred_at=datetime.fromisoformat(occurred_at),
+                snippet=self.snippet(text, query),
+                score=round(score, 4),
+            )
+            for meeting_id, sequence, kind, occurred_at, text, score in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._database is not None:
+                self._database.close()
+                self._database = None
+
+    @staticmethod
+    def snippet(text: str, query: str) -> str:
+        folded = text.lower()
+        positions = [
+            position
+            for term in sorted(set(search_terms(query)), key=len, reverse=True)
+            if (position := folded.find(term)) >= 0
+        ]
+        center = min(positions) if positions else 0
+        start = max(0, center - SNIPPET_RADIUS)
+        end = min(len(text), center + SNIPPET_RADIUS)
+        snippet = " ".join(text[start:end].split())
+        return f"{'…' if start else ''}{snippet}{'…' if end < len(text) else ''}"
+
+    def _insert_documents(self, events: Iterable[MeetingEvent]) -> None:
+        documents = []
+        for event in events:
+            text = searchable_text(event)
+            frequencies = Counter(search_terms(text))
+            if frequencies:
+                documents.append((event, text, frequencies))
+        if not documents:
+            return
+        term_ids = self._term_ids(
+            {term for _, _, frequencies in documents for term in frequencies}
+        )
+        postings = []
+        for event, text, frequencies in documents:
+            length = sum(frequencies.values())
+            cursor = self._connection.execute(
+                "INSERT INTO documents "
+                "(meeting_id, sequence, kind, occurred_at, text, length) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    event.meeting_id,
+                    event.sequence,
+                    event.kind.value,
+                    event.occurred_at.isoformat(),
+                    text,
+                    length,
+                ),
+            )
+            postings.extend(
+                (term_ids[term], cursor.lastrowid, frequency, length)
+                for term, frequency in frequencies.items()
+            )
+        self._connection.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?, ?)", postings
+        )
+        self._adjust_statistics(
+            len(documents),
+            sum(sum(frequencies.values()) for _, _, frequencies in documents),
+        )
+
+    def _remove_documents(self, where: str, parameters: tuple) -> None:
+        # 倒排表没有按文档的反向索引，删除时重新切词得到要删的 (词, 文档) 主键
+        removed = self._connection.execute(
+            f"SELECT document_id, text, length FROM documents {where}", parameters
+        ).fetchall()
+        if not removed:
+            return
+        term_ids = self._term_ids(
+            {term for _, text, _ in removed for term in search_terms(text)}
+        )
+        self._connection.executemany(
+            "DELETE FROM postings WHERE term_id = ? AND document_id = ?",
+            [
+                (term_ids[term], document_id)
+                for document_id, text, _ in removed
+                for term in set(search_terms(text))
+            ],
+        )
+        self._connection.execute(f"DELETE FROM documents {where}", parameters)
+        self._adjust_statistics(-len(removed), -sum(length for _, _, length in removed))
+
+    def _term_ids(self, terms: set[str]) -> dict[str, int]:
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO terms (term) VALUES (?)", [(term,) for term in terms]
+        )
+        term_ids = {}
+        ordered = list(terms)
+        for start in range(0, len(ordered), 500):
+            chunk = ordered[start : start + 500]
+            term_ids.update(
+                self._connection.execute(
+                    "SELECT term, term_id FROM terms "
+                    f"WHERE term IN ({', '.join('?' for _ in chunk)})",
+                    chunk,
+                )
+            )
+        return term_ids
+
+    def _mark(self, meeting_id: str, mtime_ns: int) -> None:
+        self._connection.execute(
+            "INSERT INTO meetings VALUES (?, ?) "
+            "ON CONFLICT(meeting_id) DO UPDATE SET mtime_ns = excluded.mtime_ns",
+            (meeting_id, mtime_ns),
+        )
+
+    def _document_statistics(self) -> tuple[int, int]:
+        (data_version,) = self._connection.execute("PRAGMA data_version").fetchone()
+        if data_version != self._data_version:
+            self._statistics = None
+            self._data_version = data_version
+        if self._statistics is None:
+            count, total = self._connection.execute(
+                "SELECT count(*), total(length) FROM documents"
+            ).fetchone()
+            self._statistics = (count, int(total))
+        return self._statistics
+
+    def _adjust_statistics(self, documents: int, length: int) -> None:
+        if self._statistics is not None:
+            count, total = self._statistics
+            self._statistics = (count + documents, total + length)
@@ -4,54 +4,280 @@
 """
 
 import logging
-from typing import Dict, Optional, List
-from datetime import datetime
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, List, Tuple, Union
 import threading
+import time
 
 from models.data_models import SessionState, TranscriptSegment, MeetingSummary
 
 logger = logging.getLogger(__name__)
 
 
-class SessionManager:
-    """会话管理器"""
+class MemorySessionBackend:
+    """进程内会话存储（默认）；返回的就是存储中的对象本身"""
 
     def __init__(self):
         self.sessions: Dict[str, SessionState] = {}
+        self.leases: Dict[str, Tuple[str, float]] = {}
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        yield
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        return self.sessions.get(session_id)
+
+    get_state = get
+
+    def put(self, session: SessionState):
+        self.sessions[session.session_id] = session
+
+    def put_segments(self, session_id: str, segments: List[TranscriptSegment]):
+        self.sessions[session_id].transcript_segments = list(segments)
+
+    def append_segment(self, session_id: str, segment: TranscriptSegment):
+        self.sessions[session_id].transcript_segments.append(segment)
+
+    def delete(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+    def values(self) -> List[SessionState]:
+        return list(self.sessions.values())
+
+    def get_lease(self, key: str) -> Optional[Tuple[str, float]]:
+        return self.leases.get(key)
+
+    def put_lease(self, key: str, owner: str, expires_at: float):
+        self.leases[key] = (owner, expires_at)
+
+    def delete_lease(self, key: str, owner: str):
+        if self.leases.get(key, (None,))[0] == owner:
+            del self.leases[key]
+
+
+class SQLiteSessionBackend:
+    """SQLite 会话存储，多个 uvicorn worker 共享同一份会话状态。
+    读出的是副本，修改后必须调用 update_session 写回。
+    转录片段单独按行保存，追加一条只写一行，不重写整个会话"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions "
+            "(session_id TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS transcript_segments "
+            "(session_id TEXT NOT NULL, position INTEGER NOT NULL, "
+            "segment TEXT NOT NULL, PRIMARY KEY (session_id, position))"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS leases "
+            "(key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # BEGIN IMMEDIATE 先拿写锁，读改写期间其他进程不能插入修改
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        session = self.get_state(session_id)
+        if session is not None:
+            session.transcript_segments = [
+                TranscriptSegment.model_validate_json(segment)
+                for (segment,) in self._connection.execute(
+                    "SELECT segment FROM transcript_segments "
+                    "WHERE session_id = ? ORDER BY position",
+                    (session_id,),
+                )
+            ]
+        return session
+
+    def get_state(self, session_id: str) -> Optional[SessionState]:
+        row = self._connection.execute(
+            "SELECT state FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return SessionState.model_validate_json(row[0]) if row else None
+
+    def put(self, session: SessionState):
+        self._connection.execute(
+            "INSERT INTO sessions VALUES (?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state",
+            (
+                session.session_id,
+                session.model_dump_json(exclude={"transcript_segments"}),
+            ),
+        )
+
+    def put_segments(self, session_id: str, segments: List[TranscriptSegment]):
+        self._connection.execute(
+            "DELETE FROM transcript_segments WHERE session_id = ?", (session_id,)
+        )
+        self._connection.executemany(
+            "INSERT INTO transcript_segments VALUES (?, ?, ?)",
+            [
+                (session_id, position, segment.model_dump_json())
+                for position, segment in enumerate(segments)
+            ],
+        )
+
+    def append_segment(self, session_id: str, segment: TranscriptSegment):
+        self._connection.execute(
+            "INSERT INTO transcript_segments "
+            "SELECT ?, coalesce(max(position) + 1, 0), ? "
+            "FROM transcript_segments WHERE session_id = ?",
+            (session_id, segment.model_dump_json(), session_id),
+        )
+
+    def delete(self, session_id: str) -> bool:
+        self._connection.execute(
+            "DELETE FROM transcript_segments WHERE session_id = ?", (session_id,)
+        )
+        cursor = self._connection.execute(
+            "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+        )
+        return cursor.rowcount > 0
+
+    def values(self) -> List[SessionState]:
+        sessions = {
+            session_id: SessionState.model_validate_json(state)
+            for session_id, state in self._connection.execute(
+                "SELECT session_id, state FROM sessions"
+            )
+        }
+        for session_id, segment in self._connection.execute(
+            "SELECT session_id, segment FROM transcript_segments "
+            "ORDER BY session_id, position"
+        ):
+            if session_id in sessions:
+                sessions[session_id].transcript_segments.append(
+                    TranscriptSegment.model_validate_json(segment)
+                )
+        return list(sessions.values())
+
+    def get_lease(self, key: str) -> Optional[Tuple[str, float]]:
+        return self._connection.execute(
+            "SELECT owner, expires_at FROM leases WHERE key = ?", (key,)
+        ).fetchone()
+
+    def put_lease(self, key: str, owner: str, expires_at: float):
+        self._connection.execute(
+            "INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE "
+            "SET owner = excluded.owner, expires_at = excluded.expires_at",
+            (key, owner, expires_at),
+        )
+
+    def delete_lease(self, key: str, owner: str):
+        self._connection.execute(
+            "DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner)
+        )
+
+
+class SessionManager:
+    """会话管理器；存储后端可替换，默认保存在进程内存中"""
+
+    def __init__(
+        self,
+        backend: Optional[Union[MemorySessionBackend, SQLiteSessionBackend]] = None,
+    ):
+        self.backend = backend or MemorySessionBackend()
         self._lock = threading.Lock()
 
+    @property
+    def sessions(self) -> Dict[str, SessionState]:
+        """所有会话（session_id -> 会话）"""
+        with self._lock:
+            return {session.session_id: session for session in self.backend.values()}
+
     def add_session(self, session: SessionState) -> bool:
         """添加新会话"""
-        with self._lock:
-            if session.session_id in self.sessions:
+        with self._lock, self.backend.transaction():
+            if self.backend.get(session.session_id) is not None:
                 logger.warning(f"会话 {session.session_id} 已存在")
                 return False
 
-            self.sessions[session.session_id] = session
+            self.backend.put(session)
+            self.backend.put_segments(session.session_id, session.transcript_segments)
             logger.info(f"添加会话: {session.session_id}")
             return True
 
     def get_session(self, session_id: str) -> Optional[SessionState]:
         """获取会话"""
         with self._lock:
-            return self.sessions.get(session_id)
+            return self.backend.get(session_id)
 
-    def update_session(self, session: SessionState) -> bool:
-        """更新会话状态"""
+    def get_session_state(self, session_id: str) -> Optional[SessionState]:
+        """获取会话状态，不保证加载转录片段；只关心录音状态等字段时使用"""
         with self._lock:
-            if session.session_id not in self.sessions:
+            return self.backend.get_state(session_id)
+
+    def update_session(self, session: SessionState) -> bool:
+        """整体覆盖会话状态，包括全部转录片段"""
+        with self._lock, self.backend.transaction():
+            if self.backend.get(session.session_id) is None:
                 logger.warning(f"会话 {session.session_id} 不存在，无法更新")
                 return False
 
-            self.sessions[session.session_id] = session
+            self.backend.put(session)
+            self.backend.put_segments(session.session_id, session.transcript_segments)
             logger.debug(f"更新会话: {session.session_id}")
             return True
 
+    def mutate(
+        self, session_id: str, change: Callable[[SessionState], Optional[bool]]
+    ) -> Optional[SessionState]:
+        """在同一个事务里重新读取会话并修改后写回，避免读改写之间被其他请求或
+        worker 覆盖；change 返回 False 表示不修改。返回写回后的会话，会话不存在
+        或未修改时返回 None。转录片段不经过这里，请用 add_transcript_segment /
+        replace_transcript"""
+        with self._lock, self.backend.transaction():
+            session = self.backend.get_state(session_id)
+            if session is None:
+                logger.warning(f"会话 {session_id} 不存在，无法更新")
+                return None
+            if change(session) is False:
+                return None
+
+            self.backend.put(session)
+            logger.debug(f"更新会话: {session_id}")
+            return session
+
+    def acquire_lease(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        """获取跨 worker 的独占租约；过期的租约视为已释放"""
+        with self._lock, self.backend.transaction():
+            lease = self.backend.get_lease(key)
+            now = time.time()
+            if lease is not None and lease[0] != owner and lease[1] > now:
+                return False
+
+            self.backend.put_lease(key, owner, now + ttl_seconds)
+            return True
+
+    def release_lease(self, key: str, owner: str):
+        """释放自己持有的租约"""
+        with self._lock, self.backend.transaction():
+            self.backend.delete_lease(key, owner)
+
     def remove_session(self, session_id: str) -> bool:
         """删除会话"""
-        with self._lock:
-            if session_id in self.sessions:
-                del self.sessions[session_id]
+        with self._lock, self.backend.transaction():
+            if self.backend.delete(session_id):
                 logger.info(f"删除会话: {session_id}")
                 return True
             else:
@@ -61,45 +287,57 @@ class SessionManager:
     def get_all_sessions(self) -> List[SessionState]:
         """获取所有会话"""
         with self._lock:
-            return list(self.sessions.values())
+            return self.backend.values()
 
     def get_active_sessions(self) -> List[SessionState]:
         """获取所有活跃（正在录音）的会话"""
         with self._lock:
             return [
-                session for session in self.sessions.values() if session.is_recording
+                session for session in self.backend.values() if session.is_recording
             ]
 
     def add_transcript_segment(
         self, session_id: str, segment: TranscriptSegment
     ) -> bool:
         """添加转录片段"""
-        with self._lock:
-            session = self.sessions.get(session_id)
-            if not session:
+        with self._lock, self.backend.transaction():
+            if self.backend.get_state(session_id) is None:
                 logger.warning(f"会话 {session_id} 不存在，无法添加转录片段")
                 return False
 
-            session.transcript_segments.append(segment)
+            self.backend.append_segment(session_id, segment)
             logger.debug(f"添加转录片段到会话 {session_id}: {segment.text[:50]}...")
             return True
 
+    def replace_transcript(
+        self, session_id: str, segments: List[TranscriptSegment]
+    ) -> bool:
+        """用给定的转录片段整体替换会话的转录内容"""
+        with self._lock, self.backend.transaction():
+            if self.backend.get_state(session_id) is None:
+                logger.warning(f"会话 {session_id} 不存在，无法替换转录片段")
+                return False
+
+            self.backend.put_segments(session_id, segments)
+            return True
+
     def update_summary(self, session_id: str, summary: MeetingSummary) -> bool:
         """更新会话摘要"""
-        with self._lock:
-            session = self.sessions.get(session_id)
+        with self._lock, self.backend.transaction():
+            session = self.backend.get_state(session_id)
             if not session:
                 logger.warning(f"会话 {session_id} 不存在，无法更新摘要")
                 return False
 
             session.current_summary = summary
+            self.backend.put(session)
             logger.info(f"更新会话 {session_id} 摘要")
             return True
 
     def get_session_transcript(self, session_id: str) -> List[TranscriptSegment]:
         """获取会话的所有转录内容"""
         with self._lock:
-            session = self.sessions.get(session_id)
+            session = self.backend.get(session_id)
             if not session:
                 return []
             return session.transcript_segments.copy()
@@ -107,7 +345,7 @@ class SessionManager:
     def get_session_summary(self, session_id: str) -> Optional[MeetingSummary]:
         """获取会话摘要"""
         with self._lock:
-            session = self.sessions.get(session_id)
+            session = self.backend.get_state(session_id)
             if not session:
                 return None
             return session.current_summary
@@ -115,11 +353,10 @@ class SessionManager:
     def get_session_stats(self) -> Dict[str, int]:
         """获取会话统计信息"""
         with self._lock:
-            total_sessions = len(self.sessions)
-            active_sessions = len([s for s in self.sessions.values() if s.is_recording])
-            total_segments = sum(
-                len(s.transcript_segments) for s in self.sessions.values()
-            )
+            sessions = self.backend.values()
+            total_sessions = len(sessions)
+            active_sessions = len([s for s in sessions if s.is_recording])
+            total_segments = sum(len(s.transcript_segments) for s in sessions)
 
             return {
                 "total_sessions": total_sessions,
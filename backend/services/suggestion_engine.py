@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from models.meeting_context import (
+    AnswerPayload,
+    MeetingEvent,
+    QuestionPayload,
+    ScreenshotAnalysisPayload,
+    SuggestionPayload,
+    TranscriptPayload,
+)
+from services.context_builder import MeetingContextBuilder
+
+logger = logging.getLogger(__name__)
+
+
+def suggestion_context_item(event: MeetingEvent) -> SimpleNamespace | None:
+    payload = event.payload
+    if isinstance(payload, TranscriptPayload):
+        speaker, text = payload.speaker, payload.text
+    elif isinstance(payload, ScreenshotAnalysisPayload):
+        speaker, text = "截图分析", payload.text
+    elif isinstance(payload, QuestionPayload):
+        speaker, text = "用户问题", payload.question
+    elif isinstance(payload, AnswerPayload) and payload.status == "completed":
+        speaker, text = "AI回答", payload.answer
+    else:
+        return None
+    return SimpleNamespace(speaker=speaker, text=text, timestamp=event.occurred_at)
+
+
+@dataclass
+class _SuggestionState:
+    items: deque
+    revision: int = 0
+    # 已观察到的最后一个事件序号（含不进入上下文的事件），用来判断是否漏看了事件
+    observed: int = 0
+    pending_events: int = 0
+    pending_tokens: int = 0
+    last_started_at: float = -math.inf
+    latest: SuggestionPayload | None = None
+    timer: asyncio.Task | None = None
+    generation: asyncio.Task | None = None
+
+
+class SpeculativeSuggestionEngine:
+    def __init__(
+        self,
+        generate: Callable[[list], Awaitable[list[str] | None]],
+        *,
+        min_events: int = 3,
+        min_tokens: int = 120,
+        debounce_seconds: float = 2.0,
+        min_interval_seconds: float = 20.0,
+        context_size: int = 50,
+        clock: Callable[[], float] = time.monotonic,
+        token_estimator: Callable[[str], int] | None = None,
+    ):
+        self.generate = generate
+        self.min_events = min_events
+        self.min_tokens = min_tokens
+        self.debounce_seconds = debounce_seconds
+        self.min_interval_seconds = min_interval_seconds
+        self.context_size = context_size
+        self.clock = clock
+        self.token_estimator = token_estimator or MeetingContextBuilder._estimate_tokens
+        self._meetings: dict[str, _SuggestionState] = {}
+
+    def tracks(self, meeting_id: str) -> bool:
+        return meeting_id in self._meetings
+
+    def seed(self, meeting_id: str, events: Iterable[MeetingEvent]) -> None:
+        state = _SuggestionState(items=deque(maxlen=self.context_size))
+        for event in events:
+            state.observed = max(state.observed, event.sequence)
+            item = suggestion_context_item(event)
+            if item is not None:
+                state.items.append(item)
+                state.revision = max(state.revision, event.sequence)
+        previous = self._meetings.get(meeting_id)
+        if previous is not None:
+            self._cancel(previous)
+        self._meetings[meeting_id] = state
+
+    def observe(self, meeting_id: str, event: MeetingEvent) -> None:
+        state = self._meetings.get(meeting_id)
+        if state is None:
+            return
+        state.observed = max(state.observed, event.sequence)
+        item = suggestion_context_item(event)
+        if item is None or event.sequence <= state.revision:
+            return
+        state.items.append(item)
+        state.revision = event.sequence
+        state.pending_events += 1
+        state.pending_tokens += self.token_estimator(item.text)
+        self._schedule(meeting_id, state)
+
+    def context(self, meeting_id: str) -> list | None:
+        state = self._meetings.get(meeting_id)
+        return list(state.items) if state is not None else None
+
+    def revision(self, meeting_id: str) -> int | None:
+        state = self._meetings.get(meeting_id)
+        return state.revision if state is not None else None
+
+    def take(
+        self, meeting_id: str, last_sequence: int | None = None
+    ) -> SuggestionPayload | None:
+        state = self._meetings.get(meeting_id)
+        if state is None or state.latest is None:
+            return None
+        latest, state.latest = state.latest, None
+        # 预生成结果只在上下文没有再变化时才有效，且只交付一次。
+        if latest.context_revision != state.revision:
+            return None
+        # 记录里有引擎没看到的事件（未广播或由其他 worker 写入）时，结果可能已过时。
+        if last_sequence is not None and last_sequence > state.observed:
+            return None
+        return latest
+
+    def forget(self, meeting_id: str) -> None:
+        state = self._meetings.pop(meeting_id, None)
+        if state is not None:
+            self._cancel(state)
+
+    def shutdown(self) -> None:
+        for meeting_id in list(self._meetings):
+            self.forget(meeting_id)
+
+    def _ready(self, state: _SuggestionState) -> bool:
+        return (
+            state.pending_events >= self.min_events
+            or state.pending_tokens >= self.min_tokens
+        )
+
+    def _schedule(self, meeting_id: str, state: _SuggestionState) -> None:
+        if not self._ready(state):
+            return
+        if state.timer is not None and not state.timer.done():
+            return
+        if state.generation is not None and not state.generation.done():
+            return
+        wait = max(
+            self.debounce_seconds,
+            state.last_started_at + self.min_interval_seconds - self.clock(),
+        )
+        state.timer = asyncio.create_task(
+            self._fire_after(meeting_id, state, wait),
+            name=f"speculative-suggestions-{meeting_id}",
+        )
+
+    async def _fire_after(
+        self, meeting_id: str, state: _SuggestionState, wait: float
+    ) -> None:
+        await asyncio.sleep(wait)
+        if self._meetings.get(meeting_id) is not state:
+            return
+        state.timer = None
+        state.generation = asyncio.create_task(
+            self._run(meeting_id, state),
+            name=f"speculative-suggestions-run-{meeting_id}",
+        )
+
+    async def _run(self, meeting_id: str, state: _SuggestionState) -> None:
+        revision = state.revision
+        context = list(state.items)
+        state.pending_events = 0
+        state.pending_tokens = 0
+        state.last_started_at = self.clock()
+        try:
+            questions = await self.generate(context)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning(
+                "预生成追问失败: session=%s, revision=%s, error=%s",
+                meeting_id,
+                revision,
+                error,
+            )
+            questions = None
+        if questions:
+            state.latest = SuggestionPayload(
+                generation_id=str(uuid.uuid4()),
+                context_revision=revision,
+                questions=questions,
+            )
+        if self._meetings.get(meeting_id) is state:
+            state.generation = None
+            self._schedule(meeting_id, state)
+
+    @staticmethod
+    def _cancel(state: _SuggestionState) -> None:
+        for task in (state.timer, state.generation):
+            if task is not None and not task.done():
+                task.cancel()
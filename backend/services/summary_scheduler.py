@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _MeetingClock:
+    active_seconds: float = 0.0
+    resumed_at: float | None = None
+    next_milestone: int = 1
+    has_new_input: bool = False
+    pending_minutes: int | None = None
+    timer: asyncio.Task | None = None
+    generation: asyncio.Task | None = None
+
+
+class MilestoneSummaryScheduler:
+    def __init__(
+        self,
+        generate: Callable[[str, int], Awaitable[dict]],
+        *,
+        interval_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.generate = generate
+        self.interval_seconds = interval_seconds
+        self.clock = clock
+        self._meetings: dict[str, _MeetingClock] = {}
+
+    def start(self, meeting_id: str, *, has_new_input: bool = False) -> None:
+        # has_new_input 由调用方按记录判断：重启或恢复会话时，已有但尚未被摘要覆盖的输入
+        # 不能等到下一条新输入才被总结。
+        state = self._meetings.setdefault(meeting_id, _MeetingClock())
+        state.has_new_input = state.has_new_input or has_new_input
+        if state.timer is not None and not state.timer.done():
+            return
+        state.resumed_at = self.clock()
+        state.timer = asyncio.create_task(
+            self._run(meeting_id, state),
+            name=f"summary-milestones-{meeting_id}",
+        )
+
+    def pause(self, meeting_id: str) -> None:
+        state = self._meetings.get(meeting_id)
+        if state is None:
+            return
+        state.active_seconds = self._active_seconds(state)
+        state.resumed_at = None
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+
+    def stop(self, meeting_id: str) -> None:
+        self.pause(meeting_id)
+        state = self._meetings.pop(meeting_id, None)
+        if state is not None:
+            state.pending_minutes = None
+            if state.generation is not None and not state.generation.done():
+                state.generation.cancel()
+            state.generation = None
+
+    def tracks(self, meeting_id: str) -> bool:
+        return meeting_id in self._meetings
+
+    def shutdown(self) -> None:
+        for meeting_id in list(self._meetings):
+            self.stop(meeting_id)
+
+    def mark_input(self, meeting_id: str) -> None:
+        state = self._meetings.get(meeting_id)
+        if state is not None:
+            state.has_new_input = True
+
+    def active_minutes(self, meeting_id: str) -> int | None:
+        state = self._meetings.get(meeting_id)
+        if state is None:
+            return None
+        return int(self._active_seconds(state) // 60)
+
+    def is_running(self, meeting_id: str) -> bool:
+        state = self._meetings.get(meeting_id)
+        return bool(state and state.timer is not None and not state.timer.done())
+
+    def _active_seconds(self, state: _MeetingClock) -> float:
+        if state.resumed_at is None:
+            return state.active_seconds
+        return state.active_seconds + max(0.0, self.clock() - state.resumed_at)
+
+    async def _run(self, meeting_id: str, state: _MeetingClock) -> None:
+        while True:
+            active_seconds = self._active_seconds(state)
+            due = state.next_milestone * self.interval_seconds - active_seconds
+            if due > 0:
+                await asyncio.sleep(due)
+                continue
+            # 长时间阻塞后只补发一次，而不是为每个错过的里程碑各触发一次。
+            state.next_milestone = int(active_seconds // self.interval_seconds) + 1
+            self._trigger(meeting_id, state, int(active_seconds // 60))
+
+    def _trigger(self, meeting_id: str, state: _MeetingClock, minutes: int) -> None:
+        if state.generation is not None and not state.generation.done():
+            state.pending_minutes = minutes
+            return
+        if not state.has_new_input:
+            logger.debug(
+                "里程碑摘要无新输入，已跳过: session=%s, minutes=%s",
+                meeting_id,
+                minutes,
+            )
+            return
+        state.has_new_input = False
+        state.generation = asyncio.create_task(
+            self._generate(meeting_id, state, minutes),
+            name=f"summary-milestone-{meeting_id}-{minutes}",
+        )
+
+    async def _generate(
+        self, meeting_id: str, state: _MeetingClock, minutes: int
+    ) -> None:
+        try:
+            result = await self.generate(meeting_id, minutes)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            state.has_new_input = True
+            logger.warning(
+                "里程碑摘要生成失败: session=%s, minutes=%s, error=%s",
+                meeting_id,
+                minutes,
+                error,
+            )
+        else:
+            if isinstance(result, dict) and result.get("status") == "failed":
+                state.has_new_input = True
+        pending = state.pending_minutes
+        state.pending_minutes = None
+        if pending is not None and self._meetings.get(meeting_id) is state:
+            state.generation = None
+            self._trigger(meeting_id, state, pending)
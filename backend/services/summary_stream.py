@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+
+STREAMED_LISTS = ("tasks", "key_points", "decisions")
+
+
+@dataclass(frozen=True)
+class SummaryStreamUpdate:
+    field: str
+    text: str | None = None
+    index: int | None = None
+    item: object = None
+
+    def as_data(self) -> dict[str, object]:
+        if self.field == "summary_text":
+            return {"field": self.field, "text": self.text}
+        return {"field": self.field, "index": self.index, "item": self.item}
+
+
+@dataclass
+class StructuredSummaryStream:
+    _buffer: str = ""
+    _position: int = 0
+    _depth: int = 0
+    _started: bool = False
+    _in_string: bool = False
+    _escaped: bool = False
+    _string_start: int = 0
+    _expecting_value: bool = False
+    _key: str | None = None
+    _value_is_text: bool = False
+    _list_key: str | None = None
+    _element_start: int | None = None
+    _summary_text: str = ""
+    _partial_text: str = ""
+    _decoded_until: int = 0
+    items: dict[str, list] = field(default_factory=dict)
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    @property
+    def summary_text(self) -> str:
+        return self._summary_text
+
+    def feed(self, chunk: str) -> list[SummaryStreamUpdate]:
+        self._buffer += chunk
+        updates: list[SummaryStreamUpdate] = []
+        buffer = self._buffer
+        for index in range(self._position, len(buffer)):
+            character = buffer[index]
+            if not self._started:
+                if character == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif character == "\\":
+                    self._escaped = True
+                elif character == '"':
+                    self._in_string = False
+                    self._close_string(index, updates)
+                continue
+            if self._depth == 0:
+                continue
+            if (
+                self._list_key is not None
+                and self._depth == 2
+                and self._element_start is None
+                and character not in " \t\r\n,]"
+            ):
+                self._element_start = index
+            if character == '"':
+                self._in_string = True
+                self._string_start = index
+                self._value_is_text = (
+                    self._depth == 1
+                    and self._expecting_value
+                    and self._key == "summary_text"
+                )
+                self._partial_text = ""
+                self._decoded_until = index + 1
+            elif character in "{[":
+                if (
+                    self._depth == 1
+                    and character == "["
+                    and self._expecting_value
+                    and self._key in STREAMED_LISTS
+                ):
+                    self._list_key = self._key
+                    self.items[self._key] = []
+                self._depth += 1
+            elif character in "}]":
+                if self._depth == 2 and self._list_key is not None:
+                    self._close_element(index, updates)
+                    self._list_key = None
+                self._depth -= 1
+            elif character == ",":
+                if self._depth == 1:
+                    self._expecting_value = False
+                    self._key = None
+                elif self._depth == 2 and self._list_key is not None:
+                    self._close_element(index, updates)
+            elif character == ":" and self._depth == 1:
+                self._expecting_value = True
+        self._position = len(buffer)
+        if self._in_string and self._value_is_text:
+            self._extend_partial()
+            if len(self._partial_text) > len(self._summary_text):
+                self._summary_text = self._partial_text
+                updates.append(
+                    SummaryStreamUpdate("summary_text", text=self._partial_text)
+                )
+        return updates
+
+    def _close_string(self, index: int, updates: list[SummaryStreamUpdate]) -> None:
+        if self._depth != 1:
+            return
+        value = json.loads(self._buffer[self._string_start : index + 1])
+        if not self._expecting_value:
+            self._key = value
+        elif self._value_is_text:
+            self._value_is_text = False
+            if value != self._summary_text:
+                self._summary_text = value
+                updates.append(SummaryStreamUpdate("summary_text", text=value))
+
+    def _close_element(self, index: int, updates: list[SummaryStreamUpdate]) -> None:
+        if self._element_start is None:
+            return
+        raw = self._buffer[self._element_start : index].strip()
+        self._element_start = None
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        values = self.items[self._list_key]
+        values.append(item)
+        updates.append(
+            SummaryStreamUpdate(self._list_key, index=len(values) - 1, item=item)
+        )
+
+    def _extend_partial(self) -> None:
+        # 只解码上次之后新到的部分；流中可能停在转义序列或代理对中间，
+        # 这时退回到最后一个反斜杠之前，剩下的留到下次一起解码。
+        raw = self._buffer[self._decoded_until :]
+        for cut in (len(raw), raw.rfind("\\")):
+            if cut <= 0:
+                continue
+            try:
+                text = json.loads(f'"{raw[:cut]}"')
+            except json.JSONDecodeError:
+                continue
+            if text and "\ud800" <= text[-1] <= "\udbff":
+                continue
+            self._partial_text += text
+            self._decoded_until += cut
+            return
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SpeechSegment:
+    start: int
+    end: int
+    sample_rate: int
+
+    @property
+    def start_ms(self) -> int:
+        return self.start * 1000 // self.sample_rate
+
+    @property
+    def end_ms(self) -> int:
+        return self.end * 1000 // self.sample_rate
+
+
+class VoiceActivityDetector:
+    def __init__(
+        self,
+        sample_rate: int = 16_000,
+        *,
+        frame_ms: int = 30,
+        energy_threshold_db: float = -45.0,
+        loud_margin_db: float = 15.0,
+        max_zero_crossing_rate: float = 0.35,
+        hangover_ms: int = 300,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, sample_rate * frame_ms // 1000)
+        self.energy_threshold_db = energy_threshold_db
+        self.loud_margin_db = loud_margin_db
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.hangover_frames = max(0, hangover_ms // frame_ms)
+
+    def speech_frames(
+        self, samples: np.ndarray, *, carried_hangover: int = 0
+    ) -> tuple[np.ndarray, int]:
+        frames = self._frames(samples)
+        if not len(frames):
+            return np.zeros(0, dtype=bool), carried_hangover
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        signs = np.signbit(frames)
+        zero_crossing_rate = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        # 噪声通常能量低；清辅音过零率高但能量足够，按更高的能量门限放行。
+        voiced = (energy_db > self.energy_threshold_db) & (
+            (zero_crossing_rate <= self.max_zero_crossing_rate)
+            | (energy_db > self.energy_threshold_db + self.loud_margin_db)
+        )
+        speech = voiced.copy()
+        if self.hangover_frames:
+            held = np.convolve(
+                voiced.astype(np.int32),
+                np.ones(self.hangover_frames + 1, dtype=np.int32),
+            )[: len(voiced)]
+            speech = held > 0
+        speech[: min(carried_hangover, len(speech))] = True
+        voiced_indexes = np.flatnonzero(voiced)
+        if len(voiced_indexes):
+            since_voice = len(voiced) - 1 - int(voiced_indexes[-1])
+            remaining = self.hangover_frames - since_voice
+        else:
+            remaining = carried_hangover - len(voiced)
+        return speech, max(0, remaining)
+
+    def segments(self, samples: np.ndarray) -> list[SpeechSegment]:
+        speech, _ = self.speech_frames(samples)
+        padded = np.concatenate(([False], speech, [False]))
+        edges = np.flatnonzero(padded[1:] != padded[:-1])
+        total = len(samples)
+        return [
+            SpeechSegment(
+                start=int(start) * self.frame_size,
+                end=min(int(end) * self.frame_size, total),
+                sample_rate=self.sample_rate,
+            )
+            for start, end in zip(edges[::2], edges[1::2])
+        ]
+
+    def trim(
+        self, samples: np.ndarray, segments: list[SpeechSegment] | None = None
+    ) -> np.ndarray:
+        if segments is None:
+            segments = self.segments(samples)
+        if not segments:
+            return samples[:0]
+        return np.concatenate(
+            [samples[segment.start : segment.end] for segment in segments]
+        )
+
+    def _frames(self, samples: np.ndarray) -> np.ndarray:
+        samples = np.asarray(samples)
+        # 先按样本类型归一化再混合声道：均值会把 int16 变成 float64，之后就无法识别量纲。
+        if samples.dtype == np.int16:
+            samples = samples.astype(np.float32) / 32768.0
+        else:
+            samples = samples.astype(np.float32, copy=False)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1, dtype=np.float32)
+        # 末尾不足一帧的样本补零后仍参与判断，避免丢掉片段结尾。
+        count = -(-len(samples) // self.frame_size)
+        padded = np.zeros(count * self.frame_size, dtype=np.float32)
+        padded[: len(samples)] = samples
+        return padded.reshape(count, self.frame_size)
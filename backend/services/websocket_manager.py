@@ -3,32 +3,366 @@ WebSocket 连接管理器
 管理与前端的实时通信连接
 """
 
+import asyncio
 import json
 import logging
-from typing import Dict, List, Set, Any, Optional
-from fastapi import WebSocket
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple, Union
+from fastapi import WebSocket, WebSocketDisconnect
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+OVERFLOW_POLICIES = {"drop_oldest", "coalesce", "disconnect"}
+# 1013: Try Again Later，客户端重连后可以从会议记录补齐
+OVERFLOW_CLOSE_CODE = 1013
+# 流式增量默认攒 50ms 或 512 个字符发一帧，客户端可以在握手时单独调整
+DEFAULT_DELTA_INTERVAL_MS = 50
+DEFAULT_DELTA_MAX_CHARS = 512
+MAX_DELTA_INTERVAL_MS = 1000
+# 客户端在握手时通过 Sec-WebSocket-Protocol 选择编码；不指定时沿用 JSON 文本帧
+JSON_SUBPROTOCOL = "promptmeet.json"
+MSGPACK_SUBPROTOCOL = "promptmeet.msgpack"
+# 与 meeting_event 内容重复的旧版消息类型，只订阅 meeting_event 的客户端可以不收
+LEGACY_MESSAGE_TYPES = {"audio_transcript", "summary_generated", "image_ocr_result"}
+# 心跳超时关闭码，沿用 4404 的写法对应 HTTP 408
+HEARTBEAT_CLOSE_CODE = 4408
+
+
+@dataclass
+class _Outbound:
+    """排队中的一条消息；只有流式增量消息带有 key，可被丢弃或合并。
+    同一次广播的所有连接共享这个对象，每种编码只序列化一次，且直到真正发送时才序列化"""
+
+    message: Dict[str, Any]
+    key: Optional[Tuple[str, Any]] = None
+    legacy: bool = False
+    encodings: Dict[str, Union[str, bytes]] = field(default_factory=dict)
+
+    def encode(self, encoding: str) -> Union[str, bytes]:
+        encoded = self.encodings.get(encoding)
+        if encoded is None:
+            if encoding == "msgpack":
+                encoded = msgpack.packb(self.message, default=str)
+            else:
+                encoded = json.dumps(self.message, ensure_ascii=False, default=str)
+            self.encodings[encoding] = encoded
+        return encoded
+
+
+@dataclass
+class _PendingDelta:
+    """还没发出的流式增量，按 (消息类型, request_id) 累积"""
+
+    message: Dict[str, Any]
+    parts: List[str]
+    size: int
+
+
+def delta_key(message: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+    """流式增量消息的合并键：(消息类型, request_id)；其他消息返回 None"""
+    data = message.get("data")
+    if isinstance(data, dict) and isinstance(data.get("delta"), str):
+        return message.get("type"), data.get("request_id")
+    return None
+
+
+class _Connection:
+    """单个连接的有界发送队列和写协程，慢客户端只拖慢自己"""
+
+    def __init__(
+        self,
+        manager: "WebSocketManager",
+        websocket: WebSocket,
+        session_id: str,
+        delta_interval_ms: int,
+        delta_max_chars: int,
+        encoding: str = "json",
+        legacy: bool = True,
+    ):
+        self.manager = manager
+        self.websocket = websocket
+        self.session_id = session_id
+        self.encoding = encoding
+        self.legacy = legacy
+        self.connected_at = time.monotonic()
+        self.last_seen = self.connected_at
+        # 回过 pong 的客户端才按 pong 期限判活；不回应心跳的旧客户端只按写阻塞判断
+        self.answers_pings = False
+        self.ping_sent_at: Optional[float] = None
+        self.sending_since: Optional[float] = None
+        self.delta_interval = delta_interval_ms / 1000
+        self.delta_max_chars = delta_max_chars
+        self.loop = asyncio.get_running_loop()
+        self.queue: deque[_Outbound] = deque()
+        self.pending: Dict[Tuple[str, Any], _PendingDelta] = {}
+        self.flush_timer: Optional[asyncio.TimerHandle] = None
+        self.frames = 0
+        # 补发历史事件期间暂存实时消息，补发完成后再按顺序放行
+        self.held: Optional[List[_Outbound]] = None
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.writer = self.loop.create_task(
+            self._write(), name=f"websocket-writer-{session_id}"
+        )
+
+    def offer(self, item: _Outbound) -> None:
+        """在连接所属的事件循环里接收消息：增量先攒批，其他消息先冲刷增量再入队"""
+        if self.closed or (item.legacy and not self.legacy):
+            return
+        if self.held is not None:
+            self.held.append(item)
+            return
+        if item.key is not None and self.delta_interval > 0:
+            self._buffer(item)
+            return
+        # 完整内容、会议事件等必须排在它之前的增量后面，原样发出
+        self.flush_deltas()
+        self._push(item)
+
+    def _buffer(self, item: _Outbound) -> None:
+        delta = item.message["data"]["delta"]
+        pending = self.pending.get(item.key)
+        if pending is None:
+            pending = self.pending[item.key] = _PendingDelta(item.message, [], 0)
+        pending.parts.append(delta)
+        pending.size += len(delta)
+        if pending.size >= self.delta_max_chars:
+            self._flush_delta(item.key)
+        elif self.flush_timer is None:
+            self.flush_timer = self.loop.call_later(
+                self.delta_interval, self.flush_deltas
+            )
+
+    def flush_deltas(self) -> None:
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        for key in list(self.pending):
+            self._flush_delta(key)
+
+    def _flush_delta(self, key: Tuple[str, Any]) -> None:
+        pending = self.pending.pop(key)
+        if len(pending.parts) > 1:
+            self.manager.stats["coalesced"] += len(pending.parts) - 1
+        data = dict(pending.message["data"])
+        data["delta"] = "".join(pending.parts)
+        self._push(_Outbound({**pending.message, "data": data}, key))
+
+    def _push(self, item: _Outbound) -> None:
+        stats = self.manager.stats
+        full = len(self.queue) >= self.manager.max_queue
+        if full and self.manager.overflow_policy == "coalesce" and item.key:
+            last = self.queue[-1]
+            if last.key == item.key:
+                self.queue[-1] = self._merge(last, item)
+                stats["coalesced"] += 1
+                return
+        if full and not self._make_room():
+            if item.key is not None and self.manager.overflow_policy != "disconnect":
+                # 队列里全是不可丢弃的消息时，宁可丢掉新的增量也不丢事件
+                stats["dropped"] += 1
+                return
+            stats["overflow_disconnects"] += 1
+            logger.warning(
+                f"WebSocket 发送队列已满，断开慢客户端: session={self.session_id}"
+            )
+            self.close(OVERFLOW_CLOSE_CODE, "发送队列已满")
+            return
+        self.queue.append(item)
+        self.ready.set()
+
+    def _make_room(self) -> bool:
+        policy = self.manager.overflow_policy
+        if policy == "coalesce":
+            # 只合并相邻的同一路增量，保证和其他消息的相对顺序不变
+            for index in range(len(self.queue) - 1):
+                first, second = self.queue[index], self.queue[index + 1]
+                if first.key is not None and first.key == second.key:
+                    self.queue[index] = self._merge(first, second)
+                    del self.queue[index + 1]
+                    self.manager.stats["coalesced"] += 1
+                    return True
+        if policy in {"drop_oldest", "coalesce"}:
+            for index, queued in enumerate(self.queue):
+                if queued.key is not None:
+                    del self.queue[index]
+                    self.manager.stats["dropped"] += 1
+                    return True
+        return False
+
+    @staticmethod
+    def _merge(first: _Outbound, second: _Outbound) -> _Outbound:
+        # 队列里的消息可能被其他连接共享，合并时生成新消息而不是原地修改
+        data = dict(first.message["data"])
+        data["delta"] = data["delta"] + second.message["data"]["delta"]
+        return _Outbound({**first.message, "data": data}, first.key)
+
+    def stop(self) -> None:
+        self.closed = True
+        self.queue.clear()
+        self.pending.clear()
+        self.held = None
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        self.ready.set()
+
+    def close(self, code: int = 1000, reason: str = "") -> None:
+        if self.closed:
+            return
+        self.stop()
+        if self.sending_since is not None:
+            # 写协程卡在半开连接上，直接取消，不再等系统超时
+            self.writer.cancel()
+        self.manager._forget(self.websocket, self.session_id)
+        self.loop.create_task(self._close(code, reason))
+
+    async def _close(self, code: int, reason: str) -> None:
+        try:
+            await asyncio.wait_for(
+                self.websocket.close(code=code, reason=reason), timeout=5
+            )
+        except Exception:
+            pass
+
+    def check(self, now: float, timeout: float, ping: "_Outbound") -> bool:
+        """心跳检查：超时返回 False 并关闭连接，否则发出 ping"""
+        if self.closed:
+            return True
+        stalled = self.sending_since is not None and now - self.sending_since > timeout
+        unanswered = (
+            self.answers_pings
+            and self.ping_sent_at is not None
+            and now - self.ping_sent_at > timeout
+        )
+        if stalled or unanswered:
+            self.manager.stats["reaped"] += 1
+            logger.warning(
+                f"WebSocket 心跳超时，回收连接: session={self.session_id}, "
+                f"{'写入阻塞' if stalled else '未回应 ping'}"
+            )
+            self.close(HEARTBEAT_CLOSE_CODE, "心跳超时")
+            return False
+        if self.ping_sent_at is None:
+            self.ping_sent_at = now
+        self.offer(ping)
+        return True
+
+    def seen(self, pong: bool = False) -> None:
+        self.last_seen = time.monotonic()
+        if pong:
+            self.answers_pings = True
+            self.ping_sent_at = None
+
+    async def _write(self):
+        while True:
+            await self.ready.wait()
+            if self.closed:
+                return
+            if not self.queue:
+                self.ready.clear()
+                continue
+            item = self.queue.popleft()
+            self.sending_since = time.monotonic()
+            try:
+                if self.encoding == "msgpack":
+                    await self.websocket.send_bytes(item.encode("msgpack"))
+                else:
+                    await self.websocket.send_text(item.encode("json"))
+                self.sending_since = None
+                self.frames += 1
+            except Exception as e:
+                logger.error(f"发送消息失败: {e}")
+                self.stop()
+                self.manager._forget(self.websocket, self.session_id)
+                return
+
 
 class WebSocketManager:
     """WebSocket连接管理器"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue: int = 256,
+        overflow_policy: str = "coalesce",
+        delta_interval_ms: int = DEFAULT_DELTA_INTERVAL_MS,
+        delta_max_chars: int = DEFAULT_DELTA_MAX_CHARS,
+        legacy_messages: bool = True,
+        bus=None,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"不支持的 WebSocket 队列溢出策略: {overflow_policy}")
         # 存储连接: session_id -> [websocket1, websocket2, ...]
         self.connections: Dict[str, List[WebSocket]] = {}
         # 存储WebSocket到session_id的映射
         self.websocket_sessions: Dict[WebSocket, str] = {}
+        # 每个连接的发送队列和写协程
+        self.outbound: Dict[WebSocket, _Connection] = {}
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.delta_interval_ms = delta_interval_ms
+        self.delta_max_chars = delta_max_chars
+        # 旧版消息（audio_transcript 等）与 meeting_event 内容重复，新客户端可以不收
+        self.legacy_messages = legacy_messages
+        # 多 worker 部署时的跨进程广播通道（如 SQLiteEventBus）；None 时只投递给本进程的连接
+        self.bus = bus
+        # 收到其他 worker 的广播时先交给这些回调，用来同步本进程里的会话状态
+        self.remote_handlers: List[Callable[[str, Dict[str, Any]], Awaitable[None]]] = (
+            []
+        )
+        self.stats = {
+            "dropped": 0,
+            "coalesced": 0,
+            "overflow_disconnects": 0,
+            "connected": 0,
+            "disconnected": 0,
+            "reaped": 0,
+        }
 
-    async def connect(self, websocket: WebSocket, session_id: str):
-        """建立WebSocket连接"""
-        await websocket.accept()
+    async def connect(
+        self,
+        websocket: WebSocket,
+        session_id: str,
+        delta_interval_ms: Optional[int] = None,
+        delta_max_chars: Optional[int] = None,
+        legacy: Optional[bool] = None,
+    ):
+        """建立WebSocket连接；可为该连接单独指定增量攒批的间隔和字符数（0 表示逐条发送）、
+        是否接收旧版重复消息，并按客户端请求的子协议协商 JSON 或 msgpack 编码"""
+        requested = websocket.scope.get("subprotocols") or []
+        if MSGPACK_SUBPROTOCOL in requested and msgpack is not None:
+            subprotocol = MSGPACK_SUBPROTOCOL
+        elif JSON_SUBPROTOCOL in requested:
+            subprotocol = JSON_SUBPROTOCOL
+        else:
+            subprotocol = None
+        await websocket.accept(subprotocol=subprotocol)
 
         if session_id not in self.connections:
             self.connections[session_id] = []
 
         self.connections[session_id].append(websocket)
         self.websocket_sessions[websocket] = session_id
+        if delta_interval_ms is None:
+            delta_interval_ms = self.delta_interval_ms
+        self.outbound[websocket] = _Connection(
+            self,
+            websocket,
+            session_id,
+            max(0, min(delta_interval_ms, MAX_DELTA_INTERVAL_MS)),
+            max(1, delta_max_chars or self.delta_max_chars),
+            encoding="msgpack" if subprotocol == MSGPACK_SUBPROTOCOL else "json",
+            legacy=self.legacy_messages if legacy is None else legacy,
+        )
+        self.stats["connected"] += 1
 
         logger.info(
             f"WebSocket连接建立: session={session_id}, 总连接数={len(self.connections[session_id])}"
@@ -36,6 +370,13 @@ class WebSocketManager:
 
     def disconnect(self, websocket: WebSocket, session_id: str):
         """断开WebSocket连接"""
+        connection = self._forget(websocket, session_id)
+        if connection is not None:
+            connection.stop()
+
+        logger.info(f"WebSocket连接断开: session={session_id}")
+
+    def _forget(self, websocket: WebSocket, session_id: str) -> Optional[_Connection]:
         if session_id in self.connections:
             try:
                 self.connections[session_id].remove(websocket)
@@ -46,30 +387,110 @@ class WebSocketManager:
 
         if websocket in self.websocket_sessions:
             del self.websocket_sessions[websocket]
+        connection = self.outbound.pop(websocket, None)
+        if connection is not None:
+            self.stats["disconnected"] += 1
+        return connection
 
-        logger.info(f"WebSocket连接断开: session={session_id}")
+    def _enqueue(self, connection: _Connection, item: _Outbound):
+        self._dispatch(connection, connection.offer, item)
+
+    @staticmethod
+    def _dispatch(connection: _Connection, callback, *args):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is connection.loop:
+            callback(*args)
+        else:
+            # 从其他线程或事件循环调用时交回连接所属的循环处理
+            connection.loop.call_soon_threadsafe(callback, *args)
+
+    async def receive_message(self, websocket: WebSocket) -> Dict[str, Any]:
+        """读取客户端消息：文本帧按 JSON 解析，msgpack 连接的二进制帧按 msgpack 解析。
+        收到任何消息都刷新连接的活跃时间，心跳 pong 在这里消化掉"""
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(
+                    message.get("code", 1000), message.get("reason")
+                )
+            connection = self.outbound.get(websocket)
+            if message.get("text") is not None:
+                decoded = json.loads(message["text"])
+            elif connection is not None and connection.encoding == "msgpack":
+                decoded = msgpack.unpackb(message["bytes"])
+            else:
+                decoded = json.loads(message["bytes"])
+            pong = isinstance(decoded, dict) and decoded.get("type") == "pong"
+            if connection is not None:
+                connection.seen(pong=pong)
+            if not pong:
+                return decoded
+
+    def _outbound_item(self, message: Dict[str, Any]) -> _Outbound:
+        return _Outbound(
+            message,
+            delta_key(message),
+            legacy=message.get("type") in LEGACY_MESSAGE_TYPES,
+        )
 
     async def send_to_session(self, session_id: str, message: Dict[str, Any]):
-        """向特定会话的所有连接发送消息"""
+        """向特定会话的所有连接发送消息（只入队，不等待客户端）；
+        配置了跨进程广播时同时发布给其他 worker"""
+        if self.bus is not None:
+            self.bus.publish(session_id, message)
+        await self.deliver_local(session_id, message)
+
+    async def deliver_local(self, session_id: str, message: Dict[str, Any]):
+        """只投递给连在本进程上的客户端"""
         if session_id not in self.connections:
-            logger.warning(f"会话 {session_id} 没有活跃连接")
+            if self.bus is None:
+                logger.warning(f"会话 {session_id} 没有活跃连接")
             return
 
-        # 准备消息
-        message_json = json.dumps(message, ensure_ascii=False, default=str)
+        item = self._outbound_item(message)
+        for websocket in list(self.connections[session_id]):
+            connection = self.outbound.get(websocket)
+            if connection is not None:
+                self._enqueue(connection, item)
 
-        # 发送给会话的所有连接
-        disconnected_websockets = []
-        for websocket in self.connections[session_id]:
-            try:
-                await websocket.send_text(message_json)
-            except Exception as e:
-                logger.error(f"发送消息失败: {e}")
-                disconnected_websockets.append(websocket)
+    async def send_to_connection(self, websocket: WebSocket, message: Dict[str, Any]):
+        """只向一个连接发送消息，与广播共用同一个队列以保持顺序"""
+        connection = self.outbound.get(websocket)
+        if connection is not None:
+            self._enqueue(connection, self._outbound_item(message))
 
-        # 清理断开的连接
-        for websocket in disconnected_websockets:
-            self.disconnect(websocket, session_id)
+    def hold(self, websocket: WebSocket):
+        """暂停向该连接投递实时消息，直到 release；用于断线重连后补发事件"""
+        connection = self.outbound.get(websocket)
+        if connection is not None and connection.held is None:
+            connection.held = []
+
+    def release(
+        self,
+        websocket: WebSocket,
+        replay: List[Dict[str, Any]],
+        replayed_through: int = 0,
+    ):
+        """先发出补发的消息，再放行暂停期间的实时消息；已补发过的会议事件不再重复发送"""
+        connection = self.outbound.get(websocket)
+        if connection is None:
+            return
+        held, connection.held = connection.held or [], None
+        for message in replay:
+            connection.offer(self._outbound_item(message))
+        for item in held:
+            data = item.message.get("data")
+            if (
+                item.message.get("type") == "meeting_event"
+                and isinstance(data, dict)
+                and isinstance(data.get("sequence"), int)
+                and data["sequence"] <= replayed_through
+            ):
+                continue
+            connection.offer(item)
 
     async def broadcast_to_session(self, session_id: str, message: Dict[str, Any]):
         """向会话广播消息（别名，和send_to_session一样）"""
@@ -77,20 +498,9 @@ class WebSocketManager:
 
     async def broadcast_to_all(self, message: Dict[str, Any]):
         """向所有连接广播消息"""
-        message_json = json.dumps(message, ensure_ascii=False, default=str)
-
-        for session_id, websockets in self.connections.items():
-            disconnected_websockets = []
-            for websocket in websockets:
-                try:
-                    await websocket.send_text(message_json)
-                except Exception as e:
-                    logger.error(f"广播消息失败: {e}")
-                    disconnected_websockets.append(websocket)
-
-            # 清理断开的连接
-            for websocket in disconnected_websockets:
-                self.disconnect(websocket, session_id)
+        item = self._outbound_item(message)
+        for connection in list(self.outbound.values()):
+            self._enqueue(connection, item)
 
     def get_session_connections(self, session_id: str) -> List[WebSocket]:
         """获取会话的所有连接"""
@@ -107,12 +517,69 @@ class WebSocketManager:
         else:
             return sum(len(conns) for conns in self.connections.values())
 
-    async def ping_all_connections(self):
-        """向所有连接发送心跳检测"""
-        ping_message = {
-            "type": "ping",
-            "data": {"timestamp": str(logger.info("开始心跳检测"))},
-        }
+    def get_frame_count(self) -> int:
+        """已经写出的帧数（所有活跃连接）"""
+        return sum(connection.frames for connection in self.outbound.values())
+
+    async def ping_all_connections(self, timeout: float = 60.0) -> int:
+        """向所有连接发送心跳检测，并回收写入阻塞或 ping 超时未回应的连接，返回回收数量"""
+        logger.debug("开始心跳检测")
+        ping = self._outbound_item(
+            {"type": "ping", "data": {"timestamp": datetime.now(UTC).isoformat()}}
+        )
+        now = time.monotonic()
+        reaped = 0
+        for connection in list(self.outbound.values()):
+            if connection.loop is asyncio.get_running_loop():
+                reaped += not connection.check(now, timeout, ping)
+            else:
+                self._dispatch(connection, connection.check, now, timeout, ping)
+        logger.debug(f"心跳检测完成，活跃连接数: {self.get_connection_count()}")
+        return reaped
 
-        await self.broadcast_to_all(ping_message)
-        logger.info(f"心跳检测完成，活跃连接数: {self.get_connection_count()}")
+    def on_remote_message(
+        self, handler: Callable[[str, Dict[str, Any]], Awaitable[None]]
+    ):
+        """注册处理其他 worker 广播的回调"""
+        self.remote_handlers.append(handler)
+
+    async def deliver_remote(self, session_id: str, message: Dict[str, Any]):
+        """处理其他 worker 发布的广播，再投递给本进程的连接"""
+        for handler in self.remote_handlers:
+            try:
+                await handler(session_id, message)
+            except Exception as error:
+                logger.warning(f"处理跨进程广播失败: session={session_id}, {error}")
+        await self.deliver_local(session_id, message)
+
+    async def run_bus(self):
+        """持续接收其他 worker 发布的广播并投递给本进程的连接"""
+        if self.bus is not None:
+            await self.bus.run(self.deliver_remote)
+
+    async def run_heartbeat(self, interval: float = 20.0, timeout: float = 60.0):
+        """由应用生命周期启动的后台心跳任务"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.ping_all_connections(timeout)
+            except Exception as e:
+                logger.error(f"心跳检测失败: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """连接数、连接变动、空闲时间和回收数量"""
+        now = time.monotonic()
+        idle = [now - connection.last_seen for connection in self.outbound.values()]
+        ages = [now - connection.connected_at for connection in self.outbound.values()]
+        return {
+            "connections": len(self.outbound),
+            "sessions": len(self.connections),
+            **self.stats,
+            "idle_seconds": {
+                "avg": round(sum(idle) / len(idle), 1) if idle else 0.0,
+                "max": round(max(idle), 1) if idle else 0.0,
+            },
+            "oldest_connection_seconds": round(max(ages), 1) if ages else 0.0,
+            "frames": self.get_frame_count(),
+            **({"bus": dict(self.bus.stats)} if self.bus is not None else {}),
+        }
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.asset_executor import AssetExecutor, AssetExecutorOverloaded
+
+
+def test_asset_executor_rejects_work_beyond_its_queue_and_reports_timings() -> None:
+    executor = AssetExecutor(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def burst() -> list[object]:
+        blocked = [
+            asyncio.create_task(executor.run(release.wait)),
+            asyncio.create_task(executor.run(lambda: "queued")),
+        ]
+        await asyncio.sleep(0.05)
+        with pytest.raises(AssetExecutorOverloaded) as overloaded:
+            await executor.run(lambda: "rejected")
+        assert overloaded.value.status_code == 429
+        assert executor.metrics()["queued"] == 1
+        release.set()
+        return await asyncio.gather(*blocked)
+
+    assert asyncio.run(burst()) == [True, "queued"]
+    metrics = executor.metrics()
+    assert metrics["submitted"] == 2
+    assert metrics["completed"] == 2
+    assert metrics["rejected"] == 1
+    assert metrics["queue_wait_ms"]["max"] >= 40
+    assert metrics["processing_ms"]["max"] >= 40
+    executor.shutdown()
+    assert asyncio.run(executor.run(lambda: "restarted")) == "restarted"
+
+
+def test_asset_executor_sheds_work_that_waited_too_long() -> None:
+    executor = AssetExecutor(workers=1, max_queue=4, max_wait_seconds=0.01)
+    release = threading.Event()
+
+    async def stalled() -> None:
+        first = asyncio.create_task(executor.run(release.wait))
+        second = asyncio.create_task(executor.run(lambda: "late"))
+        await asyncio.sleep(0.05)
+        release.set()
+        await first
+        with pytest.raises(AssetExecutorOverloaded) as expired:
+            await second
+        assert expired.value.status_code == 503
+
+    asyncio.run(stalled())
+    assert executor.metrics()["expired"] == 1
+    executor.shutdown()
+
+
+def test_cancelled_callers_keep_their_slot_until_the_job_finishes() -> None:
+    executor = AssetExecutor(workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def disconnect() -> str:
+        running = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        await asyncio.sleep(0)
+        try:
+            # 客户端断开后线程仍在执行，名额不能被新任务占用
+            with pytest.raises(AssetExecutorOverloaded):
+                await asyncio.wait_for(executor.run(lambda: "too early"), 1)
+        finally:
+            release.set()
+        await asyncio.sleep(0.05)
+        return await executor.run(lambda: "admitted")
+
+    assert asyncio.run(disconnect()) == "admitted"
+    assert executor.metrics()["queued"] == 0
+    executor.shutdown()
@@ -0,0 +1,39 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from models.meeting_context import EventProvenance, ScreenshotAnalysisPayload
+from services.asset_store import ScreenshotAssetStore
+
+
+def write(path: Path, data: bytes) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_identical_screenshots_share_one_blob_across_meetings(tmp_path: Path) -> None:
+    store = ScreenshotAssetStore(tmp_path)
+    digest = hashlib.sha256(b"slide").hexdigest()
+
+    first = store.adopt(write(tmp_path / "a" / "1.png", b"slide"), "a", "1")
+    second = store.adopt(write(tmp_path / "b" / "2.png", b"slide"), "b", "2", digest)
+    store.record_analysis(
+        digest,
+        "event-1",
+        ScreenshotAnalysisPayload(asset_id="1", status="completed", text="发布计划"),
+        EventProvenance(source="multimodal_analysis", provider="fake"),
+    )
+
+    assert (first.deduplicated, second.deduplicated) == (False, True)
+    assert first.path == second.path
+    reopened = ScreenshotAssetStore(tmp_path)
+    assert reopened.analysis(digest).event_id == "event-1"
+    assert reopened.locate("a", "1").path == reopened.locate("b", "2").path
+    # 入库失败只去掉这次的引用，其他会议引用的文件保留
+    reopened.forget("b", "2")
+    assert reopened.locate("b", "2") is None
+    assert reopened.locate("a", "1").path.is_file()
+    with pytest.raises(ValueError):
+        store.adopt(write(tmp_path.parent / "outside.png", b"x"), "a", "outside")
@@ -0,0 +1,77 @@
+import io
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from models.native_bridge import NativeAudioChunk
+from services.audio_export import AudioExportError, iter_wav, plan_session_audio
+from services.native_audio_ingress import NativeAudioIngress
+
+
+def tone(value: int, frames: int) -> bytes:
+    return np.full(frames, value, dtype="<i2").tobytes()
+
+
+def spool_meeting(tmp_path: Path) -> NativeAudioIngress:
+    ingress = NativeAudioIngress(tmp_path, spool=True, preallocate_bytes=4096)
+    chunks = [
+        (0, "microphone", 0, tone(1000, 800)),
+        (1, "system", 0, tone(-2000, 800)),
+        # 麦克风第二个分片在 100 ms 之后才开始，中间应补静音。
+        (2, "microphone", 100, tone(3000, 800)),
+    ]
+    for sequence, source, meeting_time_ms, payload in chunks:
+        ingress.accept(
+            "session-1",
+            NativeAudioChunk(
+                sequence=sequence,
+                sample_rate=16_000,
+                channels=1,
+                source=source,
+                meeting_time_ms=meeting_time_ms,
+            ),
+            payload,
+        )
+    return ingress
+
+
+def read_wav(blocks) -> tuple[wave._wave_params, np.ndarray]:
+    with wave.open(io.BytesIO(b"".join(blocks)), "rb") as exported:
+        params = exported.getparams()
+        frames = exported.readframes(params.nframes)
+    return params, np.frombuffer(frames, dtype="<i2").reshape(-1, params.nchannels)
+
+
+def test_split_export_keeps_sources_on_separate_channels(tmp_path: Path) -> None:
+    ingress = spool_meeting(tmp_path)
+
+    plan = plan_session_audio(ingress.session_audio("session-1"), "split")
+    params, samples = read_wav(iter_wav(plan, block_frames=333))
+
+    assert (params.nchannels, params.framerate, params.nframes) == (2, 16_000, 2400)
+    assert samples[:800].tolist() == [[1000, -2000]] * 800
+    assert samples[800:1600].tolist() == [[0, 0]] * 800
+    assert samples[1600:].tolist() == [[3000, 0]] * 800
+
+
+def test_mix_export_sums_sources_with_a_correct_header(tmp_path: Path) -> None:
+    ingress = spool_meeting(tmp_path)
+
+    plan = plan_session_audio(ingress.session_audio("session-1"))
+    blocks = list(iter_wav(plan, block_frames=1000))
+    params, samples = read_wav(blocks)
+
+    assert sum(map(len, blocks)) == len(plan.wav_header()) + plan.data_bytes
+    assert params.nchannels == 1
+    assert samples[:800, 0].tolist() == [-1000] * 800
+    assert samples[1600:, 0].tolist() == [3000] * 800
+
+    ingress.accept(
+        "session-1",
+        NativeAudioChunk(sequence=3, sample_rate=48_000, channels=1),
+        tone(1, 10),
+    )
+    with pytest.raises(AudioExportError):
+        plan_session_audio(ingress.session_audio("session-1"))
@@ -573,3 +573,75 @@ def test_text_only_provider_discloses_pixels_were_not_seen_but_vision_gets_asset
     assert vision_request.degraded_vision is False
     user_parts = vision_request.messages[-1].content
     assert any(part.type == "image_asset" for part in user_parts)
+
+
+def test_near_duplicate_screenshots_collapse_into_one_evidence_bundle() -> None:
+    def screenshot(sequence: int, asset_id: str, perceptual_hash: str):
+        return event(
+            sequence,
+            EventKind.SCREENSHOT,
+            ScreenshotPayload(
+                asset_id=asset_id,
+                relative_path=f"assets/sha256/{asset_id}.png",
+                mime_type="image/png",
+                sha256=asset_id,
+                perceptual_hash=perceptual_hash,
+            ),
+        )
+
+    def analysis(sequence: int, asset_id: str, text: str):
+        return event(
+            sequence,
+            EventKind.SCREENSHOT_ANALYSIS,
+            ScreenshotAnalysisPayload(
+                asset_id=asset_id,
+                status="completed",
+                text=text,
+                vision_used=True,
+            ),
+        )
+
+    record = MeetingRecord(
+        meeting_id="meeting-a",
+        started_at=START,
+        events=[
+            screenshot(1, "slide-a", "f0f0f0f0f0f0f0f0"),
+            analysis(2, "slide-a", "发布计划：周五冻结"),
+            screenshot(3, "slide-b", "f0f0f0f0f0f0f0f1"),
+            analysis(4, "slide-b", "发布计划：周五冻结"),
+            screenshot(5, "slide-c", "f0f0f0f0f0f0f0f3"),
+            screenshot(6, "chart", "0f0f0f0f0f0f0f0f"),
+        ],
+    )
+
+    selection = MeetingContextBuilder().select(
+        record, "发布计划是什么？", ContextBudget()
+    )
+
+    assert [item.event_id for item in selection.events] == [
+        "event-4",
+        "event-5",
+        "event-6",
+    ]
+    assert "同一画面共 3 张近似截图" in selection.rendered_event(selection.events[1])
+    assert "近似截图" not in selection.rendered_event(selection.events[2])
+
+    exact = MeetingContextBuilder(near_duplicate_distance=-1).select(
+        record, "发布计划是什么？", ContextBudget()
+    )
+    assert len(exact.events) == 6
+
+    # 每张只比上一张多变几位时，按这一组的第一张判断，不会一路串到别的画面。
+    drifting = MeetingRecord(
+        meeting_id="meeting-a",
+        started_at=START,
+        events=[
+            screenshot(1, "slide-a", "0000000000000000"),
+            screenshot(2, "slide-b", "000000000000000f"),
+            screenshot(3, "slide-c", "00000000000000ff"),
+        ],
+    )
+    collapsed = MeetingContextBuilder().select(
+        drifting, "发布计划是什么？", ContextBudget()
+    )
+    assert [item.event_id for item in collapsed.events] == ["event-2", "event-3"]
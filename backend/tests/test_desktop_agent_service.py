@@ -1922,3 +1922,184 @@ def test_answer_meeting_emits_exhaustion_on_tool_budget_limit(monkeypatch) -> No
         if event.get("data", {}).get("delta")
     )
     assert "超过了工具调用上限" in deltas
+
+
+class SummaryStreamResponse:
+    def __init__(self, content: str):
+        self.content = content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        return False
+
+    def raise_for_status(self) -> None:
+        pass
+
+    async def aiter_lines(self):
+        for index in range(0, len(self.content), 5):
+            yield "data: " + json.dumps(
+                {"choices": [{"delta": {"content": self.content[index : index + 5]}}]},
+                ensure_ascii=False,
+            )
+        yield "data: [DONE]"
+
+
+class SummaryStreamClient:
+    last_payload = None
+    content = ""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        return False
+
+    def stream(self, *args, **kwargs) -> SummaryStreamResponse:
+        type(self).last_payload = kwargs["json"]
+        return SummaryStreamResponse(type(self).content)
+
+
+def test_streaming_summary_emits_partial_fields_and_returns_the_final_result(
+    monkeypatch,
+) -> None:
+    SummaryStreamClient.content = json.dumps(
+        {
+            "summary_text": "确认周五发布",
+            "tasks": [{"task": "完成回滚演练", "status": "pending"}],
+            "key_points": ["冻结范围"],
+            "decisions": ["周五发布"],
+        },
+        ensure_ascii=False,
+    )
+    monkeypatch.setattr(
+        "services.desktop_agent_service.httpx.AsyncClient",
+        lambda **kwargs: SummaryStreamClient(),
+    )
+    service = DesktopAgentService(
+        environment={
+            "PROMPTMEET_SUMMARY_PROVIDER": "openai",
+            "PROMPTMEET_SUMMARY_MODEL": "summary-model",
+            "OPENAI_API_KEY": "test-key",
+        }
+    )
+    evidence = MeetingEvent(
+        event_id="stream-evidence",
+        meeting_id="summary-stream",
+        sequence=1,
+        occurred_at=datetime(2026, 7, 29, tzinfo=UTC),
+        kind=EventKind.TRANSCRIPT,
+        provenance=EventProvenance(source="test"),
+        payload=TranscriptPayload(segment_id="stream", text="周五发布，先冻结范围"),
+    )
+    record = MeetingRecord(
+        meeting_id="summary-stream",
+        started_at=datetime(2026, 7, 29, tzinfo=UTC),
+        events=[evidence],
+    )
+    emitted = []
+
+    async def collect(message: dict) -> None:
+        emitted.append(message["data"])
+
+    result = asyncio.run(
+        service.stream_meeting_summary(record, record.events, {}, collect)
+    )
+
+    assert SummaryStreamClient.last_payload["stream"] is True
+    assert emitted[0]["field"] == "summary_text"
+    assert "确认周五发布".startswith(emitted[0]["text"])
+    assert {"field": "tasks", "index": 0, "item": result.summary["tasks"][0]} in (
+        emitted
+    )
+    assert {"field": "key_points", "index": 0, "item": "冻结范围"} in emitted
+    assert result.summary["summary_text"] == "确认周五发布"
+    assert result.source_event_ids == ["stream-evidence"]
+
+
+def test_tool_calls_in_one_turn_run_concurrently_and_keep_call_order() -> None:
+    delays = {"first": 0.12, "second": 0.06, "third": 0.0}
+    active = 0
+    peak = 0
+
+    async def search(query: str, limit: int = 4) -> list[dict[str, str]]:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(delays[query])
+        active -= 1
+        return [
+            {
+                "title": query,
+                "url": f"https://example.com/{query}",
+                "snippet": f"{query} snippet",
+            }
+        ]
+
+    service = DesktopAgentService(
+        environment={"DEEPSEEK_API_KEY": "test-key"},
+        web_search=search,
+    )
+    service.MAX_PARALLEL_TOOL_CALLS = 2
+    sources: list[dict[str, str]] = []
+
+    outputs = asyncio.run(
+        service._execute_tool_calls(
+            [
+                {
+                    "id": f"call_{query}",
+                    "function": {
+                        "name": "web_search",
+                        "arguments": json.dumps({"query": query}),
+                    },
+                }
+                for query in ("first", "second", "third")
+            ],
+            sources,
+        )
+    )
+
+    assert peak == 2
+    assert [output.splitlines()[0] for output in outputs] == [
+        'query: "first"',
+        'query: "second"',
+        'query: "third"',
+    ]
+    assert [source["title"] for source in sources] == ["first", "second", "third"]
+
+
+def test_repeated_search_queries_are_served_from_the_short_ttl_cache() -> None:
+    searches = []
+
+    async def search(query: str, limit: int = 4) -> list[dict[str, str]]:
+        searches.append(query)
+        if query == "slow":
+            await asyncio.sleep(1)
+        return [{"title": "发布", "url": "https://example.com", "snippet": "发布窗口"}]
+
+    service = DesktopAgentService(
+        environment={"DEEPSEEK_API_KEY": "test-key"},
+        web_search=search,
+    )
+    service.TOOL_CALL_TIMEOUT_SECONDS = 0.05
+
+    def call(query: str) -> dict:
+        return {
+            "function": {
+                "name": "web_search",
+                "arguments": json.dumps({"query": query}),
+            }
+        }
+
+    async def exercise() -> tuple[str, str, str]:
+        first = await service._execute_tool_call(call("Release  Window"), [])
+        second = await service._execute_tool_call(call("release window"), [])
+        slow = await service._execute_tool_call(call("slow"), [])
+        return first, second, slow
+
+    first, second, slow = asyncio.run(exercise())
+
+    assert searches == ["Release Window", "slow"]
+    assert "count: 1" in first and "count: 1" in second
+    assert slow.startswith("error: web search unavailable")
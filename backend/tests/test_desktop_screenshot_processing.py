@@ -1,10 +1,13 @@
 import asyncio
+import hashlib
 import importlib
+import io
 from datetime import UTC, datetime
 from pathlib import Path
 
 import pytest
 from fastapi import HTTPException
+from fastapi.testclient import TestClient
 
 from services.meeting_ingestion import MeetingIngestionService, ScreenshotAnalysisResult
 from services.meeting_repository import MeetingRepository
@@ -128,3 +131,127 @@ def test_screenshot_and_ocr_analysis_persist_exact_asset_provenance(tmp_path) ->
     assert analysis.payload.asset_id == screenshot.payload.asset_id
     assert analysis.payload.evidence_kind == "ocr"
     assert analysis.payload.image_rejection == "HTTP 400: image input rejected"
+
+
+def test_identical_screenshots_share_one_asset_and_reuse_the_analysis(
+    monkeypatch,
+    tmp_path,
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    repository = MeetingRepository(tmp_path / "data")
+    ingestion = MeetingIngestionService(repository)
+    analyzed = []
+
+    class CountingAgent:
+        async def analyze_screenshot(self, record, screenshot_event):
+            analyzed.append(screenshot_event.event_id)
+            return ScreenshotAnalysisResult(
+                status="completed",
+                text="幻灯片：发布计划",
+                vision_used=True,
+                provider="fake",
+                model="fake-vision",
+                evidence_kind="vision",
+            )
+
+    monkeypatch.setattr(main_service, "DESKTOP_MODE", True)
+    monkeypatch.setattr(main_service, "meeting_repository", repository)
+    monkeypatch.setattr(main_service, "meeting_ingestion", ingestion)
+    monkeypatch.setattr(main_service, "desktop_agent_service", CountingAgent())
+    monkeypatch.setattr(
+        main_service,
+        "broadcast_meeting_event",
+        lambda *args, **kwargs: asyncio.sleep(0),
+    )
+    monkeypatch.setattr(
+        main_service.websocket_manager,
+        "broadcast_to_session",
+        lambda *args, **kwargs: asyncio.sleep(0),
+    )
+
+    async def upload(meeting_id: str, name: str) -> None:
+        path = repository.assets_directory / meeting_id / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\x89PNG\r\n\x1a\nsame-slide")
+        await main_service.process_native_screenshot(meeting_id, path)
+        await asyncio.gather(*main_service.meeting_screenshot_tasks)
+
+    for meeting_id in ("meeting-a", "meeting-b"):
+        ingestion.start(meeting_id, datetime(2026, 8, 1, tzinfo=UTC))
+    hashed = []
+    sha256 = hashlib.sha256
+
+    def counting_sha256(*args, **kwargs):
+        hashed.append(args)
+        return sha256(*args, **kwargs)
+
+    monkeypatch.setattr(hashlib, "sha256", counting_sha256)
+    asyncio.run(upload("meeting-a", "first.png"))
+    asyncio.run(upload("meeting-b", "second.png"))
+    monkeypatch.setattr(hashlib, "sha256", sha256)
+
+    first, second = (
+        repository.get(meeting_id).events for meeting_id in ("meeting-a", "meeting-b")
+    )
+    assert len(analyzed) == 1
+    # 旧版上传在入库时算一次摘要，写事件时沿用，不再重复读取和哈希
+    assert len(hashed) == 2
+    assert first[-2].payload.relative_path == second[-2].payload.relative_path
+    assert second[-2].payload.asset_id == "second"
+    assert not (repository.assets_directory / "meeting-b" / "second.png").exists()
+    assert (
+        repository.screenshot_assets.locate("meeting-a", "first").path
+        == repository.screenshot_assets.locate("meeting-b", "second").path
+    )
+    assert second[-1].payload.text == "幻灯片：发布计划"
+    assert second[-1].payload.asset_id == "second"
+    assert second[-1].provenance.reused_from == first[-1].event_id
+
+
+def test_meeting_assets_support_thumbnails_and_conditional_get(
+    monkeypatch,
+    tmp_path,
+) -> None:
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    repository = MeetingRepository(tmp_path / "data")
+    ingestion = MeetingIngestionService(repository)
+    ingestion.start("meeting-1", datetime(2026, 8, 2, tzinfo=UTC))
+    monkeypatch.setattr(main_service, "meeting_repository", repository)
+    monkeypatch.setattr(main_service, "meeting_ingestion", ingestion)
+    upload = repository.assets_directory / "meeting-1" / "slide.png"
+    upload.parent.mkdir(parents=True)
+    Image.effect_noise((1600, 1000), 64).save(upload)
+    asset = repository.screenshot_assets.adopt(upload, "meeting-1", "slide")
+    ingestion.screenshot(
+        "meeting-1", asset.path, "image/png", sha256=asset.sha256, asset_id="slide"
+    )
+    client = TestClient(main_service.app)
+
+    original = client.get("/api/meetings/meeting-1/assets/slide")
+    thumbnail = client.get(
+        "/api/meetings/meeting-1/assets/slide?variant=thumbnail&size=160"
+    )
+    cached = client.get(
+        "/api/meetings/meeting-1/assets/slide?variant=thumbnail&size=160",
+        headers={"If-None-Match": thumbnail.headers["etag"]},
+    )
+
+    assert original.status_code == 200
+    assert original.headers["etag"] == f'"{asset.sha256}"'
+    assert "immutable" in original.headers["cache-control"]
+    assert thumbnail.headers["content-type"] == "image/webp"
+    assert thumbnail.headers["etag"] == f'"{asset.sha256}-w160"'
+    with Image.open(io.BytesIO(thumbnail.content)) as image:
+        assert max(image.size) == 160
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert (
+        client.get(
+            "/api/meetings/meeting-1/assets/slide?variant=thumbnail&size=333"
+        ).status_code
+        == 422
+    )
+    assert client.get("/api/meetings/meeting-1/assets/missing").status_code == 404
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from services.image_preparation import VisionImagePreparer
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def screenshot_png(width: int, height: int) -> bytes:
+    image = Image.new("RGBA", (width, height), (255, 255, 255, 255))
+    for x in range(0, width, 7):
+        for y in range(0, height, 5):
+            image.putpixel((x, y), (x % 256, y % 256, (x * y) % 256, 255))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_large_screenshot_is_downscaled_and_cached_next_to_the_original(
+    tmp_path,
+) -> None:
+    original = tmp_path / "assets" / "meeting-1" / "shot.png"
+    original.parent.mkdir(parents=True)
+    original.write_bytes(screenshot_png(2880, 1800))
+    preparer = VisionImagePreparer(max_dimension=1024, quality=70)
+
+    first = preparer.prepare(original, "image/png", "shot-sha")
+    second = preparer.prepare(original, "image/png", "shot-sha")
+
+    assert first.mime_type == "image/jpeg"
+    assert first.prepared_bytes < first.original_bytes
+    assert first.cached is False
+    assert second.cached is True
+    assert second.data == first.data
+    assert preparer.variant_path(original, "shot-sha").parent == (
+        original.parent / ".prepared"
+    )
+    with Image.open(io.BytesIO(first.data)) as prepared:
+        assert max(prepared.size) == 1024
+        assert prepared.size == (1024, 640)
+
+
+def test_undecodable_or_already_small_images_are_sent_unchanged(tmp_path) -> None:
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not-really-a-png")
+    preparer = VisionImagePreparer(max_dimension=1024, image_format="webp")
+
+    prepared = preparer.prepare(broken, "image/png")
+
+    assert prepared.data == b"not-really-a-png"
+    assert prepared.mime_type == "image/png"
+    assert not (tmp_path / ".prepared").exists()
+
+
+def test_zero_max_dimension_disables_preparation(tmp_path) -> None:
+    original = tmp_path / "shot.png"
+    original.write_bytes(screenshot_png(64, 64))
+    preparer = VisionImagePreparer.from_environment(
+        {"PROMPTMEET_VISION_MAX_DIMENSION": "0"}
+    )
+
+    prepared = preparer.prepare(original, "image/png", "shot-sha")
+
+    assert preparer.enabled is False
+    assert prepared.data == original.read_bytes()
@@ -0,0 +1,91 @@
+import hashlib
+import io
+import json
+import zipfile
+from datetime import UTC, datetime, timedelta
+
+from models.meeting_context import (
+    EventKind,
+    EventProvenance,
+    MeetingEvent,
+    ScreenshotPayload,
+    TranscriptPayload,
+)
+from services import meeting_export
+from services.meeting_export import iter_ndjson, iter_zip
+from services.meeting_repository import MeetingRepository
+
+START = datetime(2026, 7, 25, 10, 0, tzinfo=UTC)
+PNG = b"\x89PNG\r\n\x1a\nslide"
+
+
+def transcript(text: str) -> MeetingEvent:
+    return MeetingEvent(
+        occurred_at=START,
+        kind=EventKind.TRANSCRIPT,
+        provenance=EventProvenance(source="native_transcript"),
+        payload=TranscriptPayload(segment_id=f"segment-{text}", text=text),
+    )
+
+
+def screenshot(repository: MeetingRepository, meeting_id: str) -> MeetingEvent:
+    upload = repository.assets_directory / "uploads" / "slide.png"
+    upload.parent.mkdir(parents=True, exist_ok=True)
+    upload.write_bytes(PNG)
+    stored = repository.screenshot_assets.adopt(upload, meeting_id, "asset-1")
+    return MeetingEvent(
+        occurred_at=START,
+        kind=EventKind.SCREENSHOT,
+        provenance=EventProvenance(source="native_screenshot"),
+        payload=ScreenshotPayload(
+            asset_id="asset-1",
+            relative_path=str(stored.path.relative_to(repository.root)),
+            mime_type="image/png",
+            sha256=hashlib.sha256(PNG).hexdigest(),
+        ),
+    )
+
+
+def test_ndjson_export_streams_events_in_bounded_chunks(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(meeting_export, "EXPORT_CHUNK_BYTES", 512)
+    repository = MeetingRepository(tmp_path)
+    repository.create("meeting-a", START)
+    for index in range(30):
+        repository.append("meeting-a", transcript(f"第 {index} 句"))
+    repository.set_title("meeting-a", "发布评审")
+
+    chunks = list(iter_ndjson(repository, [repository.header("meeting-a")]))
+    lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) < 512 + 400
+    assert lines[0]["type"] == "meeting"
+    assert lines[0]["meeting"]["title"] == "发布评审"
+    assert "events" not in lines[0]["meeting"]
+    assert [line["event"]["sequence"] for line in lines[1:]] == list(range(1, 31))
+    assert lines[-1]["event"]["payload"]["text"] == "第 29 句"
+
+
+def test_zip_archive_covers_a_date_range_with_screenshot_assets(tmp_path) -> None:
+    repository = MeetingRepository(tmp_path)
+    for day, meeting_id in enumerate(("meeting-a", "meeting-b", "meeting-c")):
+        repository.create(meeting_id, START + timedelta(days=day))
+        repository.append(meeting_id, transcript(meeting_id))
+    repository.append("meeting-b", screenshot(repository, "meeting-b"))
+
+    headers = repository.headers(START + timedelta(days=1), START + timedelta(days=3))
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(iter_zip(repository, headers))))
+
+    assert [header.meeting_id for header in headers] == ["meeting-b", "meeting-c"]
+    assert sorted(archive.namelist()) == [
+        "meeting-b/assets/asset-1.png",
+        "meeting-b/meeting.ndjson",
+        "meeting-c/meeting.ndjson",
+    ]
+    assert archive.read("meeting-b/assets/asset-1.png") == PNG
+    events = archive.read("meeting-b/meeting.ndjson").decode("utf-8").splitlines()
+    assert [json.loads(line)["type"] for line in events] == [
+        "meeting",
+        "event",
+        "event",
+    ]
@@ -1,5 +1,6 @@
 import asyncio
 import importlib
+import uuid
 from datetime import UTC, datetime
 
 import pytest
@@ -15,6 +16,7 @@ from services.desktop_agent_service import (
 from services.meeting_ingestion import MeetingIngestionService, ScreenshotAnalysisResult
 from services.meeting_repository import MeetingRepository
 from services.desktop_storage import HybridSessionStorage
+from services.suggestion_engine import SpeculativeSuggestionEngine
 
 PNG = b"\x89PNG\r\n\x1a\nPromptMeet screenshot"
 
@@ -1066,6 +1068,249 @@ def test_websocket_rejects_session_lost_after_rehydrate(monkeypatch, tmp_path) -
     assert captured.value.code == 4404
 
 
+def test_reconnecting_client_resumes_missed_events_by_sequence(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+    for index in range(3):
+        client.post(
+            f"/api/sessions/{meeting_id}/native-transcript",
+            json={
+                "id": str(uuid.uuid4()),
+                "text": f"第{index}句",
+                "speaker": "会议",
+                "source": "system",
+                "timestamp": "2026-07-25T10:00:00+00:00",
+            },
+        )
+    last_sequence = client.get(f"/api/meetings/{meeting_id}").json()["events"][-1][
+        "sequence"
+    ]
+
+    page = client.get(
+        f"/api/meetings/{meeting_id}/events",
+        params={"after": last_sequence - 3, "limit": 2},
+    ).json()
+    rest = client.get(
+        f"/api/meetings/{meeting_id}/events", params={"after": page["next_after"]}
+    ).json()
+
+    assert [event["payload"]["text"] for event in page["events"]] == ["第0句", "第1句"]
+    assert page["has_more"] is True
+    assert [event["payload"]["text"] for event in rest["events"]] == ["第2句"]
+    assert rest["has_more"] is False
+    assert client.get("/api/meetings/missing/events").status_code == 404
+
+    with client.websocket_connect(
+        f"/ws/{meeting_id}?since_sequence={last_sequence - 2}"
+    ) as websocket:
+        assert websocket.receive_json()["type"] == "connection_established"
+        replayed = [websocket.receive_json() for _ in range(2)]
+        complete = websocket.receive_json()
+        websocket.send_json({"type": "resume", "data": {"since_sequence": 0}})
+        resumed = websocket.receive_json()
+
+    assert [message["data"]["payload"]["text"] for message in replayed] == [
+        "第1句",
+        "第2句",
+    ]
+    assert complete["type"] == "replay_complete"
+    assert complete["data"]["last_sequence"] == last_sequence
+    assert resumed["type"] == "meeting_event"
+    assert resumed["data"]["sequence"] == 1
+
+
+def test_malformed_resume_is_rejected_instead_of_replaying_the_meeting(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+
+    with client.websocket_connect(f"/ws/{meeting_id}") as websocket:
+        assert websocket.receive_json()["type"] == "connection_established"
+        replies = []
+        for payload in (
+            "not-an-object",
+            {},
+            {"since_sequence": "abc"},
+            {"since_sequence": -1},
+        ):
+            websocket.send_json({"type": "resume", "data": payload})
+            replies.append(websocket.receive_json())
+
+    assert [reply["type"] for reply in replies] == ["error"] * 4
+    assert {reply["data"]["scope"] for reply in replies} == {"resume"}
+
+
+def test_meeting_and_session_reads_are_conditional_and_incremental(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+
+    def transcript(text: str) -> None:
+        client.post(
+            f"/api/sessions/{meeting_id}/native-transcript",
+            json={
+                "id": str(uuid.uuid4()),
+                "text": text,
+                "speaker": "会议",
+                "source": "system",
+                "timestamp": "2026-07-25T10:00:00+00:00",
+            },
+        )
+
+    transcript("第一句")
+    meeting = client.get(f"/api/meetings/{meeting_id}")
+    session = client.get(f"/api/sessions/{meeting_id}")
+    unchanged_meeting = client.get(
+        f"/api/meetings/{meeting_id}",
+        headers={"If-None-Match": meeting.headers["ETag"]},
+    )
+    unchanged_session = client.get(
+        f"/api/sessions/{meeting_id}",
+        params={"after_segment": 1},
+        headers={"If-None-Match": session.headers["ETag"]},
+    )
+
+    assert unchanged_meeting.status_code == unchanged_session.status_code == 304
+    assert unchanged_meeting.content == b""
+
+    transcript("第二句")
+    last_sequence = meeting.json()["events"][-1]["sequence"]
+    changed = client.get(
+        f"/api/meetings/{meeting_id}",
+        params={"after": last_sequence},
+        headers={"If-None-Match": meeting.headers["ETag"]},
+    )
+    delta = client.get(
+        f"/api/sessions/{meeting_id}",
+        params={"after_segment": 1},
+        headers={"If-None-Match": session.headers["ETag"]},
+    )
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != meeting.headers["ETag"]
+    assert [event["payload"]["text"] for event in changed.json()["events"]] == [
+        "第二句"
+    ]
+    assert delta.status_code == 200
+    assert delta.json()["segment_count"] == 2
+    assert [
+        item["text"] for item in delta.json()["session"]["transcript_segments"]
+    ] == ["第二句"]
+    wildcard = client.get(f"/api/meetings/{meeting_id}", headers={"If-None-Match": "*"})
+    assert wildcard.status_code == 304
+
+
+def test_large_meeting_responses_are_compressed_and_small_ones_are_not(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+    for index in range(20):
+        client.post(
+            f"/api/sessions/{meeting_id}/native-transcript",
+            json={
+                "id": str(uuid.uuid4()),
+                "text": f"第 {index} 句：确认发布窗口和回滚负责人",
+                "speaker": "会议",
+                "source": "system",
+                "timestamp": "2026-07-25T10:00:00+00:00",
+            },
+        )
+
+    compressed = client.get(
+        f"/api/meetings/{meeting_id}", headers={"Accept-Encoding": "gzip"}
+    )
+    identity = client.get(
+        f"/api/meetings/{meeting_id}", headers={"Accept-Encoding": "identity"}
+    )
+    small = client.get(
+        f"/api/meetings/{meeting_id}/events",
+        params={"after": 21},
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert int(compressed.headers["Content-Length"]) < len(identity.content)
+    assert compressed.json() == identity.json()
+    assert len(identity.json()["events"]) == 21
+    assert "Content-Encoding" not in identity.headers
+    assert small.json()["events"] == []
+    assert "Content-Encoding" not in small.headers
+
+
+def test_search_endpoint_returns_ranked_hits_with_snippets(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+    for text in ("先过一遍预算", "上线前必须冻结范围"):
+        client.post(
+            f"/api/sessions/{meeting_id}/native-transcript",
+            json={
+                "id": str(uuid.uuid4()),
+                "text": text,
+                "speaker": "会议",
+                "source": "system",
+                "timestamp": "2026-07-25T10:00:00+00:00",
+            },
+        )
+
+    response = client.get("/api/search", params={"q": "冻结范围"})
+
+    assert response.status_code == 200
+    hits = response.json()["hits"]
+    assert [(hit["meeting_id"], hit["kind"]) for hit in hits] == [
+        (meeting_id, "transcript")
+    ]
+    assert hits[0]["snippet"] == "上线前必须冻结范围"
+    assert client.get("/api/search").status_code == 422
+
+
+def test_meeting_export_routes_stream_ndjson_and_filter_by_date(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+
+    export = client.get(f"/api/meetings/{meeting_id}/export")
+    today = datetime.now(UTC).date().isoformat()
+    archive = client.get(
+        "/api/exports/meetings", params={"start": today, "format": "ndjson"}
+    )
+    empty = client.get("/api/exports/meetings", params={"end": "2000-01-01"})
+
+    assert export.status_code == 200
+    assert export.headers["Content-Type"] == "application/x-ndjson"
+    assert export.headers["Content-Disposition"].endswith(f'{meeting_id}.ndjson"')
+    assert export.text.splitlines()[0].startswith('{"type":"meeting"')
+    assert archive.text == export.text
+    assert empty.status_code == 404
+    assert client.get("/api/meetings/missing/export").status_code == 404
+
+
 def test_native_transcript_replay_is_idempotent_by_stable_segment_id(
     monkeypatch, tmp_path
 ) -> None:
@@ -1240,3 +1485,371 @@ def test_summary_generation_accepts_screenshot_only_meeting_input(
     assert response.status_code == 200
     assert response.json()["status"] == "generated"
     assert response.json()["event"]["payload"]["source_event_ids"]
+
+
+def test_native_recording_drives_server_side_summary_milestones(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    calls = []
+
+    class RecordingScheduler:
+        def start(self, session_id, has_new_input=False):
+            calls.append(("start", session_id))
+
+        def tracks(self, session_id):
+            return False
+
+        def pause(self, session_id):
+            calls.append(("pause", session_id))
+
+        def stop(self, session_id):
+            calls.append(("stop", session_id))
+
+        def mark_input(self, session_id):
+            calls.append(("input", session_id))
+
+    monkeypatch.setattr(main_service, "summary_scheduler", RecordingScheduler())
+    monkeypatch.setattr(main_service, "SUMMARY_MILESTONE_MINUTES", 5.0)
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+
+    client.post(f"/api/sessions/{meeting_id}/start-native-recording")
+    client.post(
+        f"/api/sessions/{meeting_id}/native-transcript",
+        json={
+            "id": "7E2CB506-925E-4A6E-BB68-E5006AB09BDF",
+            "text": "冻结范围",
+            "speaker": "林晨",
+            "source": "microphone",
+            "timestamp": "2026-07-25T10:00:00+00:00",
+        },
+    )
+    client.post(f"/api/sessions/{meeting_id}/pause-native-recording")
+    client.post(f"/api/sessions/{meeting_id}/resume-native-recording")
+    client.post(f"/api/sessions/{meeting_id}/stop-native-recording")
+
+    assert calls == [
+        ("start", meeting_id),
+        ("input", meeting_id),
+        ("pause", meeting_id),
+        ("start", meeting_id),
+        ("stop", meeting_id),
+    ]
+
+
+def test_pause_and_stop_handled_by_another_worker_reach_local_milestones(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    calls = []
+
+    class RecordingScheduler:
+        def start(self, session_id, has_new_input=False):
+            calls.append(("start", session_id))
+
+        def tracks(self, session_id):
+            return True
+
+        def pause(self, session_id):
+            calls.append(("pause", session_id))
+
+        def stop(self, session_id):
+            calls.append(("stop", session_id))
+
+    monkeypatch.setattr(main_service, "summary_scheduler", RecordingScheduler())
+    monkeypatch.setattr(main_service, "SUMMARY_MILESTONE_MINUTES", 5.0)
+    monkeypatch.setattr(
+        main_service.suggestion_engine,
+        "forget",
+        lambda session_id: calls.append(("forget", session_id)),
+    )
+    monkeypatch.setattr(main_service, "desktop_agent_service", FakeMeetingAgent())
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+    client.post(f"/api/sessions/{meeting_id}/start-native-recording")
+    calls.clear()
+
+    async def receive_from_other_worker(kind: str) -> None:
+        await main_service.websocket_manager.deliver_remote(
+            meeting_id, {"type": kind, "session_id": meeting_id}
+        )
+
+    asyncio.run(receive_from_other_worker("audio_pause"))
+    asyncio.run(receive_from_other_worker("audio_resume"))
+    asyncio.run(receive_from_other_worker("audio_stop"))
+    assert calls == [
+        ("pause", meeting_id),
+        ("start", meeting_id),
+        ("stop", meeting_id),
+        ("forget", meeting_id),
+    ]
+
+    # 没收到通知时，里程碑触发前也会按记录状态停止
+    calls.clear()
+    main_service.meeting_ingestion.finish(meeting_id, MeetingStatus.COMPLETED)
+    result = asyncio.run(main_service.run_milestone_summary(meeting_id, 5))
+    assert result["status"] == "no_action"
+    assert calls == [("stop", meeting_id), ("forget", meeting_id)]
+
+
+def test_milestone_summary_runs_through_the_shared_summary_pipeline(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+
+    class SummaryAgent(FakeMeetingAgent):
+        async def summarize_meeting(self, record, source_events, source_progress=None):
+            return MeetingSummaryResult(
+                summary={
+                    "summary_text": "里程碑摘要",
+                    "tasks": [],
+                    "key_points": [],
+                    "decisions": [],
+                },
+                provider="openai",
+                model="summary-model",
+                source_event_ids=[
+                    event.event_id
+                    for event in source_events
+                    if event.kind != EventKind.SUMMARY
+                ],
+                source_revision=0,
+                source_progress=full_summary_progress(source_events),
+            )
+
+    broadcasts = []
+
+    async def collect(session_id, payload):
+        broadcasts.append(payload["type"])
+
+    monkeypatch.setattr(main_service, "desktop_agent_service", SummaryAgent())
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+    client.post(
+        f"/api/sessions/{meeting_id}/native-transcript",
+        json={
+            "id": "8E2CB506-925E-4A6E-BB68-E5006AB09BDF",
+            "text": "冻结范围",
+            "speaker": "林晨",
+            "source": "microphone",
+            "timestamp": "2026-07-25T10:00:00+00:00",
+        },
+    )
+    monkeypatch.setattr(main_service.websocket_manager, "broadcast_to_session", collect)
+
+    first = asyncio.run(main_service.run_milestone_summary(meeting_id, 5))
+    second = asyncio.run(main_service.run_milestone_summary(meeting_id, 10))
+
+    assert first["status"] == "generated"
+    assert first["event"]["payload"]["trigger"] == "milestone"
+    assert first["event"]["payload"]["active_minutes"] == 5
+    assert second["status"] == "no_action"
+    assert broadcasts == ["summary_generated", "meeting_event"]
+
+
+def test_streamed_summary_broadcasts_partials_before_the_persisted_event(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+
+    class StreamingSummaryAgent(FakeMeetingAgent):
+        async def stream_meeting_summary(
+            self, record, source_events, source_progress, emit
+        ):
+            await emit({"data": {"field": "summary_text", "text": "流式"}})
+            await emit({"data": {"field": "summary_text", "text": "流式摘要"}})
+            return MeetingSummaryResult(
+                summary={
+                    "summary_text": "流式摘要",
+                    "tasks": [],
+                    "key_points": [],
+                    "decisions": [],
+                },
+                provider="openai",
+                model="summary-model",
+                source_event_ids=[
+                    event.event_id
+                    for event in source_events
+                    if event.kind != EventKind.SUMMARY
+                ],
+                source_revision=0,
+                source_progress=full_summary_progress(source_events),
+            )
+
+    broadcasts = []
+
+    async def collect(session_id, payload):
+        broadcasts.append(payload)
+
+    monkeypatch.setattr(main_service, "desktop_agent_service", StreamingSummaryAgent())
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+    client.post(
+        f"/api/sessions/{meeting_id}/native-transcript",
+        json={
+            "id": "9E2CB506-925E-4A6E-BB68-E5006AB09BDF",
+            "text": "冻结范围",
+            "speaker": "林晨",
+            "source": "microphone",
+            "timestamp": "2026-07-25T10:00:00+00:00",
+        },
+    )
+    monkeypatch.setattr(main_service.websocket_manager, "broadcast_to_session", collect)
+
+    response = client.post(
+        f"/api/sessions/{meeting_id}/generate-summary", json={"trigger": "manual"}
+    )
+
+    assert response.json()["status"] == "generated"
+    assert [message["type"] for message in broadcasts] == [
+        "summary_partial",
+        "summary_partial",
+        "summary_generated",
+        "meeting_event",
+    ]
+    assert broadcasts[1]["data"] == {
+        "field": "summary_text",
+        "text": "流式摘要",
+        "trigger": "manual",
+    }
+    record = client.get(f"/api/meetings/{meeting_id}").json()
+    summaries = [event for event in record["events"] if event["kind"] == "summary"]
+    assert [event["payload"]["summary_text"] for event in summaries] == ["流式摘要"]
+
+
+def test_summary_partials_are_coalesced_to_the_latest_text_per_interval(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    broadcasts = []
+
+    async def collect(session_id, payload):
+        broadcasts.append(payload["data"])
+
+    monkeypatch.setattr(main_service.websocket_manager, "broadcast_to_session", collect)
+
+    async def stream() -> None:
+        partials = main_service.SummaryPartialThrottle("meeting-a", None, interval=60)
+        text = ""
+        for character in "确认周五发布":
+            text += character
+            await partials({"data": {"field": "summary_text", "text": text}})
+        await partials({"data": {"field": "tasks", "index": 0, "item": "演练"}})
+        await partials({"data": {"field": "summary_text", "text": text + "。"}})
+        await partials.flush()
+
+    asyncio.run(stream())
+
+    assert [(data["field"], data.get("text")) for data in broadcasts] == [
+        ("summary_text", "确"),
+        ("summary_text", "确认周五发布"),
+        ("tasks", None),
+        ("summary_text", "确认周五发布。"),
+    ]
+
+
+def test_speculative_suggestions_are_served_without_a_second_model_call(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    calls = []
+
+    class CountingAgent(FakeMeetingAgent):
+        async def generate_questions(self, context):
+            calls.append([item.text for item in context])
+            return list(self.questions)
+
+    monkeypatch.setattr(main_service, "desktop_agent_service", CountingAgent())
+    monkeypatch.setattr(
+        main_service,
+        "suggestion_engine",
+        SpeculativeSuggestionEngine(
+            main_service.speculate_suggestions,
+            min_events=2,
+            debounce_seconds=0,
+            min_interval_seconds=0,
+        ),
+    )
+    client = TestClient(main_service.app)
+    meeting_id = client.post("/api/sessions").json()["session_id"]
+
+    async def exercise():
+        for index, text in enumerate(["周岚负责上线", "周五冻结范围"], start=1):
+            await main_service.on_transcript_received(
+                meeting_id,
+                {
+                    "id": f"line-{index}",
+                    "text": text,
+                    "speaker": "林晨",
+                    "source": "microphone",
+                    "timestamp": f"2026-07-25T10:00:0{index}+00:00",
+                },
+            )
+        await asyncio.sleep(0.05)
+        response = await main_service.generate_questions(
+            meeting_id,
+            main_service.QuestionGenerationRequest(
+                generation_id="generation-speculative", context_revision=2
+            ),
+        )
+        main_service.suggestion_engine.shutdown()
+        return response
+
+    response = asyncio.run(exercise())
+
+    assert response["accepted"] is True
+    assert response["speculative"] is True
+    assert calls == [["周岚负责上线", "周五冻结范围"]]
+    record = main_service.meeting_repository.get(meeting_id)
+    suggestion = [
+        event for event in record.events if event.kind == EventKind.SUGGESTIONS
+    ]
+    assert suggestion[-1].payload.generation_id == "generation-speculative"
+    assert suggestion[-1].payload.questions == [
+        "谁负责上线？",
+        "何时冻结范围？",
+        "回滚标准是什么？",
+    ]
+    main_service.session_manager.remove_session(meeting_id)
+
+
+def test_suggestion_evidence_skips_finished_meetings_without_parsing_records(
+    monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setenv("PROMPTMEET_DESKTOP_MODE", "1")
+    main_service = importlib.import_module("main_service")
+    configure(main_service, tmp_path / "meeting-data", monkeypatch)
+    monkeypatch.setattr(main_service, "DESKTOP_MODE", True)
+    monkeypatch.setattr(main_service, "SPECULATIVE_SUGGESTIONS", True)
+    monkeypatch.setattr(
+        main_service,
+        "suggestion_engine",
+        SpeculativeSuggestionEngine(main_service.speculate_suggestions),
+    )
+    ingestion = main_service.meeting_ingestion
+    ingestion.start("meeting-1", datetime(2026, 7, 25, 10, 0, tzinfo=UTC))
+    event = ingestion.recording_activity("meeting-1", "录音已恢复")
+    ingestion.finish("meeting-1", MeetingStatus.COMPLETED)
+    parsed = []
+    monkeypatch.setattr(
+        main_service.meeting_repository, "get", lambda *args: parsed.append(args)
+    )
+
+    for _ in range(3):
+        main_service.observe_suggestion_evidence("meeting-1", event)
+
+    assert parsed == []
+    assert not main_service.suggestion_engine.tracks("meeting-1")
@@ -1,4 +1,5 @@
 import json
+import os
 from datetime import UTC, datetime
 
 from models.meeting_context import (
@@ -169,3 +170,116 @@ def test_corrupt_versioned_record_is_preserved_and_visible_as_recovery_item(
     assert records[0].status == MeetingStatus.RECOVERY_REQUIRED
     assert records[0].events[0].kind == EventKind.LIFECYCLE
     assert "无法读取" in records[0].events[0].payload.detail
+
+
+def test_events_after_pages_through_the_index_and_rebuilds_stale_logs(
+    tmp_path,
+) -> None:
+    repository = MeetingRepository(tmp_path)
+    repository.create("meeting-a", START)
+    for text in ("一", "二", "三", "四"):
+        repository.append("meeting-a", transcript_event(text))
+
+    page, last_sequence = repository.events_after("meeting-a", after=1, limit=2)
+
+    assert [event.sequence for event in page] == [2, 3]
+    assert last_sequence == 4
+    assert repository.events_after("meeting-a", after=4) == ([], 4)
+
+    # 记录文件比行日志新（例如写索引前进程退出），重启后按记录重建索引。
+    log = tmp_path / "meetings" / "v2" / "events" / "meeting-a.jsonl"
+    log.write_text("", encoding="utf-8")
+    record_path = tmp_path / "meetings" / "v2" / "meeting-a.json"
+    stale = log.stat().st_mtime_ns - 1_000_000_000
+    os.utime(log, ns=(stale, stale))
+    assert record_path.stat().st_mtime_ns > log.stat().st_mtime_ns
+    restored = MeetingRepository(tmp_path)
+    events, _ = restored.events_after("meeting-a", after=3)
+
+    assert [event.payload.text for event in events] == ["四"]
+    assert restored.events_after("meeting-a", after=0, limit=10)[1] == 4
+
+
+def test_search_index_ranks_hits_across_meetings_and_survives_restart(
+    tmp_path,
+) -> None:
+    repository = MeetingRepository(tmp_path)
+    repository.create("meeting-a", START)
+    repository.create("meeting-b", START)
+    repository.append("meeting-a", transcript_event("今天先确认发布窗口"))
+    repository.append(
+        "meeting-a", transcript_event("回滚负责人是林晨，发布窗口定在周五")
+    )
+    repository.append("meeting-b", transcript_event("预算评审推迟到下周"))
+    repository.append(
+        "meeting-b",
+        MeetingEvent(
+            occurred_at=START,
+            kind=EventKind.SUMMARY,
+            provenance=EventProvenance(source="summary"),
+            payload=SummaryPayload(
+                summary_text="评审会议", decisions=["发布前补充 rollback 演练"]
+            ),
+        ),
+    )
+
+    hits = repository.search("发布窗口 回滚")
+
+    assert [(hit.meeting_id, hit.sequence) for hit in hits] == [
+        ("meeting-a", 2),
+        ("meeting-a", 1),
+        ("meeting-b", 2),
+    ]
+    assert hits[0].snippet.startswith("回滚负责人")
+    assert [hit.kind for hit in repository.search("ROLLBACK")] == ["summary"]
+    assert repository.search("完全无关") == []
+
+    # 翻译等原地改写会重建该会议的索引
+    repository.enrich_transcript_translation(
+        "meeting-b", "segment-预算评审推迟到下周", "budget review moved"
+    )
+    assert [hit.meeting_id for hit in repository.search("budget")] == ["meeting-b"]
+
+    # 其他进程改写的记录在重启后的第一次查询时按修改时间补建
+    record_path = tmp_path / "meetings" / "v2" / "meeting-b.json"
+    record = json.loads(record_path.read_text(encoding="utf-8"))
+    record["events"][0]["payload"]["text"] = "预算改到月底"
+    record_path.write_text(json.dumps(record), encoding="utf-8")
+    later = record_path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(record_path, ns=(later, later))
+    restored = MeetingRepository(tmp_path)
+
+    assert [hit.sequence for hit in restored.search("月底")] == [1]
+    assert restored.search("下周") == []
+    assert [hit.meeting_id for hit in restored.search("发布窗口")][:2] == [
+        "meeting-a",
+        "meeting-a",
+    ]
+
+
+def test_search_index_opens_lazily_and_sees_other_workers_statistics(
+    tmp_path,
+) -> None:
+    first = MeetingRepository(tmp_path)
+    second = MeetingRepository(tmp_path)
+    index_path = tmp_path / "meetings" / "v2" / "search.sqlite3"
+
+    assert not index_path.exists()
+
+    first.create("meeting-a", START)
+    first.append("meeting-a", transcript_event("发布窗口定在周五"))
+    assert [hit.sequence for hit in second.search("发布窗口")] == [1]
+    first.append("meeting-a", transcript_event("回滚负责人是林晨"))
+    first.append("meeting-a", transcript_event("发布前补充演练"))
+
+    # 另一个 worker 提交后缓存的文档统计要失效，否则 BM25 的 IDF 会算错
+    assert second.search_index._document_statistics() == (
+        3,
+        sum(
+            length
+            for (length,) in second.search_index._connection.execute(
+                "SELECT length FROM documents"
+            )
+        ),
+    )
+    assert [hit.sequence for hit in second.search("发布")] == [3, 1]
@@ -0,0 +1,326 @@
+import asyncio
+import multiprocessing
+import sqlite3
+import time
+from datetime import UTC, datetime
+
+import pytest
+
+from models.data_models import MeetingSummary, SessionState, TranscriptSegment
+from models.meeting_context import (
+    EventKind,
+    EventProvenance,
+    MeetingEvent,
+    TranscriptPayload,
+)
+from models.native_bridge import NativeAudioChunk
+from services.event_bus import SQLiteEventBus
+from services.meeting_repository import MeetingRepository
+from services.native_audio_ingress import (
+    NativeAudioIngress,
+    NativeAudioSequenceError,
+)
+from services.session_manager import SessionManager, SQLiteSessionBackend
+from services.websocket_manager import WebSocketManager
+from tests.test_websocket_manager import FakeWebSocket
+
+START = datetime(2026, 7, 25, 10, 0, tzinfo=UTC)
+
+
+def test_sqlite_session_backend_is_shared_between_managers(tmp_path) -> None:
+    path = tmp_path / "shared.sqlite3"
+    first = SessionManager(SQLiteSessionBackend(path))
+    second = SessionManager(SQLiteSessionBackend(path))
+
+    assert first.add_session(SessionState(session_id="session-1", start_time=START))
+    assert not second.add_session(
+        SessionState(session_id="session-1", start_time=START)
+    )
+    session = second.get_session("session-1")
+    session.is_recording = True
+    second.update_session(session)
+    first.add_transcript_segment(
+        "session-1",
+        TranscriptSegment(id="segment-1", text="冻结范围", timestamp=START),
+    )
+
+    shared = second.get_session("session-1")
+    assert shared.is_recording
+    assert [segment.text for segment in shared.transcript_segments] == ["冻结范围"]
+    assert second.get_session_stats()["active_sessions"] == 1
+    assert first.remove_session("session-1")
+    assert second.get_session("session-1") is None
+
+
+def test_mutate_rereads_the_session_inside_the_write_transaction(tmp_path) -> None:
+    path = tmp_path / "shared.sqlite3"
+    first = SessionManager(SQLiteSessionBackend(path))
+    second = SessionManager(SQLiteSessionBackend(path))
+    first.add_session(SessionState(session_id="session-1", start_time=START))
+    # 第一个 worker 持有的副本已经过期，第二个 worker 在此期间写入了转录
+    stale = first.get_session("session-1")
+    second.add_transcript_segment(
+        "session-1",
+        TranscriptSegment(id="segment-1", text="冻结范围", timestamp=START),
+    )
+
+    def begin(session: SessionState) -> bool:
+        if session.is_recording:
+            return False
+        session.is_recording = True
+        return True
+
+    assert not stale.transcript_segments
+    assert first.mutate("session-1", begin) is not None
+    assert second.mutate("session-1", begin) is None
+    assert first.mutate("missing", begin) is None
+
+    shared = second.get_session("session-1")
+    assert shared.is_recording
+    assert [segment.text for segment in shared.transcript_segments] == ["冻结范围"]
+
+
+def test_transcript_segments_are_appended_as_rows(tmp_path) -> None:
+    path = tmp_path / "shared.sqlite3"
+    first = SessionManager(SQLiteSessionBackend(path))
+    second = SessionManager(SQLiteSessionBackend(path))
+    first.add_session(SessionState(session_id="session-1", start_time=START))
+    for index in range(3):
+        (first, second)[index % 2].add_transcript_segment(
+            "session-1",
+            TranscriptSegment(
+                id=f"segment-{index}", text=f"第{index}段", timestamp=START
+            ),
+        )
+    first.update_summary(
+        "session-1",
+        MeetingSummary(session_id="session-1", summary_text="摘要", generated_at=START),
+    )
+
+    database = sqlite3.connect(path)
+    (state,) = database.execute("SELECT state FROM sessions").fetchone()
+    rows = database.execute(
+        "SELECT position FROM transcript_segments ORDER BY position"
+    ).fetchall()
+    database.close()
+    # 会话行只保存状态字段，追加转录不重写整个会话
+    assert "transcript_segments" not in state
+    assert rows == [(0,), (1,), (2,)]
+    assert [segment.id for segment in second.get_session_transcript("session-1")] == [
+        "segment-0",
+        "segment-1",
+        "segment-2",
+    ]
+    assert second.get_session("session-1").current_summary.summary_text == "摘要"
+    assert second.get_session_state("session-1").transcript_segments == []
+
+    assert second.replace_transcript(
+        "session-1",
+        [TranscriptSegment(id="segment-9", text="恢复", timestamp=START)],
+    )
+    assert [segment.id for segment in first.get_session_transcript("session-1")] == [
+        "segment-9"
+    ]
+    assert first.remove_session("session-1")
+    assert first.get_session_transcript("session-1") == []
+
+
+def test_leases_exclude_other_workers_until_released_or_expired(tmp_path) -> None:
+    path = tmp_path / "shared.sqlite3"
+    first = SessionManager(SQLiteSessionBackend(path))
+    second = SessionManager(SQLiteSessionBackend(path))
+
+    assert first.acquire_lease("summary:session-1", "worker-1", 60)
+    assert not second.acquire_lease("summary:session-1", "worker-2", 60)
+    assert second.acquire_lease("summary:session-2", "worker-2", 60)
+    # 只有持有者能释放
+    second.release_lease("summary:session-1", "worker-2")
+    assert not second.acquire_lease("summary:session-1", "worker-2", 60)
+    first.release_lease("summary:session-1", "worker-1")
+    assert second.acquire_lease("summary:session-1", "worker-2", -1)
+    # 持有者崩溃后租约过期，其他 worker 可以接手
+    assert first.acquire_lease("summary:session-1", "worker-1", 60)
+
+
+def test_broadcasts_fan_out_to_clients_connected_to_another_worker(tmp_path) -> None:
+    async def scenario() -> tuple[FakeWebSocket, FakeWebSocket]:
+        path = tmp_path / "shared.sqlite3"
+        publisher = WebSocketManager(
+            delta_interval_ms=0, bus=SQLiteEventBus(path, poll_interval=0.01)
+        )
+        subscriber = WebSocketManager(
+            delta_interval_ms=0, bus=SQLiteEventBus(path, poll_interval=0.01)
+        )
+        handled = []
+
+        async def handle(session_id: str, message: dict) -> None:
+            handled.append((session_id, message["type"]))
+
+        subscriber.on_remote_message(handle)
+        local, remote = FakeWebSocket(), FakeWebSocket()
+        await publisher.connect(local, "session-1")
+        await subscriber.connect(remote, "session-1")
+        tasks = [
+            asyncio.create_task(publisher.run_bus()),
+            asyncio.create_task(subscriber.run_bus()),
+        ]
+
+        await publisher.broadcast_to_session(
+            "session-1", {"type": "meeting_event", "data": {"sequence": 1}}
+        )
+        await subscriber.broadcast_to_session(
+            "session-2", {"type": "meeting_event", "data": {"sequence": 1}}
+        )
+        await asyncio.sleep(0.1)
+        for task in tasks:
+            task.cancel()
+        publisher.bus.close()
+        subscriber.bus.close()
+        assert subscriber.metrics()["bus"] == {"published": 1, "received": 1}
+        assert handled == [("session-1", "meeting_event")]
+        return local, remote
+
+    local, remote = asyncio.run(scenario())
+
+    # 发布方自己的客户端只收到一次，另一个 worker 的客户端经由共享表收到
+    assert (
+        local.sent
+        == remote.sent
+        == [{"type": "meeting_event", "data": {"sequence": 1}}]
+    )
+
+
+def test_publish_does_not_wait_for_the_shared_database(tmp_path) -> None:
+    path = tmp_path / "shared.sqlite3"
+    bus = SQLiteEventBus(path)
+    other = sqlite3.connect(path, isolation_level=None)
+    # 另一个 worker 正持有写锁时，发布只入队，不在调用方线程上等锁
+    other.execute("BEGIN IMMEDIATE")
+    started = time.monotonic()
+    bus.publish("session-1", {"type": "meeting_event"})
+    assert time.monotonic() - started < 0.1
+    assert bus.stats["published"] == 0
+
+    other.execute("COMMIT")
+    bus.close()
+    rows = other.execute("SELECT session_id, message FROM broadcasts").fetchall()
+    other.close()
+
+    assert bus.stats["published"] == 1
+    assert rows == [("session-1", '{"type": "meeting_event"}')]
+
+
+def audio_chunk(sequence: int) -> NativeAudioChunk:
+    return NativeAudioChunk(
+        sequence=sequence, sample_rate=16_000, channels=1, source="microphone"
+    )
+
+
+def test_spool_appends_from_two_workers_do_not_overwrite_each_other(
+    tmp_path,
+) -> None:
+    first = NativeAudioIngress(tmp_path, spool=True, shared=True)
+    second = NativeAudioIngress(tmp_path, spool=True, shared=True)
+
+    first.accept("session-1", audio_chunk(0), b"\x01\x01")
+    second.accept("session-1", audio_chunk(1), b"\x02\x02\x02\x02")
+    first.accept("session-1", audio_chunk(2), b"\x03\x03")
+    # 另一个 worker 已经收到的序号按重复处理
+    with pytest.raises(NativeAudioSequenceError):
+        first.accept("session-1", audio_chunk(1), b"\x04\x04")
+    with pytest.raises(NativeAudioSequenceError):
+        second.accept("session-1", audio_chunk(2), b"\x04\x04")
+    first.close()
+    second.close()
+
+    entries = NativeAudioIngress(tmp_path).spool_entries("session-1", "microphone")
+    data = (tmp_path / "session-1" / "microphone.pcm").read_bytes()
+    assert [(entry.sequence, entry.offset, entry.length) for entry in entries] == [
+        (0, 0, 2),
+        (1, 2, 4),
+        (2, 6, 2),
+    ]
+    assert data == b"\x01\x01\x02\x02\x02\x02\x03\x03"
+
+
+def append_audio(root: str, worker: int, count: int) -> None:
+    ingress = NativeAudioIngress(root, spool=True, shared=True)
+    for index in range(count):
+        ingress.accept(
+            "session-1", audio_chunk(worker * 100 + index), bytes([worker + 1]) * 64
+        )
+    ingress.close()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="需要 fork"
+)
+def test_spool_appends_from_several_processes_keep_every_chunk(tmp_path) -> None:
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=append_audio, args=(str(tmp_path), worker, 20))
+        for worker in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+
+    entries = NativeAudioIngress(tmp_path).spool_entries("session-1", "microphone")
+    data = (tmp_path / "session-1" / "microphone.pcm").read_bytes()
+
+    assert [worker.exitcode for worker in workers] == [0, 0, 0]
+    assert sorted(entry.sequence for entry in entries) == sorted(
+        worker * 100 + index for worker in range(3) for index in range(20)
+    )
+    assert [entry.offset for entry in entries] == list(range(0, 60 * 64, 64))
+    assert len(data) == 60 * 64
+    for entry in entries:
+        chunk = data[entry.offset : entry.offset + entry.length]
+        assert chunk == bytes([entry.sequence // 100 + 1]) * 64
+
+
+def append_transcripts(root: str, worker: int, count: int) -> None:
+    repository = MeetingRepository(root)
+    for index in range(count):
+        repository.append(
+            "meeting-a",
+            MeetingEvent(
+                occurred_at=START,
+                kind=EventKind.TRANSCRIPT,
+                provenance=EventProvenance(source="native_transcript"),
+                payload=TranscriptPayload(
+                    segment_id=f"{worker}-{index}", text=f"{worker}-{index}"
+                ),
+            ),
+        )
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="需要 fork"
+)
+def test_repository_appends_from_several_processes_keep_every_event(
+    tmp_path,
+) -> None:
+    repository = MeetingRepository(tmp_path)
+    repository.create("meeting-a", START)
+    # 先读一次，让本进程缓存行日志偏移量，验证其他进程追加后缓存会失效
+    assert repository.events_after("meeting-a") == ([], 0)
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=append_transcripts, args=(str(tmp_path), worker, 15))
+        for worker in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+
+    record = repository.get("meeting-a")
+    events, last_sequence = repository.events_after("meeting-a", limit=100)
+
+    assert [worker.exitcode for worker in workers] == [0, 0, 0]
+    assert [event.sequence for event in record.events] == list(range(1, 46))
+    assert len({event.payload.segment_id for event in record.events}) == 45
+    assert [event.sequence for event in events] == list(range(1, 46))
+    assert last_sequence == 45
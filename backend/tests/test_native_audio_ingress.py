@@ -2,6 +2,7 @@ from datetime import UTC, datetime
 import json
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from models.native_bridge import NativeAudioChunk
@@ -9,6 +10,7 @@ from services.native_audio_ingress import (
     NativeAudioIngress,
     NativeAudioSequenceError,
     NativeAudioValidationError,
+    speech_segments,
 )
 
 
@@ -75,3 +77,170 @@ def test_accept_rejects_empty_payload_and_unsafe_session_id(tmp_path: Path) -> N
 
     with pytest.raises(NativeAudioValidationError):
         ingress.accept("../escape", chunk, b"\x00")
+
+
+def test_spool_appends_chunks_per_source_with_a_binary_index(tmp_path: Path) -> None:
+    ingress = NativeAudioIngress(tmp_path, spool=True, preallocate_bytes=1024)
+    captured_at = datetime(2026, 7, 26, 10, 0, tzinfo=UTC)
+
+    receipts = [
+        ingress.accept(
+            "session-1",
+            NativeAudioChunk(
+                sequence=sequence,
+                sample_rate=16_000,
+                channels=1,
+                source=source,
+                captured_at=captured_at,
+                meeting_time_ms=sequence * 500,
+            ),
+            payload,
+        )
+        for sequence, source, payload in [
+            (0, "microphone", b"\x01\x02"),
+            (1, "system", b"\x03\x04\x05"),
+            (2, "microphone", b"\x06"),
+        ]
+    ]
+    entries = ingress.spool_entries("session-1", "microphone")
+    preallocated = receipts[2].path.stat().st_size
+    ingress.close()
+
+    assert receipts[2].path == tmp_path / "session-1" / "microphone.pcm"
+    assert receipts[2].metadata_path == tmp_path / "session-1" / "microphone.idx"
+    assert (receipts[2].offset, receipts[2].length) == (2, 1)
+    assert [(entry.sequence, entry.offset, entry.length) for entry in entries] == [
+        (0, 0, 2),
+        (2, 2, 1),
+    ]
+    assert entries[1].captured_at == captured_at
+    assert entries[1].meeting_time_ms == 1_000
+    # 写入期间按块预分配，关闭时截掉尾部零填充
+    assert preallocated >= 1024
+    assert receipts[2].path.read_bytes() == b"\x01\x02\x06"
+    assert sorted(path.name for path in (tmp_path / "session-1").iterdir()) == [
+        "microphone.idx",
+        "microphone.pcm",
+        "system.idx",
+        "system.pcm",
+    ]
+
+
+def test_spool_keeps_duplicate_rejection_and_resumes_after_reopen(
+    tmp_path: Path,
+) -> None:
+    chunk = NativeAudioChunk(sequence=0, sample_rate=16_000, channels=1)
+    ingress = NativeAudioIngress(tmp_path, spool=True)
+    ingress.accept("session-1", chunk, b"\x01\x02")
+
+    with pytest.raises(NativeAudioSequenceError):
+        ingress.accept("session-1", chunk, b"\x01\x02")
+    ingress.close()
+
+    reopened = NativeAudioIngress(tmp_path, spool=True)
+    receipt = reopened.accept(
+        "session-1", chunk.model_copy(update={"sequence": 1}), b"\x03"
+    )
+    reopened.close()
+
+    assert receipt.offset == 2
+    assert receipt.path.read_bytes()[:3] == b"\x01\x02\x03"
+
+
+def test_accept_leaves_fsync_to_the_periodic_flush(tmp_path: Path, monkeypatch) -> None:
+    synced: list[int] = []
+    monkeypatch.setattr(
+        "services.native_audio_ingress.os.fsync", lambda fd: synced.append(fd)
+    )
+    ingress = NativeAudioIngress(tmp_path, spool=True, fsync_interval_seconds=0)
+    for sequence in range(3):
+        ingress.accept(
+            "session-1",
+            NativeAudioChunk(sequence=sequence, sample_rate=16_000, channels=1),
+            b"\x01\x02",
+        )
+
+    assert synced == []
+    ingress.flush()
+    assert len(synced) == 2
+    ingress.flush()
+    assert len(synced) == 2
+    ingress.close()
+
+
+def test_sequence_tracking_stays_bounded_for_long_meetings(tmp_path: Path) -> None:
+    ingress = NativeAudioIngress(tmp_path, spool=True, sequence_window=64)
+    chunk = NativeAudioChunk(sequence=0, sample_rate=16_000, channels=1)
+
+    for sequence in [*range(0, 5_000), 5_003, 5_001]:
+        ingress.accept(
+            "session-1", chunk.model_copy(update={"sequence": sequence}), b"\x00"
+        )
+    ingress.close()
+    window = ingress._sequences["session-1"]
+
+    assert window.floor == 5_000
+    assert window.bits.bit_length() <= 64
+    with pytest.raises(NativeAudioSequenceError) as duplicate:
+        ingress.accept(
+            "session-1", chunk.model_copy(update={"sequence": 5_001}), b"\x00"
+        )
+    assert duplicate.value.expected == 5_004
+    ingress.accept("session-1", chunk.model_copy(update={"sequence": 5_000}), b"\x00")
+    ingress.close()
+
+
+@pytest.mark.parametrize("spool", [True, False])
+def test_duplicate_detection_survives_restart_and_idle_eviction(
+    tmp_path: Path, spool: bool
+) -> None:
+    now = [0.0]
+    chunk = NativeAudioChunk(sequence=3, sample_rate=16_000, channels=1)
+    ingress = NativeAudioIngress(
+        tmp_path, spool=spool, idle_seconds=60, clock=lambda: now[0]
+    )
+    ingress.accept("session-1", chunk, b"\x00")
+    ingress.close()
+
+    restarted = NativeAudioIngress(tmp_path, spool=spool)
+    with pytest.raises(NativeAudioSequenceError):
+        restarted.accept("session-1", chunk, b"\x00")
+    restarted.close()
+
+    now[0] = 120
+    ingress.accept("session-2", chunk, b"\x00")
+    assert ingress.tracked_sessions() == ["session-2"]
+    assert ("session-1", "mixed") not in ingress._writers
+    with pytest.raises(NativeAudioSequenceError):
+        ingress.accept("session-1", chunk, b"\x00")
+    ingress.close()
+
+
+def test_vad_drop_mode_keeps_silent_sequences_in_the_index_only(
+    tmp_path: Path,
+) -> None:
+    ingress = NativeAudioIngress(tmp_path, spool=True, vad_mode="drop")
+    time = np.arange(8_000) / 16_000
+    speech = (np.sin(2 * np.pi * 220 * time) * 8_000).astype("<i2").tobytes()
+    # 真实麦克风的“静音”是低电平底噪而不是数字零
+    silence = np.random.default_rng(0).normal(0, 20, 8_000).astype("<i2").tobytes()
+    receipts = [
+        ingress.accept(
+            "session-1",
+            NativeAudioChunk(
+                sequence=sequence,
+                sample_rate=16_000,
+                channels=1,
+                meeting_time_ms=sequence * 500,
+            ),
+            payload,
+        )
+        for sequence, payload in enumerate([silence, speech, silence, silence])
+    ]
+    entries = ingress.spool_entries("session-1", "mixed")
+    ingress.close()
+
+    assert [receipt.speech for receipt in receipts] == [False, True, True, False]
+    assert [entry.length for entry in entries] == [0, 16_000, 16_000, 0]
+    assert speech_segments(entries) == [(500, 1_500)]
+    assert (tmp_path / "session-1/mixed.pcm").read_bytes()[:16_000] == speech
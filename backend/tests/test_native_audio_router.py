@@ -1,16 +1,24 @@
+import time
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 
 from api.native_audio import build_native_audio_router
-from services.native_audio_ingress import NativeAudioIngress
+from services.native_audio_ingress import NativeAudioFrameDecoder, NativeAudioIngress
 
 
-def create_client(tmp_path: Path, session_exists=lambda _: True) -> TestClient:
+def create_client(
+    tmp_path: Path, session_exists=lambda _: True, ingress=None
+) -> TestClient:
     app = FastAPI()
     app.include_router(
-        build_native_audio_router(session_exists, NativeAudioIngress(tmp_path))
+        build_native_audio_router(
+            session_exists, ingress or NativeAudioIngress(tmp_path)
+        )
     )
     return TestClient(app)
 
@@ -89,3 +97,125 @@ def test_native_audio_endpoint_rejects_late_chunks_while_paused(tmp_path: Path)
     assert response.status_code == 409
     assert response.json()["detail"] == "录音已暂停"
     assert not list(tmp_path.rglob("*.pcm"))
+
+
+def test_native_audio_stream_spools_length_prefixed_frames_and_acks(
+    tmp_path: Path,
+) -> None:
+    ingress = NativeAudioIngress(tmp_path, spool=True)
+    client = create_client(tmp_path, ingress=ingress)
+    captured_at = datetime(2026, 7, 26, 10, 0, tzinfo=UTC)
+    first = NativeAudioFrameDecoder.encode(
+        0, b"\x01\x02", captured_at=captured_at, meeting_time_ms=0
+    )
+    second = NativeAudioFrameDecoder.encode(1, b"\x03\x04", meeting_time_ms=500)
+    third = NativeAudioFrameDecoder.encode(2, b"\x05", meeting_time_ms=1000)
+
+    with client.websocket_connect(
+        "/api/sessions/session-1/native-audio/stream"
+        "?sample_rate=16000&channels=1&source=microphone"
+    ) as websocket:
+        websocket.send_bytes(first + second + third[:7])
+        batch = websocket.receive_json()
+        websocket.send_bytes(third[7:])
+        split = websocket.receive_json()
+        websocket.send_bytes(second)
+        duplicate = websocket.receive_json()
+
+    entries = ingress.spool_entries("session-1", "microphone")
+    ingress.close()
+    assert batch == {"type": "ack", "sequence": 1, "accepted": 2, "rejected": []}
+    assert split["accepted"] == 1
+    assert duplicate["accepted"] == 0
+    assert duplicate["rejected"][0]["status"] == 409
+    assert [(entry.sequence, entry.meeting_time_ms) for entry in entries] == [
+        (0, 0),
+        (1, 500),
+        (2, 1000),
+    ]
+    assert entries[0].captured_at == captured_at
+    assert (tmp_path / "session-1/microphone.pcm").read_bytes()[:5] == (
+        b"\x01\x02\x03\x04\x05"
+    )
+
+
+def test_native_audio_stream_rejects_unknown_sessions_and_oversized_frames(
+    tmp_path: Path,
+) -> None:
+    missing = create_client(tmp_path, session_exists=lambda _: False)
+    with missing.websocket_connect(
+        "/api/sessions/missing/native-audio/stream?sample_rate=16000&channels=1"
+    ) as websocket:
+        with pytest.raises(WebSocketDisconnect) as rejected:
+            websocket.receive_json()
+    assert rejected.value.code == 4404
+
+    with create_client(tmp_path).websocket_connect(
+        "/api/sessions/session-1/native-audio/stream?sample_rate=0&channels=1"
+    ) as websocket:
+        with pytest.raises(WebSocketDisconnect) as invalid:
+            websocket.receive_json()
+    assert invalid.value.code == 1008
+
+    client = create_client(
+        tmp_path, ingress=NativeAudioIngress(tmp_path, max_payload_bytes=4)
+    )
+    with client.websocket_connect(
+        "/api/sessions/session-1/native-audio/stream?sample_rate=16000&channels=1"
+    ) as websocket:
+        websocket.send_bytes(NativeAudioFrameDecoder.encode(0, b"\x00" * 8))
+        with pytest.raises(WebSocketDisconnect) as oversized:
+            websocket.receive_json()
+    assert oversized.value.code == 1009
+
+
+def test_native_audio_stream_stamps_server_time_per_frame_and_rejects_text(
+    tmp_path: Path,
+) -> None:
+    ingress = NativeAudioIngress(tmp_path, spool=True)
+    client = create_client(tmp_path, ingress=ingress)
+    connected_at = datetime.now(UTC)
+
+    with client.websocket_connect(
+        "/api/sessions/session-1/native-audio/stream?sample_rate=16000&channels=1"
+    ) as websocket:
+        websocket.send_bytes(NativeAudioFrameDecoder.encode(0, b"\x01\x02"))
+        websocket.receive_json()
+        time.sleep(0.02)
+        websocket.send_bytes(NativeAudioFrameDecoder.encode(1, b"\x03\x04"))
+        websocket.receive_json()
+        websocket.send_text("hello")
+        with pytest.raises(WebSocketDisconnect) as text_frame:
+            websocket.receive_json()
+
+    entries = ingress.spool_entries("session-1", "mixed")
+    ingress.close()
+    assert text_frame.value.code == 1003
+    assert connected_at <= entries[0].captured_at
+    assert entries[1].captured_at - entries[0].captured_at >= timedelta(milliseconds=20)
+
+
+def test_session_audio_export_streams_a_wav_file(tmp_path: Path) -> None:
+    ingress = NativeAudioIngress(tmp_path, spool=True, preallocate_bytes=4096)
+    client = create_client(tmp_path, ingress=ingress)
+    for sequence, source in enumerate(("microphone", "system")):
+        client.post(
+            "/api/sessions/session-1/native-audio",
+            headers={
+                "X-PromptMeet-Sequence": str(sequence),
+                "X-PromptMeet-Sample-Rate": "16000",
+                "X-PromptMeet-Channels": "1",
+                "X-PromptMeet-Source": source,
+                "Content-Type": "application/octet-stream",
+            },
+            content=b"\x10\x00" * 160,
+        )
+
+    response = client.get("/api/sessions/session-1/audio?layout=split")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    assert int(response.headers["content-length"]) == 44 + 160 * 4
+    assert response.content[:4] == b"RIFF"
+    assert client.get("/api/sessions/empty/audio").status_code == 404
+    assert client.get("/api/sessions/session-1/audio?layout=x").status_code == 422
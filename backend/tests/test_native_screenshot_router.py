@@ -1,10 +1,18 @@
+import asyncio
 import base64
+import hashlib
 from pathlib import Path
 
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from api.native_screenshot import build_native_screenshot_router
+from api.native_screenshot import build_native_screenshot_router, stream_to_sink
+from services.screenshot_upload import (
+    MultipartReader,
+    ScreenshotUploadError,
+    StoredScreenshot,
+)
 
 
 def test_native_screenshot_is_saved_and_dispatched(tmp_path: Path) -> None:
@@ -15,6 +23,7 @@ def test_native_screenshot_is_saved_and_dispatched(tmp_path: Path) -> None:
         path: Path,
         __: str | None,
         ___: str | None,
+        ____: object,
     ) -> dict:
         dispatched.append(path)
         return {"event": {"kind": "screenshot"}}
@@ -45,6 +54,7 @@ def test_native_screenshot_json_preserves_pixels_and_local_ocr_provenance(
         path: Path,
         local_ocr_text: str | None,
         ocr_engine: str | None,
+        _: object,
     ) -> dict:
         dispatched.append((session_id, path, local_ocr_text, ocr_engine))
         return {"event": {"kind": "screenshot", "asset_id": path.stem}}
@@ -82,6 +92,7 @@ def test_native_screenshot_rejects_unknown_session_and_non_image(
         __: Path,
         ___: str | None,
         ____: str | None,
+        _____: object,
     ) -> None:
         raise AssertionError("must not process")
 
@@ -114,3 +125,134 @@ def test_native_screenshot_rejects_unknown_session_and_non_image(
         .status_code
         == 422
     )
+
+
+def test_native_screenshot_multipart_streams_pixels_with_digest_and_ocr_part(
+    tmp_path: Path,
+) -> None:
+    dispatched = []
+
+    async def process(
+        session_id: str,
+        path: Path,
+        local_ocr_text: str | None,
+        ocr_engine: str | None,
+        upload: StoredScreenshot | None,
+    ) -> dict:
+        dispatched.append((path, local_ocr_text, ocr_engine, upload))
+        return {}
+
+    app = FastAPI()
+    app.include_router(
+        build_native_screenshot_router(lambda _: object(), tmp_path, process)
+    )
+    pixels = (
+        b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+        + (1280).to_bytes(4, "big")
+        + (720).to_bytes(4, "big")
+        + b"\r\n--not-the-boundary" * 5000
+    )
+
+    response = TestClient(app).post(
+        "/api/sessions/session-1/native-screenshot",
+        files={"image": ("slide.png", pixels, "image/png")},
+        data={
+            "local_ocr_text": "截图证据：周岚负责部署。",
+            "ocr_engine": "apple_vision",
+        },
+    )
+
+    assert response.status_code == 200
+    path, ocr_text, ocr_engine, upload = dispatched[0]
+    assert path.read_bytes() == pixels
+    assert (ocr_text, ocr_engine) == ("截图证据：周岚负责部署。", "apple_vision")
+    assert upload.sha256 == hashlib.sha256(pixels).hexdigest()
+    assert (upload.width, upload.height, upload.size) == (1280, 720, len(pixels))
+
+    rejected = TestClient(app).post(
+        "/api/sessions/session-1/native-screenshot",
+        files={"image": ("slide.png", b"GIF89a", "image/png")},
+    )
+    assert rejected.status_code == 422
+    assert list((tmp_path / "session-1").iterdir()) == [path]
+
+
+def test_multipart_reader_handles_boundaries_split_across_chunks() -> None:
+    body = (
+        b"--b0undary\r\n"
+        b'Content-Disposition: form-data; name="image"\r\n'
+        b"Content-Type: image/png\r\n\r\n"
+        b"\x89PNG\r\n--b0und\r\n"
+        b"\r\n--b0undary\r\n"
+        b'Content-Disposition: form-data; name="ocr_engine"\r\n\r\n'
+        b"apple_vision"
+        b"\r\n--b0undary--\r\n"
+    )
+
+    async def read_parts() -> list[tuple[str | None, bytes]]:
+        async def chunks():
+            for index in range(0, len(body), 3):
+                yield body[index : index + 3]
+
+        reader = MultipartReader(chunks(), "b0undary")
+        parts = []
+        while (headers := await reader.next_part()) is not None:
+            data = b"".join([chunk async for chunk in reader.read()])
+            parts.append((reader.part_name(headers), data))
+        return parts
+
+    assert asyncio.run(read_parts()) == [
+        ("image", b"\x89PNG\r\n--b0und\r\n"),
+        ("ocr_engine", b"apple_vision"),
+    ]
+
+
+def test_multipart_with_invalid_utf8_is_rejected_as_validation_error(
+    tmp_path: Path,
+) -> None:
+    async def process(*_) -> dict:
+        return {}
+
+    app = FastAPI()
+    app.include_router(
+        build_native_screenshot_router(lambda _: object(), tmp_path, process)
+    )
+    client = TestClient(app)
+    bad_header = (
+        b"--b0undary\r\n"
+        b'Content-Disposition: form-data; name="\xff"\r\n\r\n'
+        b"x\r\n--b0undary--\r\n"
+    )
+    bad_field = (
+        b"--b0undary\r\n"
+        b'Content-Disposition: form-data; name="local_ocr_text"\r\n\r\n'
+        b"\xff\xfe\r\n--b0undary--\r\n"
+    )
+
+    for body in (bad_header, bad_field):
+        response = client.post(
+            "/api/sessions/session-1/native-screenshot",
+            content=body,
+            headers={"Content-Type": "multipart/form-data; boundary=b0undary"},
+        )
+        assert response.status_code == 422
+
+
+def test_streamed_upload_is_rejected_on_its_first_bytes(tmp_path: Path) -> None:
+    pulled: list[int] = []
+
+    async def chunks():
+        yield b"GIF8"
+        for index in range(100):
+            pulled.append(index)
+            yield b"\x00" * 65_536
+
+    async def upload() -> None:
+        await stream_to_sink(chunks(), "image/png", tmp_path)
+
+    with pytest.raises(ScreenshotUploadError):
+        asyncio.run(upload())
+
+    # 签名不符时立即停止读取请求体，也不留下半截文件
+    assert pulled == []
+    assert list(tmp_path.iterdir()) == []
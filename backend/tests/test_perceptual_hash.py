@@ -0,0 +1,145 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from models.meeting_context import (
+    EventKind,
+    EventProvenance,
+    MeetingEvent,
+    MeetingRecord,
+    ScreenshotAnalysisPayload,
+    ScreenshotPayload,
+)
+from services.perceptual_hash import (
+    difference_hash,
+    hamming_distance,
+    previous_near_duplicate_analysis,
+)
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def save_slide(path: Path, *, cursor: bool = False, chart: bool = False) -> Path:
+    gradient = np.tile(np.linspace(30, 220, 640, dtype=np.uint8), (360, 1))
+    if chart:
+        gradient = gradient.T[:360, :640].copy()
+        gradient[60:300:40, :] = 0
+    if cursor:
+        gradient[200:220, 300:302] = 0
+    Image.fromarray(gradient).save(path)
+    return path
+
+
+def test_difference_hash_tolerates_small_changes_but_not_new_slides(
+    tmp_path: Path,
+) -> None:
+    slide = difference_hash(save_slide(tmp_path / "slide.png"))
+    blinking = difference_hash(save_slide(tmp_path / "cursor.png", cursor=True))
+    chart = difference_hash(save_slide(tmp_path / "chart.png", chart=True))
+
+    assert hamming_distance(slide, blinking) <= 2
+    assert hamming_distance(slide, chart) > 20
+    (tmp_path / "broken.png").write_bytes(b"\x89PNG\r\n\x1a\nbroken")
+    assert difference_hash(tmp_path / "broken.png") is None
+
+
+def test_previous_near_duplicate_analysis_links_only_the_adjacent_screenshot() -> None:
+    def make(sequence: int, kind: EventKind, payload) -> MeetingEvent:
+        return MeetingEvent(
+            event_id=f"event-{sequence}",
+            meeting_id="meeting-a",
+            sequence=sequence,
+            occurred_at=datetime(2026, 8, 1, tzinfo=UTC),
+            kind=kind,
+            provenance=EventProvenance(source="test", provider="fake"),
+            payload=payload,
+        )
+
+    def screenshot(sequence: int, perceptual_hash: str) -> MeetingEvent:
+        return make(
+            sequence,
+            EventKind.SCREENSHOT,
+            ScreenshotPayload(
+                asset_id=f"asset-{sequence}",
+                relative_path=f"assets/asset-{sequence}.png",
+                mime_type="image/png",
+                sha256=str(sequence),
+                perceptual_hash=perceptual_hash,
+            ),
+        )
+
+    first = screenshot(1, "00000000000000ff")
+    analysis = make(
+        2,
+        EventKind.SCREENSHOT_ANALYSIS,
+        ScreenshotAnalysisPayload(asset_id="asset-1", status="completed", text="议程"),
+    )
+    near = screenshot(3, "00000000000000fe")
+    different = screenshot(4, "ffffffffffffff00")
+    record = MeetingRecord(
+        meeting_id="meeting-a",
+        started_at=datetime(2026, 8, 1, tzinfo=UTC),
+        events=[first, analysis, near, different],
+    )
+
+    reused = previous_near_duplicate_analysis(record, near, 6)
+    assert reused.event_id == "event-2"
+    assert reused.payload.text == "议程"
+    assert previous_near_duplicate_analysis(record, near, -1) is None
+    assert previous_near_duplicate_analysis(record, different, 6) is None
+
+
+def test_near_duplicate_chain_is_compared_against_the_analyzed_screenshot() -> None:
+    def make(sequence: int, kind: EventKind, payload) -> MeetingEvent:
+        return MeetingEvent(
+            event_id=f"event-{sequence}",
+            meeting_id="meeting-a",
+            sequence=sequence,
+            occurred_at=datetime(2026, 8, 1, tzinfo=UTC),
+            kind=kind,
+            provenance=EventProvenance(source="test", provider="fake"),
+            payload=payload,
+        )
+
+    def screenshot(sequence: int, perceptual_hash: str) -> MeetingEvent:
+        return make(
+            sequence,
+            EventKind.SCREENSHOT,
+            ScreenshotPayload(
+                asset_id=f"asset-{sequence}",
+                relative_path=f"assets/asset-{sequence}.png",
+                mime_type="image/png",
+                sha256=str(sequence),
+                perceptual_hash=perceptual_hash,
+            ),
+        )
+
+    analyzed = screenshot(1, "0000000000000000")
+    analysis = make(
+        2,
+        EventKind.SCREENSHOT_ANALYSIS,
+        ScreenshotAnalysisPayload(asset_id="asset-1", status="completed", text="议程"),
+    )
+    near = screenshot(3, "0000000000000007")
+    reused = make(
+        4,
+        EventKind.SCREENSHOT_ANALYSIS,
+        ScreenshotAnalysisPayload(asset_id="asset-3", status="completed", text="议程"),
+    )
+    reused.provenance.reused_from = "event-2"
+    drifted = screenshot(5, "00000000000000ff")
+    still_near = screenshot(6, "0000000000000003")
+    record = MeetingRecord(
+        meeting_id="meeting-a",
+        started_at=datetime(2026, 8, 1, tzinfo=UTC),
+        events=[analyzed, analysis, near, reused, drifted],
+    )
+
+    # 和上一张只差 5 位，但和真正分析过的截图差 8 位，需要重新分析。
+    assert previous_near_duplicate_analysis(record, drifted, 6) is None
+    record.events[-1] = still_near
+    assert previous_near_duplicate_analysis(record, still_near, 6).event_id == (
+        "event-2"
+    )
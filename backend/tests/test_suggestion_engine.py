@@ -0,0 +1,135 @@
+import asyncio
+from datetime import UTC, datetime
+
+from models.meeting_context import (
+    EventKind,
+    EventProvenance,
+    MeetingEvent,
+    TranscriptPayload,
+)
+from services.suggestion_engine import SpeculativeSuggestionEngine
+
+
+def transcript_event(sequence: int, text: str) -> MeetingEvent:
+    return MeetingEvent(
+        sequence=sequence,
+        occurred_at=datetime(2026, 7, 25, 10, 0, sequence, tzinfo=UTC),
+        kind=EventKind.TRANSCRIPT,
+        provenance=EventProvenance(source="native_transcript"),
+        payload=TranscriptPayload(
+            segment_id=f"line-{sequence}", text=text, speaker="林晨"
+        ),
+    )
+
+
+def seeded_engine(generate, **options) -> SpeculativeSuggestionEngine:
+    engine = SpeculativeSuggestionEngine(generate, **options)
+    engine.seed("meeting-1", [transcript_event(1, "周岚负责上线")])
+    return engine
+
+
+def test_enough_new_evidence_triggers_one_debounced_generation() -> None:
+    async def exercise():
+        contexts = []
+
+        async def generate(context):
+            contexts.append([item.text for item in context])
+            return ["谁负责上线？", "何时冻结范围？"]
+
+        engine = seeded_engine(
+            generate, min_events=2, debounce_seconds=0.02, min_interval_seconds=0
+        )
+        engine.observe("meeting-1", transcript_event(2, "周五冻结范围"))
+        await asyncio.sleep(0.04)
+        idle = engine.take("meeting-1")
+        engine.observe("meeting-1", transcript_event(3, "回滚演练在周四"))
+        engine.observe("meeting-1", transcript_event(4, "演练由运维值班"))
+        await asyncio.sleep(0.04)
+        ready = engine.take("meeting-1")
+        again = engine.take("meeting-1")
+        engine.shutdown()
+        return contexts, idle, ready, again
+
+    contexts, idle, ready, again = asyncio.run(exercise())
+
+    assert idle is None
+    assert contexts == [
+        ["周岚负责上线", "周五冻结范围", "回滚演练在周四", "演练由运维值班"]
+    ]
+    assert ready.context_revision == 4
+    assert ready.questions == ["谁负责上线？", "何时冻结范围？"]
+    assert again is None
+
+
+def test_stale_or_rejected_results_are_never_served() -> None:
+    async def exercise():
+        answers = [["谁负责上线？", "何时冻结范围？"], None]
+
+        async def generate(context):
+            return answers.pop(0)
+
+        engine = seeded_engine(
+            generate, min_events=1, debounce_seconds=0, min_interval_seconds=0
+        )
+        engine.observe("meeting-1", transcript_event(2, "周五冻结范围"))
+        await asyncio.sleep(0.01)
+        engine.min_events = 5
+        engine.observe("meeting-1", transcript_event(3, "回滚演练在周四"))
+        stale = engine.take("meeting-1")
+        engine.min_events = 1
+        engine.observe("meeting-1", transcript_event(4, "演练由运维值班"))
+        await asyncio.sleep(0.01)
+        rejected = engine.take("meeting-1")
+        engine.shutdown()
+        return stale, rejected
+
+    stale, rejected = asyncio.run(exercise())
+
+    assert stale is None
+    assert rejected is None
+
+
+def test_regeneration_is_rate_limited_by_the_minimum_interval() -> None:
+    async def exercise() -> int:
+        calls = 0
+
+        async def generate(context):
+            nonlocal calls
+            calls += 1
+            return ["谁负责上线？", "何时冻结范围？"]
+
+        engine = seeded_engine(
+            generate, min_events=1, debounce_seconds=0, min_interval_seconds=60
+        )
+        engine.observe("meeting-1", transcript_event(2, "周五冻结范围"))
+        await asyncio.sleep(0.01)
+        engine.observe("meeting-1", transcript_event(3, "回滚演练在周四"))
+        await asyncio.sleep(0.02)
+        engine.shutdown()
+        return calls
+
+    assert asyncio.run(exercise()) == 1
+
+
+def test_results_are_not_served_when_the_record_has_unseen_events() -> None:
+    async def exercise():
+        async def generate(context):
+            return ["谁负责上线？"]
+
+        engine = seeded_engine(
+            generate, min_events=1, debounce_seconds=0, min_interval_seconds=0
+        )
+        engine.observe("meeting-1", transcript_event(2, "周五冻结范围"))
+        await asyncio.sleep(0.01)
+        # 记录里已有序号 3，但引擎没有观察到（例如由其他 worker 写入）
+        behind = engine.take("meeting-1", last_sequence=3)
+        engine.observe("meeting-1", transcript_event(3, "回滚演练在周四"))
+        await asyncio.sleep(0.01)
+        current = engine.take("meeting-1", last_sequence=3)
+        engine.shutdown()
+        return behind, current
+
+    behind, current = asyncio.run(exercise())
+
+    assert behind is None
+    assert current.context_revision == 3
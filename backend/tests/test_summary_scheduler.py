@@ -0,0 +1,140 @@
+import asyncio
+
+from services.summary_scheduler import MilestoneSummaryScheduler
+
+
+class ManualClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_milestones_fire_on_active_time_and_skip_without_new_input() -> None:
+    async def exercise() -> list[tuple[str, int]]:
+        calls: list[tuple[str, int]] = []
+
+        async def generate(meeting_id: str, minutes: int) -> dict:
+            calls.append((meeting_id, minutes))
+            return {"status": "generated"}
+
+        scheduler = MilestoneSummaryScheduler(generate, interval_seconds=0.05)
+        scheduler.start("meeting-1")
+        scheduler.mark_input("meeting-1")
+        await asyncio.sleep(0.07)
+        await asyncio.sleep(0.06)
+        scheduler.stop("meeting-1")
+        return calls
+
+    calls = asyncio.run(exercise())
+
+    assert calls == [("meeting-1", 0)]
+
+
+def test_paused_time_does_not_count_towards_active_minutes() -> None:
+    async def exercise() -> tuple[int | None, int | None, bool]:
+        clock = ManualClock()
+
+        async def generate(meeting_id: str, minutes: int) -> dict:
+            return {"status": "generated"}
+
+        scheduler = MilestoneSummaryScheduler(
+            generate, interval_seconds=300, clock=clock
+        )
+        scheduler.start("meeting-1")
+        clock.now = 120
+        scheduler.pause("meeting-1")
+        clock.now = 900
+        paused_minutes = scheduler.active_minutes("meeting-1")
+        paused_running = scheduler.is_running("meeting-1")
+        scheduler.start("meeting-1")
+        clock.now = 960
+        resumed_minutes = scheduler.active_minutes("meeting-1")
+        scheduler.stop("meeting-1")
+        return paused_minutes, resumed_minutes, paused_running
+
+    paused, resumed, running = asyncio.run(exercise())
+
+    assert paused == 2
+    assert resumed == 3
+    assert running is False
+
+
+def test_overlapping_milestones_coalesce_into_one_follow_up_run() -> None:
+    async def exercise() -> list[int]:
+        release = asyncio.Event()
+        calls: list[int] = []
+
+        async def generate(meeting_id: str, minutes: int) -> dict:
+            calls.append(minutes)
+            if len(calls) == 1:
+                await release.wait()
+            return {"status": "generated"}
+
+        clock = ManualClock()
+        scheduler = MilestoneSummaryScheduler(
+            generate, interval_seconds=300, clock=clock
+        )
+        scheduler.start("meeting-1")
+        state = scheduler._meetings["meeting-1"]
+        scheduler.mark_input("meeting-1")
+        scheduler._trigger("meeting-1", state, 5)
+        await asyncio.sleep(0)
+        scheduler.mark_input("meeting-1")
+        scheduler._trigger("meeting-1", state, 10)
+        scheduler._trigger("meeting-1", state, 15)
+        release.set()
+        await state.generation
+        await asyncio.sleep(0)
+        await state.generation
+        scheduler.stop("meeting-1")
+        return calls
+
+    assert asyncio.run(exercise()) == [5, 15]
+
+
+def test_failed_generation_keeps_input_for_the_next_milestone() -> None:
+    async def exercise() -> bool:
+        async def generate(meeting_id: str, minutes: int) -> dict:
+            raise RuntimeError("provider unavailable")
+
+        scheduler = MilestoneSummaryScheduler(generate, interval_seconds=300)
+        scheduler.start("meeting-1")
+        state = scheduler._meetings["meeting-1"]
+        scheduler.mark_input("meeting-1")
+        scheduler._trigger("meeting-1", state, 5)
+        await state.generation
+        has_input = state.has_new_input
+        scheduler.stop("meeting-1")
+        return has_input
+
+    assert asyncio.run(exercise()) is True
+
+
+def test_restarted_meeting_summarizes_existing_input_and_stop_cancels_generation() -> (
+    None
+):
+    async def exercise() -> tuple[list[int], bool]:
+        calls: list[int] = []
+        release = asyncio.Event()
+
+        async def generate(meeting_id: str, minutes: int) -> dict:
+            calls.append(minutes)
+            await release.wait()
+            return {"status": "generated"}
+
+        scheduler = MilestoneSummaryScheduler(generate, interval_seconds=0.05)
+        # 重启后记录里已有未摘要的输入，不必等新输入
+        scheduler.start("meeting-1", has_new_input=True)
+        state = scheduler._meetings["meeting-1"]
+        await asyncio.sleep(0.07)
+        generation = state.generation
+        scheduler.stop("meeting-1")
+        await asyncio.sleep(0)
+        return calls, generation.cancelled()
+
+    calls, cancelled = asyncio.run(exercise())
+
+    assert calls == [0]
+    assert cancelled
@@ -0,0 +1,78 @@
+import json
+
+from services.summary_stream import StructuredSummaryStream
+
+SUMMARY = {
+    "summary_text": '确认周五发布，回滚由"周岚"负责\n风险已记录',
+    "tasks": [
+        {"task": "完成回滚演练", "assignee": "周岚", "status": "pending"},
+        {"task": "冻结范围", "status": "in_progress"},
+    ],
+    "key_points": ["周五发布", "范围冻结"],
+    "decisions": [],
+}
+
+
+def feed_in_chunks(text: str, size: int) -> tuple[StructuredSummaryStream, list]:
+    stream = StructuredSummaryStream()
+    updates = []
+    for index in range(0, len(text), size):
+        updates.extend(stream.feed(text[index : index + size]))
+    return stream, updates
+
+
+def test_stream_emits_growing_summary_text_and_completed_list_items() -> None:
+    text = json.dumps(SUMMARY, ensure_ascii=False)
+
+    stream, updates = feed_in_chunks(text, 3)
+
+    partial_texts = [
+        update.text for update in updates if update.field == "summary_text"
+    ]
+    assert partial_texts[-1] == SUMMARY["summary_text"]
+    assert all(SUMMARY["summary_text"].startswith(value) for value in partial_texts)
+    assert len(partial_texts) > 3
+    assert [
+        (update.field, update.index, update.item)
+        for update in updates
+        if update.field != "summary_text"
+    ] == [
+        ("tasks", 0, SUMMARY["tasks"][0]),
+        ("tasks", 1, SUMMARY["tasks"][1]),
+        ("key_points", 0, "周五发布"),
+        ("key_points", 1, "范围冻结"),
+    ]
+    assert stream.items["decisions"] == []
+    assert json.loads(stream.text) == SUMMARY
+
+
+def test_stream_ignores_code_fence_and_escaped_brackets_inside_strings() -> None:
+    payload = {
+        "summary_text": "数组 [1, 2] 与对象 {a} 仅为文本\\",
+        "tasks": [],
+        "key_points": ["含逗号, 与 ] 的要点"],
+        "decisions": ["保留"],
+    }
+    text = "```json\n" + json.dumps(payload, ensure_ascii=False) + "\n```"
+
+    stream, updates = feed_in_chunks(text, 1)
+
+    assert stream.summary_text == payload["summary_text"]
+    assert [update.item for update in updates if update.field == "key_points"] == [
+        "含逗号, 与 ] 的要点"
+    ]
+    assert [update.item for update in updates if update.field == "decisions"] == [
+        "保留"
+    ]
+
+
+def test_partial_summary_text_never_splits_escapes_or_surrogate_pairs() -> None:
+    payload = {"summary_text": '发布 🚀 已确认\n"回滚" \\ 就绪', "tasks": []}
+    text = json.dumps(payload)
+
+    stream, updates = feed_in_chunks(text, 1)
+
+    partial_texts = [update.text for update in updates]
+    assert partial_texts[-1] == payload["summary_text"]
+    assert all(payload["summary_text"].startswith(value) for value in partial_texts)
+    assert stream.summary_text == payload["summary_text"]
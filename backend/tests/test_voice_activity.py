@@ -0,0 +1,61 @@
+import numpy as np
+
+from services.voice_activity import VoiceActivityDetector
+
+RATE = 16_000
+
+
+def voiced(seconds: float) -> np.ndarray:
+    time = np.arange(int(RATE * seconds)) / RATE
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * time)
+    return (
+        0.3
+        * envelope
+        * (np.sin(2 * np.pi * 180 * time) + 0.5 * np.sin(2 * np.pi * 360 * time))
+    ).astype(np.float32)
+
+
+def quiet(seconds: float, seed: int = 0) -> np.ndarray:
+    return (np.random.default_rng(seed).normal(0, 0.001, int(RATE * seconds))).astype(
+        np.float32
+    )
+
+
+def test_segments_cover_speech_with_hangover_and_skip_background_noise() -> None:
+    detector = VoiceActivityDetector(RATE, hangover_ms=300)
+    samples = np.concatenate([quiet(1.0), voiced(1.0), quiet(1.5, seed=1)])
+
+    segments = detector.segments(samples)
+
+    assert len(segments) == 1
+    assert abs(segments[0].start_ms - 1_000) <= 30
+    assert 2_250 <= segments[0].end_ms <= 2_360
+    trimmed = detector.trim(samples, segments)
+    assert len(trimmed) == segments[0].end - segments[0].start
+
+
+def test_int16_silence_has_no_segments_and_hangover_carries_across_chunks() -> None:
+    detector = VoiceActivityDetector(RATE, hangover_ms=300)
+    silence = np.zeros(RATE // 2, dtype=np.int16)
+
+    assert detector.segments(silence) == []
+
+    speech, carried = detector.speech_frames(voiced(0.5))
+    following, remaining = detector.speech_frames(quiet(0.5), carried_hangover=carried)
+
+    assert speech.all()
+    assert carried == detector.hangover_frames
+    assert following[: detector.hangover_frames].all()
+    assert not following[detector.hangover_frames :].any()
+    assert remaining == 0
+
+
+def test_interleaved_int16_noise_is_normalized_before_mixing_channels() -> None:
+    detector = VoiceActivityDetector(RATE)
+    noise = np.random.default_rng(0).normal(0, 20, RATE).astype(np.int16)
+    tone = (voiced(1.0) * 32767).astype(np.int16)
+
+    assert not detector.speech_frames(noise)[0].any()
+    assert not detector.speech_frames(noise.reshape(-1, 1))[0].any()
+    assert not detector.speech_frames(np.column_stack([noise, noise]))[0].any()
+    assert detector.speech_frames(np.column_stack([tone, tone]))[0].all()
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import types
+
+from services import websocket_manager
+from services.websocket_manager import (
+    JSON_SUBPROTOCOL,
+    MSGPACK_SUBPROTOCOL,
+    WebSocketManager,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, stalled: bool = False, subprotocols: list[str] | None = None):
+        self.stalled = stalled
+        self.scope = {"subprotocols": subprotocols or []}
+        self.subprotocol: str | None = None
+        self.sent: list[dict] = []
+        self.frames: list[str | bytes] = []
+        self.closed_with: int | None = None
+        self.release = asyncio.Event()
+        self.inbox: list[dict] = []
+
+    async def receive(self) -> dict:
+        return self.inbox.pop(0)
+
+    async def accept(self, subprotocol: str | None = None):
+        self.subprotocol = subprotocol
+
+    async def send_text(self, text: str):
+        if self.stalled:
+            await self.release.wait()
+        self.frames.append(text)
+        self.sent.append(json.loads(text))
+
+    async def send_bytes(self, data: bytes):
+        self.frames.append(data)
+        self.sent.append(websocket_manager.msgpack.unpackb(data))
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_with = code
+
+
+def delta(text: str) -> dict:
+    return {"type": "answer", "data": {"request_id": "request-1", "delta": text}}
+
+
+def test_stalled_client_does_not_block_broadcast_or_other_clients() -> None:
+    async def scenario() -> None:
+        manager = WebSocketManager(
+            max_queue=8, overflow_policy="coalesce", delta_interval_ms=0
+        )
+        healthy, stalled = FakeWebSocket(), FakeWebSocket(stalled=True)
+        await manager.connect(healthy, "session-1")
+        await manager.connect(stalled, "session-1")
+
+        for index in range(200):
+            await asyncio.wait_for(
+                manager.broadcast_to_session("session-1", delta(str(index % 10))),
+                timeout=0.01,
+            )
+            await asyncio.sleep(0)
+        await manager.broadcast_to_session(
+            "session-1", {"type": "answer", "data": {"content": "done"}}
+        )
+        await asyncio.sleep(0.01)
+
+        assert len(healthy.sent) == 201
+        assert len(manager.outbound[stalled].queue) <= 8
+        stalled.release.set()
+        await asyncio.sleep(0.01)
+        streamed = "".join(message["data"].get("delta", "") for message in stalled.sent)
+        # 合并后的增量文本一个字符都不丢，最终完整内容保持原样且排在最后。
+        assert streamed == "".join(str(index % 10) for index in range(200))
+        assert stalled.sent[-1] == {"type": "answer", "data": {"content": "done"}}
+        assert manager.stats["coalesced"] > 0
+
+    asyncio.run(scenario())
+
+
+def test_overflow_policies_drop_deltas_or_disconnect_the_slow_client() -> None:
+    async def scenario(policy: str) -> tuple[FakeWebSocket, WebSocketManager]:
+        manager = WebSocketManager(
+            max_queue=4, overflow_policy=policy, delta_interval_ms=0
+        )
+        stalled = FakeWebSocket(stalled=True)
+        await manager.connect(stalled, "session-1")
+        await manager.broadcast_to_session("session-1", {"type": "meeting_event"})
+        await asyncio.sleep(0)
+        for index in range(10):
+            await manager.broadcast_to_session("session-1", delta(str(index)))
+        await asyncio.sleep(0)
+        stalled.release.set()
+        await asyncio.sleep(0.01)
+        return stalled, manager
+
+    dropped, manager = asyncio.run(scenario("drop_oldest"))
+    assert [message["data"]["delta"] for message in dropped.sent[1:]] == [
+        "6",
+        "7",
+        "8",
+        "9",
+    ]
+    assert manager.stats["dropped"] == 6
+
+    disconnected, manager = asyncio.run(scenario("disconnect"))
+    assert disconnected.closed_with == 1013
+    assert manager.get_connection_count("session-1") == 0
+
+
+def test_deltas_are_batched_per_interval_and_final_content_is_unchanged() -> None:
+    async def scenario() -> None:
+        manager = WebSocketManager(delta_interval_ms=20, delta_max_chars=1000)
+        batched, immediate = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(batched, "session-1")
+        await manager.connect(immediate, "session-1", delta_interval_ms=0)
+
+        for index in range(50):
+            await manager.broadcast_to_session("session-1", delta(str(index % 10)))
+        await asyncio.sleep(0.05)
+        assert len(batched.sent) == 1
+        assert batched.sent[0]["data"] == {
+            "request_id": "request-1",
+            "delta": "0123456789" * 5,
+        }
+        assert len(immediate.sent) == 50
+
+        final = {"type": "answer", "data": {"request_id": "request-1", "content": "x"}}
+        await manager.broadcast_to_session("session-1", delta("tail"))
+        await manager.broadcast_to_session("session-1", final)
+        await asyncio.sleep(0)
+        # 完整内容到达时先冲刷未发出的增量，不必等到下一个间隔
+        assert [message["data"] for message in batched.sent[1:]] == [
+            {"request_id": "request-1", "delta": "tail"},
+            final["data"],
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_delta_batch_flushes_early_when_character_limit_is_reached() -> None:
+    async def scenario() -> None:
+        manager = WebSocketManager(delta_interval_ms=1000, delta_max_chars=8)
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, "session-1")
+        for _ in range(5):
+            await manager.broadcast_to_session("session-1", delta("abc"))
+        await asyncio.sleep(0)
+        assert [message["data"]["delta"] for message in websocket.sent] == ["abcabcabc"]
+        manager.disconnect(websocket, "session-1")
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_is_encoded_once_and_legacy_duplicates_are_opt_out(
+    monkeypatch,
+) -> None:
+    encoded = []
+
+    def dumps(message, **kwargs):
+        encoded.append(message["type"])
+        return json.dumps(message, **kwargs)
+
+    monkeypatch.setattr(
+        websocket_manager, "json", types.SimpleNamespace(dumps=dumps, loads=json.loads)
+    )
+
+    async def scenario() -> list[FakeWebSocket]:
+        manager = WebSocketManager()
+        clients = [FakeWebSocket() for _ in range(3)]
+        for client in clients[:2]:
+            await manager.connect(client, "session-1")
+        await manager.connect(clients[2], "session-1", legacy=False)
+        await manager.broadcast_to_session(
+            "session-1", {"type": "audio_transcript", "data": {}}
+        )
+        await manager.broadcast_to_session(
+            "session-1", {"type": "meeting_event", "data": {"sequence": 1}}
+        )
+        await asyncio.sleep(0)
+        return clients
+
+    clients = asyncio.run(scenario())
+
+    assert encoded == ["audio_transcript", "meeting_event"]
+    assert [message["type"] for message in clients[0].sent] == [
+        "audio_transcript",
+        "meeting_event",
+    ]
+    assert [message["type"] for message in clients[2].sent] == ["meeting_event"]
+
+
+def test_binary_subprotocol_is_negotiated_only_when_msgpack_is_available() -> None:
+    async def scenario() -> tuple[FakeWebSocket, FakeWebSocket]:
+        manager = WebSocketManager()
+        binary = FakeWebSocket(subprotocols=[MSGPACK_SUBPROTOCOL, JSON_SUBPROTOCOL])
+        plain = FakeWebSocket()
+        await manager.connect(binary, "session-1")
+        await manager.connect(plain, "session-1")
+        await manager.broadcast_to_session("session-1", {"type": "pong", "data": {}})
+        await asyncio.sleep(0)
+        return binary, plain
+
+    binary, plain = asyncio.run(scenario())
+
+    if websocket_manager.msgpack is None:
+        # 没有安装 msgpack 时退回客户端同时声明的 JSON 子协议
+        assert binary.subprotocol == JSON_SUBPROTOCOL
+        assert isinstance(binary.frames[0], str)
+    else:
+        assert binary.subprotocol == MSGPACK_SUBPROTOCOL
+        assert isinstance(binary.frames[0], bytes)
+    assert binary.sent == plain.sent == [{"type": "pong", "data": {}}]
+    assert plain.subprotocol is None
+
+
+def test_heartbeat_reaps_stalled_and_silent_connections_but_keeps_idle_clients() -> (
+    None
+):
+    async def scenario() -> None:
+        manager = WebSocketManager(delta_interval_ms=0)
+        stalled = FakeWebSocket(stalled=True)
+        answering, idle = FakeWebSocket(), FakeWebSocket()
+        for websocket in (stalled, answering, idle):
+            await manager.connect(websocket, "session-1")
+        answering.inbox = [
+            {"type": "websocket.receive", "text": '{"type": "pong"}'},
+            {"type": "websocket.receive", "text": '{"type": "agent_message"}'},
+        ]
+        # pong 在管理器里被消化，只把业务消息交给调用方
+        assert await manager.receive_message(answering) == {"type": "agent_message"}
+        await manager.broadcast_to_session("session-1", {"type": "pong", "data": {}})
+        await asyncio.sleep(0)
+
+        assert await manager.ping_all_connections(timeout=0.01) == 0
+        await asyncio.sleep(0.02)
+        assert await manager.ping_all_connections(timeout=0.01) == 2
+        await asyncio.sleep(0)
+
+        assert stalled.closed_with == answering.closed_with == 4408
+        assert idle.closed_with is None
+        assert [message["type"] for message in idle.sent] == ["pong", "ping", "ping"]
+        metrics = manager.metrics()
+        assert metrics["connections"] == 1
+        assert metrics["connected"] == 3
+        assert metrics["disconnected"] == metrics["reaped"] == 2
+        assert metrics["idle_seconds"]["max"] >= 0.0
+
+    asyncio.run(scenario())
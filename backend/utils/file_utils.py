@@ -6,6 +6,7 @@
 import os
 import shutil
 import logging
+import wave
 from typing import Optional, List
 from datetime import datetime
 from pathlib import Path
@@ -111,17 +112,28 @@ class AudioFileManager:
             return ""
 
         try:
-            # 简单的二进制合并（实际应用中可能需要更复杂的音频处理）
-            with open(output_file, "wb") as output:
+            # 每个片段都带有自己的 WAV 头，只拼接采样数据，由 wave 重新写出正确的文件头
+            with wave.open(output_file, "wb") as output:
+                params = None
                 for chunk_file in chunk_files:
-                    with open(chunk_file, "rb") as chunk:
-                        shutil.copyfileobj(chunk, output)
+                    with wave.open(str(chunk_file), "rb") as chunk:
+                        chunk_params = chunk.getparams()[:3]
+                        if params is None:
+                            params = chunk_params
+                            output.setnchannels(params[0])
+                            output.setsampwidth(params[1])
+                            output.setframerate(params[2])
+                        elif chunk_params != params:
+                            raise ValueError(f"音频片段格式不一致: {chunk_file}")
+                        while frames := chunk.readframes(16000):
+                            output.writeframes(frames)
 
             logger.info(f"合并音频文件: {output_file}")
             return output_file
 
         except Exception as e:
             logger.error(f"合并音频文件失败: {e}")
+            delete_file(output_file)
             return ""
 
     def cleanup_session(self, session_id: str, keep_merged: bool = True):
@@ -15,11 +15,14 @@ enum BackendEvent: Equatable, Sendable {
     case screenshotInsight(String)
     case companionDisconnected(String)
     case failure(String)
+    case ping
     case ignored
 
     static func decode(_ text: String) throws -> BackendEvent {
         let (type, payload) = try envelope(from: text)
         switch type {
+        case "ping":
+            return .ping
         case "connection_established", "meeting_event", "audio_transcript", "transcript":
             return try decodeCaptureEvent(type: type, payload: payload)
         case "answer", "transcript_translation", "question", "questions":
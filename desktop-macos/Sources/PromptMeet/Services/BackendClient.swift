@@ -323,7 +323,13 @@ final class BackendClient: BackendClientProtocol, @unchecked Sendable {
                 @unknown default:
                     continue
                 }
-                for event in batcher.consume(try BackendEvent.decode(text)) {
+                let event = try BackendEvent.decode(text)
+                if event == .ping {
+                    // 服务端心跳：回 pong，后端据此回收失联的连接
+                    try await socket.send(.string(#"{"type":"pong"}"#))
+                    continue
+                }
+                for event in batcher.consume(event) {
                     onEvent(event)
                 }
             } catch {
@@ -99,7 +99,7 @@ extension MeetingStore {
                     )
                 }
             }
-        case .ignored:
+        case .ping, .ignored:
             break
         case .meetingEvent, .transcript, .translation:
             receiveEvidenceEvent(event)
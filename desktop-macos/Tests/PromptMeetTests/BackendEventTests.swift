@@ -130,6 +130,10 @@ final class BackendEventTests: XCTestCase {
         )
     }
 
+    func testServerHeartbeatDecodesAsPing() throws {
+        XCTAssertEqual(try BackendEvent.decode(#"{"type":"ping"}"#), .ping)
+    }
+
     func testUnknownEventIsIgnoredForForwardCompatibility() throws {
         XCTAssertEqual(
             try BackendEvent.decode(#"{"type":"future_event","data":{}}"#),